@@ -0,0 +1,88 @@
+import asyncio
+import random
+import time
+import zlib
+from typing import List
+
+FILLER_SENTENCES = [
+    "First, let's restate what the problem is asking for.",
+    "We know the quantities given for each of the days.",
+    "Multiplying the first amount by two gives the second amount.",
+    "Subtracting five from that gives the third amount.",
+    "Let's double-check the arithmetic before moving on.",
+    "Adding the partial results together gives a running total of 12 units.",
+]
+
+
+def make_cot_response(rng: random.Random, answer: str, n_sentences: int) -> str:
+    """Builds a synthetic chain-of-thought response that ends in `answer`."""
+    steps = [
+        f"Step {i + 1}: {rng.choice(FILLER_SENTENCES)}" for i in range(n_sentences)
+    ]
+    steps.append(f"The final answer is {answer}.")
+    return "\n".join(steps)
+
+
+class FakeLLMClient:
+    """
+    A deterministic, offline stand-in for LLMClient and AsyncLLMClient.
+
+    Responses are derived from a hash of the prompt and the sample index, so
+    repeated runs see identical outputs. A fixed share of the samples reach
+    `correct_answer`; the rest are off by one.
+    """
+
+    def __init__(
+        self,
+        correct_answer: str = "70",
+        accuracy: float = 0.75,
+        latency: float = 0.0,
+        sentences_per_response: int = 40,
+    ):
+        """
+        Initializes the FakeLLMClient.
+
+        Args:
+            correct_answer: The answer that correct samples end with.
+            accuracy: The share of samples that reach the correct answer.
+            latency: Simulated seconds per request.
+            sentences_per_response: The length of each synthetic response.
+        """
+        self.correct_answer = correct_answer
+        self.accuracy = accuracy
+        self.latency = latency
+        self.sentences_per_response = sentences_per_response
+        self.requests = 0
+
+    def _samples(self, prompt: str, n: int, sample_offset: int) -> List[str]:
+        self.requests += 1
+        seed = zlib.crc32(prompt.encode("utf-8"))
+        responses = []
+        for i in range(sample_offset, sample_offset + n):
+            rng = random.Random(seed * 1_000_003 + i)
+            if rng.random() < self.accuracy:
+                answer = self.correct_answer
+            else:
+                answer = str(int(self.correct_answer) + 1)
+            responses.append(
+                make_cot_response(rng, answer, self.sentences_per_response)
+            )
+        return responses
+
+    def query(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        return self._samples(prompt, 1, 0)[0]
+
+    def query_sample_n(self, prompt: str, n: int, sample_offset: int = 0) -> List[str]:
+        time.sleep(self.latency)
+        return self._samples(prompt, n, sample_offset)
+
+    async def aquery(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency)
+        return self._samples(prompt, 1, 0)[0]
+
+    async def aquery_sample_n(
+        self, prompt: str, n: int, sample_offset: int = 0
+    ) -> List[str]:
+        await asyncio.sleep(self.latency)
+        return self._samples(prompt, n, sample_offset)
@@ -0,0 +1,168 @@
+"""
+Offline throughput benchmarks for the parser, voting and data-generation
+pipeline, driven by a deterministic fake LLM.
+
+Usage:
+    python -m benchmarks.run [--output bench_results.json] [--quick]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fake_llm import FakeLLMClient, make_cot_response
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.reasoning.self_consistency import SelfConsistency
+from cognition_synthesis.telemetry.metrics import metrics
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> float:
+    """Returns the best wall-clock time of `repeat` runs of `fn`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_parser(n_responses: int, sentences: int, repeat: int) -> Dict[str, Any]:
+    """Measures AnswerParser throughput on synthetic long CoT responses."""
+    rng = random.Random(0)
+    responses = [
+        make_cot_response(rng, str(rng.randint(0, 999)), sentences)
+        for _ in range(n_responses)
+    ]
+    # Half the responses end without an explicit phrase, exercising the fallback
+    responses = [
+        r if i % 2 else r.replace("The final answer is", "So in total we get")
+        for i, r in enumerate(responses)
+    ]
+    total_bytes = sum(len(r) for r in responses)
+    parser = AnswerParser()
+
+    seconds = _timed(lambda: parser.extract_answers(responses), repeat)
+    return {
+        "responses": n_responses,
+        "mean_response_chars": total_bytes // n_responses,
+        "seconds": seconds,
+        "responses_per_sec": n_responses / seconds,
+        "mb_per_sec": total_bytes / seconds / 1e6,
+    }
+
+
+def bench_voting(n_calls: int, n_samples: int, repeat: int) -> Dict[str, Any]:
+    """Measures the per-call cost of SelfConsistency.reason, excluding the LLM."""
+    client = FakeLLMClient()
+    prompts = [f"Problem {i}\n\nLet's think step by step." for i in range(n_calls)]
+    # Pre-generate the responses so only parsing and voting are timed
+    canned = {p: client.query_sample_n(p, n_samples) for p in prompts}
+
+    class CannedClient:
+        def query_sample_n(self, prompt, n, sample_offset=0):
+            return canned[prompt]
+
+    sc = SelfConsistency(CannedClient(), AnswerParser(), verbose=False)
+
+    def run():
+        for prompt in prompts:
+            sc.reason(prompt, n_samples)
+
+    seconds = _timed(run, repeat)
+    return {
+        "calls": n_calls,
+        "samples_per_call": n_samples,
+        "seconds": seconds,
+        "calls_per_sec": n_calls / seconds,
+        "us_per_sample": seconds / (n_calls * n_samples) * 1e6,
+    }
+
+
+def bench_pipeline(
+    n_problems: int, n_samples: int, latency: float, concurrency_levels: List[int]
+) -> List[Dict[str, Any]]:
+    """Measures DataGenerator end-to-end throughput and memory at several concurrency levels."""
+    results = []
+    for concurrency in concurrency_levels:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = FakeLLMClient(latency=latency)
+            generator = DataGenerator(
+                client, os.path.join(tmp, "out.jsonl"), verbose=False
+            )
+            generator.problem_bank.problems = [
+                {"id": f"p{i}", "problem": f"Problem {i}", "ground_truth_answer": "70"}
+                for i in range(n_problems)
+            ]
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            saved = asyncio.run(
+                generator.arun_many(generator.problem_bank.ids(), n_samples, concurrency)
+            )
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        results.append(
+            {
+                "concurrency": concurrency,
+                "problems": n_problems,
+                "samples_per_problem": n_samples,
+                "simulated_latency_sec": latency,
+                "seconds": seconds,
+                "problems_per_sec": n_problems / seconds,
+                "verified_paths": sum(saved.values()),
+                "peak_traced_memory_mb": peak / 1e6,
+            }
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--output", default="bench_results.json", help="Where to write the JSON results."
+    )
+    arg_parser.add_argument(
+        "--quick", action="store_true", help="Run a smaller workload for smoke testing."
+    )
+    args = arg_parser.parse_args(argv)
+
+    scale = 10 if args.quick else 1
+    metrics.reset()
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "parser": bench_parser(
+            n_responses=20_000 // scale, sentences=40, repeat=3
+        ),
+        "voting": bench_voting(n_calls=2_000 // scale, n_samples=8, repeat=3),
+        "pipeline": bench_pipeline(
+            n_problems=500 // scale,
+            n_samples=8,
+            latency=0.02,
+            concurrency_levels=[1, 8, 32, 128],
+        ),
+    }
+    # Per-stage latency summaries collected across all of the runs above
+    results["stages"] = metrics.snapshot()["histograms"]
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
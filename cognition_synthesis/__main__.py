@@ -0,0 +1,5 @@
+import sys
+
+from cognition_synthesis.cli import main
+
+sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Command-line entry point for Cognition Synthesis.
+
+Usage:
+    python -m cognition_synthesis generate [--problems problems.jsonl] [...]
+    python -m cognition_synthesis queue {init,status,merge} QUEUE [...]
+    python -m cognition_synthesis rescore INPUT OUTPUT [...]
+    python -m cognition_synthesis bench [--quick] [...]
+
+Heavy dependencies (the OpenAI SDK, the pipelines) are only imported by the
+subcommand that needs them, so short-lived jobs start quickly.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from typing import List, Optional
+
+_START = time.perf_counter()
+
+
+def _report_startup(what: str):
+    """Prints the time from importing the CLI until `what` was ready, to stderr."""
+    elapsed = time.perf_counter() - _START
+    from cognition_synthesis.telemetry.metrics import metrics
+
+    metrics.observe("startup_seconds", elapsed)
+    print(f"[cognition-synthesis] {what} ready in {elapsed * 1000:.0f} ms", file=sys.stderr)
+
+
+def _generate(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from cognition_synthesis.llm.cache import SQLiteResponseCache
+    from cognition_synthesis.llm.client import AsyncLLMClient
+    from cognition_synthesis.pipelines.data_generator import DataGenerator
+    from cognition_synthesis.pipelines.dedup import PathDeduplicator
+    from cognition_synthesis.telemetry.metrics import metrics
+    from cognition_synthesis.verification.verifier import ProblemBank
+
+    if args.queue and not args.checkpoint:
+        raise SystemExit("generate: --queue requires --checkpoint, which is used to merge outputs.")
+    if args.queue and args.budget:
+        raise SystemExit("generate: --budget cannot be combined with --queue.")
+
+    async def generate() -> int:
+        cache = SQLiteResponseCache(args.cache) if args.cache else None
+        cassette = None
+        if args.cassette:
+            from cognition_synthesis.llm.cassette import Cassette
+
+            cassette = Cassette(args.cassette, args.cassette_mode)
+        # One client, and so one connection pool, serves every problem
+        async with AsyncLLMClient(
+            model=args.model, max_concurrency=args.max_requests, cache=cache, cassette=cassette
+        ) as llm_client:
+            generator = DataGenerator(
+                llm_client,
+                args.output,
+                checkpoint_file=args.checkpoint,
+                resume=not args.fresh,
+                problem_bank=ProblemBank(args.problems) if args.problems else None,
+                verbose=not args.quiet,
+                output_format=args.format,
+                deduplicator=PathDeduplicator() if args.dedup else None,
+            )
+            _report_startup("generate")
+            if args.queue:
+                from cognition_synthesis.pipelines.work_queue import QueueWorker, WorkQueue
+
+                worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+                worker = QueueWorker(generator, WorkQueue(args.queue), worker_id, args.format)
+                results = await worker.run(args.n_samples, args.concurrency)
+            elif args.budget:
+                from cognition_synthesis.pipelines.budget import BudgetPlanner
+
+                planner = BudgetPlanner(
+                    generator,
+                    args.budget,
+                    args.budget_unit,
+                    verbose=not args.quiet,
+                    max_paths_per_problem=args.n_samples,
+                )
+                results = await planner.arun(
+                    generator.problem_bank.ids(args.shard, args.num_shards, args.tags),
+                    args.concurrency,
+                )
+            else:
+                problem_ids = generator.problem_bank.ids(
+                    args.shard, args.num_shards, args.tags
+                )
+                results = await generator.arun_many(
+                    problem_ids, args.n_samples, args.concurrency
+                )
+            generator.close()
+        if cache is not None:
+            # Writes the access times of the last cache hits
+            cache.close()
+        print(
+            f"Saved {sum(results.values())} verified paths for {len(results)} "
+            f"problems to '{args.output}'."
+        )
+        return 0
+
+    try:
+        return asyncio.run(generate())
+    finally:
+        if args.metrics:
+            metrics.export(args.metrics)
+
+
+def _queue(args: argparse.Namespace) -> int:
+    from cognition_synthesis.pipelines.work_queue import WorkQueue
+
+    queue = WorkQueue(args.queue)
+    if args.action == "init":
+        from cognition_synthesis.verification.verifier import ProblemBank
+
+        bank = ProblemBank(args.problems) if args.problems else ProblemBank()
+        added = queue.enqueue(bank.ids(tags=args.tags))
+        print(f"Queued {added} new problems in '{args.queue}'.")
+    elif args.action == "status":
+        print(json.dumps(queue.stats()))
+    else:
+        if not args.output:
+            raise SystemExit("queue merge: --output is required.")
+        merged = queue.merge(args.output)
+        print(f"Merged the output of {merged} problems into '{args.output}'.")
+    return 0
+
+
+def _rescore(args: argparse.Namespace) -> int:
+    from cognition_synthesis.pipelines import rescorer
+
+    _report_startup("rescore")
+    rescorer.main(args.args)
+    return 0
+
+
+def _bench(args: argparse.Namespace) -> int:
+    # The benchmark suite lives next to the package, in the source checkout
+    from benchmarks import run
+
+    _report_startup("bench")
+    run.main(args.args)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cognition_synthesis", description=__doc__.strip().splitlines()[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser(
+        "generate", help="Generate verified reasoning paths for a problem bank."
+    )
+    generate.add_argument("--problems", help="A JSONL problem bank (default: built-in).")
+    generate.add_argument("--output", default="training_data.jsonl")
+    generate.add_argument(
+        "--checkpoint", help="A checkpoint manifest, so interrupted runs can resume."
+    )
+    generate.add_argument(
+        "--fresh", action="store_true", help="Discard previous output and checkpoint."
+    )
+    generate.add_argument("--format", choices=["jsonl", "compact"], default="jsonl")
+    generate.add_argument("--model", default="gpt-4o-mini")
+    generate.add_argument("--n-samples", type=int, default=8)
+    generate.add_argument(
+        "--concurrency", type=int, default=8, help="Problems processed at once."
+    )
+    generate.add_argument(
+        "--max-requests", type=int, default=64, help="API requests in flight at once."
+    )
+    generate.add_argument("--cache", help="A SQLite response cache file.")
+    generate.add_argument(
+        "--cassette", help="Record the API traffic to, or replay it from, this file."
+    )
+    generate.add_argument("--cassette-mode", choices=["record", "replay"], default="replay")
+    generate.add_argument(
+        "--dedup", action="store_true", help="Drop duplicate and near-duplicate paths."
+    )
+    generate.add_argument("--shard", type=int, help="Only process this shard.")
+    generate.add_argument("--num-shards", type=int, default=1)
+    generate.add_argument("--tags", nargs="+", help="Only process problems with these tags.")
+    generate.add_argument("--metrics", help="Where to export metrics (.json or .prom).")
+    generate.add_argument("--quiet", action="store_true", help="Hide per-problem progress.")
+    generate.add_argument(
+        "--queue", help="Lease problems from this shared work queue instead of the bank."
+    )
+    generate.add_argument("--worker-id", help="This worker's name (default: host-pid).")
+    generate.add_argument(
+        "--budget",
+        type=float,
+        help="Spend this much on the problems with the best yield, instead of "
+        "--n-samples each; --n-samples then caps the paths kept per problem.",
+    )
+    generate.add_argument(
+        "--budget-unit", choices=["samples", "requests", "tokens"], default="requests"
+    )
+    generate.set_defaults(func=_generate)
+
+    queue = subparsers.add_parser(
+        "queue", help="Manage a work queue shared by several generate workers."
+    )
+    queue.add_argument("action", choices=["init", "status", "merge"])
+    queue.add_argument("queue", help="The SQLite work queue file.")
+    queue.add_argument("--problems", help="init: the JSONL problem bank to enqueue.")
+    queue.add_argument("--tags", nargs="+", help="init: only enqueue problems with these tags.")
+    queue.add_argument("--output", help="merge: where to write the merged output.")
+    queue.set_defaults(func=_queue)
+
+    # These forward their arguments (including --help) to the underlying tools
+    rescore = subparsers.add_parser(
+        "rescore", add_help=False, help="Re-score an existing corpus of reasoning paths."
+    )
+    rescore.set_defaults(func=_rescore)
+
+    bench = subparsers.add_parser(
+        "bench", add_help=False, help="Run the offline benchmark suite."
+    )
+    bench.set_defaults(func=_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.func in (_generate, _queue):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.args = extra
+    return args.func(args)
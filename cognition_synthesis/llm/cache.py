@@ -0,0 +1,191 @@
+import hashlib
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class ResponseCache(ABC):
+    """
+    Base class for LLM response caches.
+
+    Subclasses implement `_get` and `_set`; this class provides the cache key
+    scheme and the hit/miss counters.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        temperature: float,
+        n: int,
+        seed: Optional[int],
+        sample_offset: int = 0,
+    ) -> str:
+        """
+        Builds a stable cache key from every parameter that shapes a completion.
+
+        `sample_offset` distinguishes successive batches of samples drawn for
+        the same prompt, so each batch is cached separately.
+        """
+        params = [model, prompt, temperature, n, seed]
+        if sample_offset:
+            params.append(sample_offset)
+        payload = json.dumps(params)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Returns the cached responses for `key`, or None on a miss."""
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, responses: List[str]):
+        """Stores the responses for `key`."""
+        self._set(key, responses)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters and the hit rate."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[List[str]]:
+        """Returns the stored responses for `key`, or None."""
+
+    @abstractmethod
+    def _set(self, key: str, responses: List[str]):
+        """Stores the responses for `key`."""
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    A persistent response cache backed by a single SQLite file.
+
+    Entries older than `max_age_seconds` are treated as misses and removed,
+    and once the cache holds more than `max_entries` entries the least
+    recently used ones are evicted.
+
+    Hits do not write to the database: their access times are buffered and
+    written in one transaction on the next `set`, every `flush_every` hits,
+    and on `flush` or `close`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        max_age_seconds: Optional[float] = None,
+        flush_every: int = 256,
+    ):
+        """
+        Initializes the SQLiteResponseCache.
+
+        Args:
+            path: The path of the SQLite database file.
+            max_entries: The maximum number of cached prompts to keep.
+            max_age_seconds: How long an entry stays valid, or None to keep
+                entries until they are evicted for size.
+            flush_every: How many hits' access times to buffer before
+                writing them.
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.flush_every = flush_every
+        # Access times of recent hits, not yet written to the database
+        self._accessed: Dict[str, float] = {}
+        self._buffered_hits = 0
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self.conn.commit()
+        self._count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _get(self, key: str) -> Optional[List[str]]:
+        row = self.conn.execute(
+            "SELECT value, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created = row
+        now = time.time()
+        if self.max_age_seconds is not None and now - created > self.max_age_seconds:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+            self._accessed.pop(key, None)
+            self._count -= 1
+            return None
+
+        self._accessed[key] = now
+        self._buffered_hits += 1
+        if self._buffered_hits >= self.flush_every:
+            self.flush()
+        return json.loads(value)
+
+    def _set(self, key: str, responses: List[str]):
+        # Eviction below must see the buffered access times
+        self._write_accessed()
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO responses (key, value, created, accessed) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(responses), now, now),
+        )
+        if cursor.rowcount:
+            self._count += 1
+        else:
+            self.conn.execute(
+                "UPDATE responses SET value = ?, created = ?, accessed = ? WHERE key = ?",
+                (json.dumps(responses), now, now, key),
+            )
+
+        if self._count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (self._count - self.max_entries,),
+            )
+            self._count = self.max_entries
+        self.conn.commit()
+
+    def _write_accessed(self):
+        if self._accessed:
+            self.conn.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed = {}
+        self._buffered_hits = 0
+
+    def flush(self):
+        """Writes the buffered access times to the database."""
+        if self._accessed:
+            self._write_accessed()
+            self.conn.commit()
+
+    def close(self):
+        """Writes the buffered access times and closes the database connection."""
+        self.flush()
+        self.conn.close()
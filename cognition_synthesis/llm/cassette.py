@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+CASSETTE_MAGIC = b"CSX1"
+# Each record: the request's SHA-256 key, then the length of the compressed body
+_RECORD_HEADER = struct.Struct(">32sI")
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """Raised when replaying a request that the cassette never recorded."""
+
+
+class Cassette:
+    """
+    Records HTTP request/response pairs to a file, and replays them later
+    without touching the network.
+
+    A cassette file starts with `CASSETTE_MAGIC`, followed by one record per
+    exchange: a 32-byte key, a 4-byte big-endian length and that many bytes
+    of zlib-compressed JSON holding the response's status, headers and body.
+    The key is a hash of the request's method, path and (canonicalized JSON)
+    body; headers such as the API key or retry counters are not part of it.
+
+    Opening a cassette reads only the record headers, into an in-memory
+    index; response bodies are read from disk when a request is replayed.
+    A request recorded several times replays its responses in order, then
+    cycles through them, so a replayed run can repeat identical requests
+    (e.g. sampling without a seed) any number of times.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        upstream: Optional[Any] = None,
+    ):
+        """
+        Initializes the Cassette.
+
+        Args:
+            path: The cassette file. Recording appends to it.
+            mode: "record" to forward requests and store their responses, or
+                "replay" to answer requests from the file alone.
+            upstream: The transport that recorded requests are forwarded to
+                (an `httpx` sync or async transport). Defaults to the
+                network.
+
+        Raises:
+            ValueError: If `mode` is unknown, or the file is not a cassette.
+            FileNotFoundError: If replaying a file that does not exist.
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'; expected one of {CASSETTE_MODES}.")
+        self.path = path
+        self.mode = mode
+        self.upstream = upstream
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._index: Dict[bytes, List[Tuple[int, int]]] = {}
+        self._cursors: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self._file = open(path, "a+b")
+            if self._file.tell() == 0:
+                self._file.write(CASSETTE_MAGIC)
+                self._file.flush()
+        else:
+            self._file = open(path, "rb")
+        self._load()
+
+    def _load(self):
+        """Builds the index from the record headers, skipping the bodies."""
+        f = self._file
+        f.seek(0)
+        if f.read(len(CASSETTE_MAGIC)) != CASSETTE_MAGIC:
+            raise ValueError(f"'{self.path}' is not a cassette file.")
+        size = os.fstat(f.fileno()).st_size
+        offset = len(CASSETTE_MAGIC)
+        while offset + _RECORD_HEADER.size <= size:
+            f.seek(offset)
+            key, length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+            start = offset + _RECORD_HEADER.size
+            if start + length > size:
+                # A record torn by an interrupted recording
+                break
+            self._index.setdefault(key, []).append((start, length))
+            offset = start + length
+        if self.mode == "record" and offset < size:
+            # Drop a record torn by an interrupted recording, or its header's
+            # length would swallow the records appended after it
+            f.truncate(offset)
+        f.seek(0, os.SEEK_END)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    @staticmethod
+    def request_key(request: httpx.Request) -> bytes:
+        """Returns the key a request is recorded and replayed under."""
+        body = request.content
+        try:
+            # Canonicalize JSON so that key order does not change the key
+            body = json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+        except ValueError:
+            pass
+        target = f"{request.method} {request.url.raw_path.decode('ascii')}\n".encode("utf-8")
+        return hashlib.sha256(target + body).digest()
+
+    def replay(self, request: httpx.Request) -> httpx.Response:
+        """
+        Returns the recorded response for `request`.
+
+        Raises:
+            CassetteMissError: If the request was never recorded.
+        """
+        key = self.request_key(request)
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(
+                    f"No recorded response for {request.method} {request.url} in '{self.path}'."
+                )
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.hits += 1
+        start, length = entries[cursor % len(entries)]
+        record = json.loads(zlib.decompress(os.pread(self._file.fileno(), length, start)))
+        return httpx.Response(
+            record["status"],
+            headers=record["headers"],
+            content=record["body"].encode("utf-8"),
+            request=request,
+        )
+
+    def record(self, request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        """
+        Stores a response whose body has been read, returning a copy that
+        can be handed back to the caller.
+        """
+        # The body is stored decoded, so drop headers describing its encoding
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        record = {
+            "status": response.status_code,
+            "headers": headers,
+            "body": response.content.decode("utf-8"),
+        }
+        data = zlib.compress(json.dumps(record).encode("utf-8"))
+        key = self.request_key(request)
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            start = self._file.tell() + _RECORD_HEADER.size
+            self._file.write(_RECORD_HEADER.pack(key, len(data)) + data)
+            self._file.flush()
+            self._index.setdefault(key, []).append((start, len(data)))
+            self.recorded += 1
+        return httpx.Response(
+            record["status"], headers=headers, content=response.content, request=request
+        )
+
+    def transport(self) -> "CassetteTransport":
+        """Returns a transport for a synchronous `httpx.Client`."""
+        return CassetteTransport(self)
+
+    def async_transport(self) -> "AsyncCassetteTransport":
+        """Returns a transport for an `httpx.AsyncClient`."""
+        return AsyncCassetteTransport(self)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the replay hits and misses and the records made."""
+        return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+    def close(self):
+        """Closes the cassette file."""
+        self._file.close()
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """An `httpx` transport that records to, or replays from, a Cassette."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._upstream = None
+        if cassette.mode == "record":
+            self._upstream = cassette.upstream or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._upstream is None:
+            return self.cassette.replay(request)
+        response = self._upstream.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        return self.cassette.record(request, response)
+
+    def close(self):
+        if self._upstream is not None:
+            self._upstream.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """The async version of `CassetteTransport`, for `httpx.AsyncClient`."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._upstream = None
+        if cassette.mode == "record":
+            self._upstream = cassette.upstream or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._upstream is None:
+            return self.cassette.replay(request)
+        response = await self._upstream.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return self.cassette.record(request, response)
+
+    async def aclose(self):
+        if self._upstream is not None:
+            await self._upstream.aclose()
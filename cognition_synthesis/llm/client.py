@@ -1,69 +1,553 @@
+import asyncio
+import json
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-from typing import List
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+from cognition_synthesis.llm.cache import ResponseCache
+from cognition_synthesis.llm.scheduler import RateLimitScheduler
+from cognition_synthesis.parsing.parser import StreamingAnswerParser
+from cognition_synthesis.telemetry.metrics import cached_prompt_tokens, metrics
 
-class LLMClient:
+if TYPE_CHECKING:
+    from cognition_synthesis.llm.cassette import Cassette
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+
+# Importing the OpenAI SDK takes about half a second, so it is deferred until
+# a client is created. These names are still module attributes (resolved on
+# first access), so they can be patched as before.
+_LAZY_OPENAI_NAMES = (
+    "OpenAI",
+    "AsyncOpenAI",
+    "DefaultHttpxClient",
+    "DefaultAsyncHttpxClient",
+    "DEFAULT_MAX_RETRIES",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_OPENAI_NAMES:
+        import openai
+
+        value = globals()[name] = getattr(openai, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _openai(name: str) -> Any:
+    """Returns a lazily imported OpenAI SDK name, honouring any patched value."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+class LLMRequestError(RuntimeError):
+    """Raised when a completion request fails for good (after any retries)."""
+
+
+def _replaying(cassette: Optional["Cassette"]) -> bool:
+    return cassette is not None and cassette.mode == "replay"
+
+
+def _load_api_key(cassette: Optional["Cassette"] = None) -> str:
+    """Reads the OpenAI API key from the environment (or a .env file)."""
+    if _replaying(cassette):
+        # Replayed requests never reach the API
+        return os.getenv("OPENAI_API_KEY") or "replay"
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set.")
+    return api_key
+
+
+def _build_messages(prompt: str) -> List[Dict[str, str]]:
+    """Wraps a user prompt in the chat message format used by every client."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+class _BaseLLMClient:
+    """Request building and response caching shared by the sync and async clients."""
+
+    def __init__(
+        self, model: str, cache: Optional[ResponseCache], seed: Optional[int]
+    ):
+        self.model = model
+        self.cache = cache
+        self.seed = seed
+        # Running totals for this client, from each response's `usage` field
+        self.usage = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            # Prompt tokens served from the provider's prompt cache
+            "cached_tokens": 0,
+        }
+
+    def _completion_kwargs(
+        self,
+        prompt: str,
+        temperature: float,
+        n: Optional[int] = None,
+        sample_offset: int = 0,
+    ) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "model": self.model,
+            "messages": _build_messages(prompt),
+            "temperature": temperature,
+        }
+        if n is not None:
+            kwargs["n"] = n
+        if self.seed is not None:
+            # Shift the seed so later batches for the same prompt differ
+            kwargs["seed"] = self.seed + sample_offset
+        return kwargs
+
+    def _cache_key(
+        self, prompt: str, temperature: float, n: int, sample_offset: int = 0
+    ) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            self.model, prompt, temperature, n, self.seed, sample_offset
+        )
+
+    def _cache_get(self, key: Optional[str]) -> Optional[List[str]]:
+        if key is None:
+            return None
+        cached = self.cache.get(key)
+        metrics.inc("llm_cache_lookups_total", result="miss" if cached is None else "hit")
+        return cached
+
+    def _cache_set(self, key: Optional[str], responses: List[str]):
+        if key is not None:
+            self.cache.set(key, responses)
+
+    def _record_response(self, response: Any):
+        """Adds a response's token usage to this client's totals and the metrics."""
+        self.usage["requests"] += 1
+        metrics.inc("llm_requests_total", model=self.model)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.usage["prompt_tokens"] += int(usage.prompt_tokens or 0)
+            self.usage["completion_tokens"] += int(usage.completion_tokens or 0)
+            self.usage["cached_tokens"] += cached_prompt_tokens(usage)
+            metrics.record_usage(self.model, usage)
+
+
+class LLMClient(_BaseLLMClient):
     """A wrapper for the OpenAI API client."""
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        cache: Optional[ResponseCache] = None,
+        seed: Optional[int] = None,
+        base_url: Optional[str] = None,
+        cassette: Optional["Cassette"] = None,
+    ):
         """
         Initializes the LLMClient.
 
         Args:
             model: The name of the model to use (e.g., "gpt-4o-mini").
+            cache: An optional response cache consulted before every request.
+            seed: An optional sampling seed, sent to the API and included in
+                cache keys.
+            base_url: An optional API base URL, e.g. for a local stub server.
+            cassette: An optional cassette that records the HTTP traffic or
+                replays it without calling the API.
         """
-        load_dotenv()
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
+        super().__init__(model, cache, seed)
+        api_key = _load_api_key(cassette)
 
-        self.client = OpenAI(api_key=api_key)
-        self.model = model
+        kwargs = {}
+        if cassette is not None:
+            kwargs["http_client"] = _openai("DefaultHttpxClient")(
+                transport=cassette.transport()
+            )
+        if _replaying(cassette):
+            kwargs["max_retries"] = 0
+        self.client = _openai("OpenAI")(api_key=api_key, base_url=base_url, **kwargs)
 
     def query(self, prompt: str) -> str:
         """
         Sends a prompt for a single, deterministic completion.
+
+        Raises:
+            LLMRequestError: If the request fails after the SDK's retries.
         """
+        key = self._cache_key(prompt, 0.0, 1)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached[0]
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.0,
-            )
-            return response.choices[0].message.content.strip()
+            with metrics.timer("llm_request"):
+                response = self.client.chat.completions.create(
+                    **self._completion_kwargs(prompt, temperature=0.0)
+                )
+            self._record_response(response)
+            result = response.choices[0].message.content.strip()
         except Exception as e:
-            # Basic error handling
-            return f"An error occurred: {e}"
+            # Don't let a failure masquerade as the model's answer
+            raise LLMRequestError(f"Completion request failed: {e}") from e
+        self._cache_set(key, [result])
+        return result
 
-    def query_sample_n(self, prompt: str, n: int) -> List[str]:
+    def query_sample_n(
+        self, prompt: str, n: int, sample_offset: int = 0
+    ) -> List[str]:
         """
         Sends a prompt for n diverse, sampled completions.
 
         Args:
             prompt: The input prompt for the LLM.
             n: The number of diverse samples to generate.
+            sample_offset: How many samples were already drawn for this prompt.
+                Successive batches must pass increasing offsets so that they
+                are cached (and seeded) independently.
 
         Returns:
             A list of n response strings from the LLM.
+
+        Raises:
+            LLMRequestError: If the request fails after all retries.
         """
         if n <= 0:
             return []
+        key = self._cache_key(prompt, 0.7, n, sample_offset)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        try:
+            with metrics.timer("llm_request"):
+                response = self.client.chat.completions.create(
+                    # Use a non-zero temperature for diversity, and request n completions
+                    **self._completion_kwargs(
+                        prompt, temperature=0.7, n=n, sample_offset=sample_offset
+                    )
+                )
+            self._record_response(response)
+            results = [choice.message.content.strip() for choice in response.choices]
+        except Exception as e:
+            raise LLMRequestError(f"Sampling request failed: {e}") from e
+        self._cache_set(key, results)
+        return results
+
+    def query_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streams a single, deterministic completion as it is generated.
+
+        Streaming bypasses the response cache. Closing the returned generator
+        early closes the HTTP stream, which cancels the rest of the generation.
+
+        Yields:
+            Chunks of the response text as they arrive.
+        """
+        stream = self.client.chat.completions.create(
+            **self._completion_kwargs(prompt, temperature=0.0), stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def query_until_answer(
+        self, prompt: str, parser: Optional[StreamingAnswerParser] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Streams a completion and stops it as soon as a final answer appears.
+
+        Args:
+            prompt: The input prompt for the LLM.
+            parser: The incremental parser to feed; a fresh one by default.
+
+        Returns:
+            A tuple of the text received before stopping and the extracted
+            answer (or None if no answer is found).
+
+        Raises:
+            LLMRequestError: If the stream fails.
+        """
+        parser = parser or StreamingAnswerParser()
+        stream = self.query_stream(prompt)
+        try:
+            for chunk in stream:
+                if parser.feed(chunk) is not None:
+                    break
+        except Exception as e:
+            raise LLMRequestError(f"Streaming request failed: {e}") from e
+        finally:
+            stream.close()
+        return parser.text, parser.finish()
+
+    def batch_request(
+        self, custom_id: str, prompt: str, n: int, sample_offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Builds one line of a Batch API input file that samples n completions,
+        with the same parameters as `query_sample_n`.
+        """
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": self._completion_kwargs(
+                prompt, temperature=0.7, n=n, sample_offset=sample_offset
+            ),
+        }
+
+    def submit_batch(self, request_file: str) -> str:
+        """
+        Uploads a Batch API input file and starts a batch for it.
+
+        Returns:
+            The ID of the created batch.
+        """
+        with open(request_file, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def retrieve_batch(self, batch_id: str) -> Any:
+        """Fetches the current state of a batch."""
+        return self.client.batches.retrieve(batch_id)
+
+    def iter_batch_file(self, file_id: str) -> Iterator[Dict[str, Any]]:
+        """Streams the JSON records of a batch output (or error) file."""
+        with self.client.files.with_streaming_response.content(file_id) as response:
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class AsyncLLMClient(_BaseLLMClient):
+    """
+    An asyncio wrapper for the OpenAI API client.
+
+    All requests share one pooled HTTP client, and a semaphore caps the number
+    of requests in flight, so many prompts can be awaited concurrently without
+    opening a new connection per call.
+
+    The pool and the semaphore are created on first use in each event loop,
+    so one client can serve several `asyncio.run` calls in turn (though not
+    several loops at once).
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_concurrency: int = 64,
+        cache: Optional[ResponseCache] = None,
+        seed: Optional[int] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        priority: int = 0,
+        base_url: Optional[str] = None,
+        cassette: Optional["Cassette"] = None,
+    ):
+        """
+        Initializes the AsyncLLMClient.
+
+        Args:
+            model: The name of the model to use (e.g., "gpt-4o-mini").
+            max_concurrency: The maximum number of requests in flight at once.
+                The connection pool is sized to match.
+            cache: An optional response cache consulted before every request.
+            seed: An optional sampling seed, sent to the API and included in
+                cache keys.
+            scheduler: An optional rate-limit scheduler, which may be shared
+                with other clients. It takes over retries from the OpenAI SDK.
+            priority: This client's priority in the scheduler's queue; lower
+                values are dispatched first.
+            base_url: An optional API base URL, e.g. for a local stub server.
+            cassette: An optional cassette that records the HTTP traffic or
+                replays it without calling the API, e.g. to load-test the
+                pipeline offline with realistic responses.
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+        super().__init__(model, cache, seed)
+        api_key = _load_api_key(cassette)
+
+        self._client_kwargs = {
+            "api_key": api_key,
+            "base_url": base_url,
+            # The scheduler retries with backoff itself, so don't retry twice;
+            # a replayed request would fail the same way again
+            "max_retries": (
+                0 if scheduler or _replaying(cassette) else _openai("DEFAULT_MAX_RETRIES")
+            ),
+        }
+        self.cassette = cassette
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler
+        self.priority = priority
+        self.http_client: Any = None
+        self.client: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> Tuple[Any, asyncio.Semaphore]:
+        """
+        Returns the OpenAI client and the semaphore for the running event
+        loop, creating them if this is the first request in that loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            import httpx
+
+            # The previous loop has ended, taking its connections with it
+            self.http_client = _openai("DefaultAsyncHttpxClient")(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self.cassette.async_transport() if self.cassette is not None else None,
+            )
+            self.client = _openai("AsyncOpenAI")(
+                http_client=self.http_client, **self._client_kwargs
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self.client, self._semaphore
+
+    async def _create(self, prompt: str, **kwargs) -> Any:
+        """Sends a chat completion request, through the scheduler if there is one."""
+        client, semaphore = self._bind()
+
+        async def request():
+            async with semaphore:
+                with metrics.timer("llm_request"):
+                    return await client.chat.completions.create(**kwargs)
+
+        if self.scheduler is None:
+            response = await request()
+            self._record_response(response)
+            return response
+
+        estimated = self.scheduler.estimate_tokens(prompt, kwargs.get("n", 1))
+        response = await self.scheduler.run(
+            request, estimated_tokens=estimated, priority=self.priority
+        )
+        self._record_response(response)
+        if getattr(response, "usage", None) is not None:
+            self.scheduler.record_usage(estimated, response.usage.total_tokens)
+        return response
+
+    async def aquery(self, prompt: str) -> str:
+        """
+        Sends a prompt for a single, deterministic completion.
+
+        Raises:
+            LLMRequestError: If the request fails after all retries.
+        """
+        key = self._cache_key(prompt, 0.0, 1)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached[0]
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,  # Use a non-zero temperature for diversity
-                n=n,  # Request n completions
+            response = await self._create(
+                prompt, **self._completion_kwargs(prompt, temperature=0.0)
             )
-            return [choice.message.content.strip() for choice in response.choices]
+            result = response.choices[0].message.content.strip()
         except Exception as e:
-            print(f"An error occurred during sampling: {e}")
+            # Raised once the scheduler (if any) has given up retrying
+            raise LLMRequestError(f"Completion request failed: {e}") from e
+        self._cache_set(key, [result])
+        return result
+
+    async def aquery_sample_n(
+        self, prompt: str, n: int, sample_offset: int = 0
+    ) -> List[str]:
+        """
+        Sends a prompt for n diverse, sampled completions.
+
+        Args:
+            prompt: The input prompt for the LLM.
+            n: The number of diverse samples to generate.
+            sample_offset: How many samples were already drawn for this prompt.
+                Successive batches must pass increasing offsets so that they
+                are cached (and seeded) independently.
+
+        Returns:
+            A list of n response strings from the LLM.
+
+        Raises:
+            LLMRequestError: If the request fails after all retries.
+        """
+        if n <= 0:
             return []
+        key = self._cache_key(prompt, 0.7, n, sample_offset)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        try:
+            response = await self._create(
+                prompt,
+                **self._completion_kwargs(
+                    prompt, temperature=0.7, n=n, sample_offset=sample_offset
+                ),
+            )
+            results = [choice.message.content.strip() for choice in response.choices]
+        except Exception as e:
+            raise LLMRequestError(f"Sampling request failed: {e}") from e
+        self._cache_set(key, results)
+        return results
+
+    async def aquery_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Async version of `query_stream`.
+
+        The request holds a concurrency slot until the stream is exhausted or
+        closed.
+        """
+        client, semaphore = self._bind()
+        async with semaphore:
+            stream = await client.chat.completions.create(
+                **self._completion_kwargs(prompt, temperature=0.0), stream=True
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
+    async def aquery_until_answer(
+        self, prompt: str, parser: Optional[StreamingAnswerParser] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Async version of `query_until_answer`.
+        """
+        parser = parser or StreamingAnswerParser()
+        stream = self.aquery_stream(prompt)
+        try:
+            async for chunk in stream:
+                if parser.feed(chunk) is not None:
+                    break
+        except Exception as e:
+            raise LLMRequestError(f"Streaming request failed: {e}") from e
+        finally:
+            await stream.aclose()
+        return parser.text, parser.finish()
+
+    async def aclose(self) -> None:
+        """Closes the shared HTTP connection pool, if one is open in this loop."""
+        if self.client is not None and self._loop is asyncio.get_running_loop():
+            await self.client.close()
+        self.client = self.http_client = self._semaphore = self._loop = None
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    A token bucket that refills continuously at a fixed rate per minute.
+
+    The bucket may go negative when actual usage turns out higher than
+    estimated, which delays later requests until the debt is repaid.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initializes the TokenBucket, full.
+
+        Args:
+            rate_per_minute: How many units are added per minute.
+            capacity: The maximum number of stored units (the burst size).
+                Defaults to one minute's worth.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive.")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Returns how many seconds until `amount` units are available."""
+        self._refill()
+        # Requests larger than the whole bucket go through once it is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def consume(self, amount: float):
+        """Removes `amount` units (which may leave the bucket negative)."""
+        self._refill()
+        self.tokens -= amount
+
+
+class RateLimitScheduler:
+    """
+    Schedules API requests under requests-per-minute and tokens-per-minute
+    quotas, with retries.
+
+    Callers wait in a single priority queue (lower numbers go first), so many
+    clients can share one quota. Rate-limit, timeout, connection and server
+    errors are retried with exponential backoff and full jitter, honouring
+    the server's Retry-After header. A 429 pauses dispatch for every caller,
+    since they all share the quota that ran out.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        completion_tokens_estimate: int = 512,
+    ):
+        """
+        Initializes the RateLimitScheduler.
+
+        Args:
+            requests_per_minute: The request quota, or None for no limit.
+            tokens_per_minute: The token quota, or None for no limit.
+            max_retries: How many times to retry a failed request.
+            base_delay: The backoff ceiling for the first retry, in seconds.
+            max_delay: The largest backoff ceiling, in seconds.
+            completion_tokens_estimate: The completion tokens assumed per
+                sample when estimating a request's cost up front.
+        """
+        self.request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens_estimate = completion_tokens_estimate
+
+        self.retries = 0
+        self._paused_until = 0.0
+        self._waiters: List[list] = []
+        self._seq = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def estimate_tokens(self, prompt: str, n: int = 1) -> int:
+        """Roughly estimates a request's total tokens (about 4 characters per token)."""
+        return len(prompt) // 4 + n * self.completion_tokens_estimate
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token bucket once a request's actual usage is known."""
+        if self.token_bucket:
+            self.token_bucket.consume(actual_tokens - estimated_tokens)
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        priority: int = 0,
+    ) -> T:
+        """
+        Runs `request` once the quotas allow, retrying transient failures.
+
+        Args:
+            request: A callable that starts the request and returns an awaitable.
+            estimated_tokens: The tokens the request is expected to use.
+            priority: The queue priority; lower values are dispatched first.
+
+        Returns:
+            The result of the first successful attempt.
+
+        Raises:
+            The last error, if the request is not retryable or retries run out.
+        """
+        import openai
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(estimated_tokens, priority)
+            try:
+                return await request()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                if isinstance(e, openai.RateLimitError):
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Returns how long to wait before retrying, or None if not retryable."""
+        import openai
+
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code != 429 and error.status_code < 500:
+                return None
+            retry_after = self._parse_retry_after(error.response.headers)
+            if retry_after is not None:
+                return retry_after + random.uniform(0, self.base_delay / 10)
+        elif not isinstance(error, openai.APIConnectionError):
+            # Includes APITimeoutError, which subclasses APIConnectionError
+            return None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    @staticmethod
+    def _parse_retry_after(headers) -> Optional[float]:
+        for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    return float(value) * scale
+                except ValueError:
+                    pass  # An HTTP date; fall back to exponential backoff
+        return None
+
+    def _wait_time(self, estimated_tokens: int) -> float:
+        wait = self._paused_until - time.monotonic()
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.wait_time(1))
+        if self.token_bucket:
+            wait = max(wait, self.token_bucket.wait_time(estimated_tokens))
+        return wait
+
+    async def _acquire(self, estimated_tokens: int, priority: int):
+        """Waits until this caller is first in the queue and the quotas allow it."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives belong to one loop; a new asyncio.run needs new ones
+            self._condition = asyncio.Condition()
+            self._waiters = []
+            self._loop = loop
+        condition = self._condition
+
+        entry = [priority, next(self._seq)]
+        async with condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if self._waiters[0] is entry:
+                        wait = self._wait_time(estimated_tokens)
+                        if wait <= 0:
+                            break
+                        try:
+                            # Wake early if a higher-priority caller arrives
+                            await asyncio.wait_for(condition.wait(), wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await condition.wait()
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                condition.notify_all()
+                raise
+
+            heapq.heappop(self._waiters)
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.token_bucket:
+                self.token_bucket.consume(estimated_tokens)
+            condition.notify_all()
@@ -1,5 +1,5 @@
 import re
-from typing import Optional
+from typing import Iterable, List, Optional
 
 
 class AnswerParser:
@@ -7,24 +7,25 @@ class AnswerParser:
     A utility to extract the final answer from an LLM's text response.
     """
 
-    def __init__(self):
-        # Patterns are ordered from most specific to most general.
-        # The primary patterns are case-insensitive for robustness.
-        self.patterns = [
-            # Priority 1: Explicit phrases (case-insensitive)
-            re.compile(r"The final answer is\s*:*\s*(.+)", re.IGNORECASE),
-            # Matches "The answer is 123"
-            re.compile(r"The answer is\s*:*\s*(.+)", re.IGNORECASE),
-            re.compile(r"The output is\s*:*\s*(.+)", re.IGNORECASE),
-            # Priority 2: A number at the end of the string, allowing for a few
-            # trailing words (e.g., "6 apples left."). This is anchored to the
-            # end of the string (`$`) to avoid false positives.
-            # It matches a number, followed by 0 to 3 "word-like" segments.
-            re.compile(
-                r".*?(\b\d+(?:\.\d+)?\b)(?:\s*\w+){0,3}\.?\s*$",
-                re.IGNORECASE | re.DOTALL,
-            ),
-        ]
+    # Priority 1: Explicit phrases (case-insensitive), combined into a single
+    # alternation so the text is scanned once. The answer is captured inside a
+    # lookahead, so a higher-priority phrase later on the same line is still
+    # found. Earlier alternatives take priority over later ones.
+    _PHRASE_PATTERN = re.compile(
+        r"(?:(?P<final>The final answer is)"
+        r"|(?P<answer>The answer is)"  # Matches "The answer is 123"
+        r"|(?P<output>The output is))"
+        r"\s*:*\s*(?=(?P<value>.+))",
+        re.IGNORECASE,
+    )
+    # Priority 2: A number at the end of the string, allowing for a few
+    # trailing words (e.g., "6 apples left."). This is anchored to the end of
+    # the string (`$`) to avoid false positives. It matches a number, followed
+    # by 0 to 3 "word-like" segments.
+    _TRAILING_NUMBER_PATTERN = re.compile(r"(\b\d+(?:\.\d+)?\b)(?:\s*\w+){0,3}\.?\s*$")
+    # A match for the trailing-number pattern spans at most the number's own
+    # token plus three words, so only that many tokens at the end are searched.
+    _TRAILING_TOKENS = 4
 
     def extract_answer(self, text: str) -> Optional[str]:
         """
@@ -39,14 +40,119 @@ class AnswerParser:
         # Pre-process to remove common markdown and strip whitespace
         text = text.strip().replace("**", "")
 
-        for pattern in self.patterns:
-            match = pattern.search(text)
-            if match:
-                # The answer is the last captured group. For our fallback regex,
-                # it's group(1). For others, it's also group(1).
-                answer = match.groups()[-1].strip()
-                if answer.endswith("."):
-                    answer = answer[:-1]
-                return answer.strip('""')
+        answer_match = None
+        output_match = None
+        for match in self._PHRASE_PATTERN.finditer(text):
+            if match.group("final") is not None:
+                return _clean_answer(match.group("value"))
+            if match.group("answer") is not None:
+                answer_match = answer_match or match
+            else:
+                output_match = output_match or match
+
+        match = answer_match or output_match
+        if match:
+            return _clean_answer(match.group("value"))
+
+        # Scan backwards from the end rather than across the whole response
+        tokens = text.rsplit(None, self._TRAILING_TOKENS)
+        if len(tokens) > self._TRAILING_TOKENS:
+            tokens = tokens[1:]
+        match = self._TRAILING_NUMBER_PATTERN.search(" ".join(tokens))
+        if match:
+            return _clean_answer(match.group(1))
 
         return None
+
+    def extract_answers(self, texts: Iterable[str]) -> List[Optional[str]]:
+        """
+        Extracts the answer from each of many responses.
+
+        Args:
+            texts: The LLM responses to parse.
+
+        Returns:
+            The extracted answers, in the same order as `texts`.
+        """
+        extract_answer = self.extract_answer
+        return [extract_answer(text) for text in texts]
+
+
+def _clean_answer(answer: str) -> str:
+    """Trims whitespace, a trailing period and surrounding quotes from an answer."""
+    answer = answer.strip()
+    if answer.endswith("."):
+        answer = answer[:-1]
+    return answer.strip('""')
+
+
+class StreamingAnswerParser:
+    """
+    Extracts the final answer from an LLM response while it is still streaming.
+
+    Chunks are fed in as they arrive. As soon as a complete
+    "The final answer is ..." line has been seen, `feed` returns the answer,
+    so the caller can stop the generation early. If the stream ends without
+    that phrase, `finish` falls back to the full `AnswerParser`.
+    """
+
+    PHRASE = "The final answer is"
+    _PHRASE_PATTERN = re.compile(re.escape(PHRASE), re.IGNORECASE)
+    # Mirrors the `\s*:*\s*(.+)` tail of AnswerParser's first pattern, but
+    # only matches once the answer's line has been terminated.
+    _ANSWER_LINE_PATTERN = re.compile(r"\s*:*\s*(\S.*)\n")
+
+    def __init__(self, parser: Optional[AnswerParser] = None):
+        self.parser = parser or AnswerParser()
+        self.answer: Optional[str] = None
+        self._chunks: List[str] = []
+        self._clean = ""  # The text so far, with markdown bold markers removed
+        self._pending = ""  # Trailing "*" that may be half of a split "**"
+        self._scan_from = 0
+        self._answer_from: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """The raw text received so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Adds a chunk of streamed text.
+
+        Returns:
+            The final answer once it is complete, otherwise None.
+        """
+        if self.answer is not None:
+            return self.answer
+        self._chunks.append(chunk)
+
+        text = self._pending + chunk
+        stripped = text.rstrip("*")
+        self._pending = text[len(stripped) :]
+        self._clean += stripped.replace("**", "")
+
+        if self._answer_from is None:
+            match = self._PHRASE_PATTERN.search(self._clean, self._scan_from)
+            if not match:
+                # The phrase may straddle the next chunk, so rescan its possible start
+                self._scan_from = max(0, len(self._clean) - len(self.PHRASE) + 1)
+                return None
+            self._answer_from = match.end()
+
+        line = self._ANSWER_LINE_PATTERN.match(self._clean, self._answer_from)
+        if line:
+            self.answer = _clean_answer(line.group(1))
+        return self.answer
+
+    def finish(self) -> Optional[str]:
+        """
+        Signals the end of the stream.
+
+        Returns:
+            The final answer, parsed from the full text if no explicit final
+            answer line was completed while streaming.
+        """
+        if self.answer is None:
+            self.answer = self.parser.extract_answer(self.text)
+        return self.answer
@@ -0,0 +1,147 @@
+import json
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.reasoning.paths import ReasoningPaths
+from cognition_synthesis.telemetry.metrics import metrics
+
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchDataGenerator(DataGenerator):
+    """
+    Generates the fine-tuning dataset through the provider's Batch API.
+
+    Instead of one synchronous request per problem, every CoT prompt is
+    written to a batch input file, submitted once, and the results are
+    streamed back through parsing, verification and the usual output file
+    (and checkpoint) when the batch completes. This trades latency for the
+    Batch API's lower price and higher throughput limits.
+
+    Requires a synchronous `LLMClient`.
+    """
+
+    def write_requests(
+        self, request_file: str, problem_ids: Iterable[str], n_samples: int = 8
+    ) -> int:
+        """
+        Writes a Batch API input file with one sampling request per problem.
+
+        Problems already completed according to the checkpoint are skipped,
+        and partially sampled ones only request their missing samples.
+
+        Returns:
+            The number of requests written.
+        """
+        llm_client = self.self_consistency.llm_client
+        written = 0
+        with open(request_file, "w") as f:
+            for problem_id in problem_ids:
+                remaining = self._samples_remaining(problem_id, n_samples)
+                problem_data = self.problem_bank.get_problem(problem_id)
+                if not remaining or not problem_data:
+                    continue
+                prompt = self.prompt_manager.create_zero_shot_cot_prompt(
+                    problem_data["problem"]
+                )
+                done = n_samples - remaining
+                request = llm_client.batch_request(
+                    problem_id, prompt, remaining, sample_offset=done
+                )
+                f.write(json.dumps(request) + "\n")
+                written += 1
+        return written
+
+    def submit(self, request_file: str) -> str:
+        """Submits a batch input file, returning the batch ID."""
+        batch_id = self.self_consistency.llm_client.submit_batch(request_file)
+        print(f"Submitted batch '{batch_id}' from '{request_file}'.")
+        return batch_id
+
+    def wait(
+        self,
+        batch_id: str,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Polls a batch until it reaches a terminal status.
+
+        Raises:
+            TimeoutError: If the batch is still running after `timeout` seconds.
+        """
+        llm_client = self.self_consistency.llm_client
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            batch = llm_client.retrieve_batch(batch_id)
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Batch '{batch_id}' still '{batch.status}' after {timeout}s."
+                )
+            time.sleep(poll_interval)
+
+    def collect(self, batch: Any) -> Dict[str, int]:
+        """
+        Streams a finished batch's results through parsing and verification,
+        saving the correct paths.
+
+        Returns:
+            A mapping from problem ID to the number of correct paths saved.
+        """
+        llm_client = self.self_consistency.llm_client
+        results: Dict[str, int] = {}
+        if batch.status != "completed":
+            print(f"Batch '{batch.id}' ended with status '{batch.status}'.")
+
+        if batch.output_file_id:
+            for record in llm_client.iter_batch_file(batch.output_file_id):
+                problem_id = record["custom_id"]
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    print(f"Batch request for '{problem_id}' failed: {record.get('error')}")
+                    continue
+                problem_data = self._load_problem(problem_id)
+                if not problem_data:
+                    continue
+                with metrics.timer("parse"):
+                    paths = ReasoningPaths.parse(
+                        (
+                            choice["message"]["content"].strip()
+                            for choice in response["body"]["choices"]
+                        ),
+                        self.parser,
+                        self.self_consistency.spill_dir,
+                    )
+                results[problem_id] = self._save_correct_paths(
+                    problem_data, paths, len(paths)
+                )
+
+        if batch.error_file_id:
+            for record in llm_client.iter_batch_file(batch.error_file_id):
+                print(f"Batch request for '{record['custom_id']}' failed: {record.get('error')}")
+        self.flush()
+        return results
+
+    def run_batch(
+        self,
+        problem_ids: Iterable[str],
+        n_samples: int = 8,
+        request_file: str = "batch_requests.jsonl",
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """
+        Runs the whole batch pipeline: write, submit, wait and collect.
+
+        Returns:
+            A mapping from problem ID to the number of correct paths saved.
+        """
+        if not self.write_requests(request_file, problem_ids, n_samples):
+            print("Nothing to do: every problem is already complete.")
+            return {}
+        batch_id = self.submit(request_file)
+        batch = self.wait(batch_id, poll_interval, timeout)
+        return self.collect(batch)
@@ -0,0 +1,324 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.telemetry.metrics import metrics
+
+BUDGET_UNITS = ("samples", "requests", "tokens", "usd")
+
+
+class BudgetPlanner:
+    """
+    Spends a fixed API budget on the problems that yield the most verified
+    paths, instead of drawing the same number of samples for every problem.
+
+    Every problem first gets `initial_samples`. After that, the planner
+    repeatedly gives `step` more samples to the problems with the highest
+    estimated yield (verified paths saved per sample), until the budget is
+    spent or every problem is saturated. A problem is saturated once it has
+    `max_paths_per_problem` saved paths, has drawn `max_samples_per_problem`
+    samples, or its estimated yield falls below `min_yield`.
+
+    A problem's yield is estimated as its observed yield shrunk towards the
+    yield pooled over all problems, with the pooled yield acting as
+    `prior_strength` extra samples, so a problem with few samples is not
+    written off (or favored) on luck alone.
+    """
+
+    def __init__(
+        self,
+        generator: DataGenerator,
+        budget: float,
+        unit: str = "requests",
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        initial_samples: int = 2,
+        step: int = 2,
+        max_samples_per_problem: int = 32,
+        max_paths_per_problem: int = 8,
+        min_yield: float = 0.05,
+        prior_strength: float = 2.0,
+        verbose: bool = True,
+    ):
+        """
+        Initializes the BudgetPlanner.
+
+        Args:
+            generator: The generator that draws, verifies and saves paths. It
+                must use an `AsyncLLMClient`.
+            budget: How much may be spent, in `unit`s.
+            unit: "samples", "requests", "tokens" (prompt plus completion)
+                or "usd". Anything but "samples" is read from the client's
+                `usage` totals; "usd" also needs `prices`.
+            prices: Optional USD prices per million (prompt, completion)
+                tokens, keyed by model name, used for "usd" budgets and for
+                the yield per dollar in `report`.
+            initial_samples: The samples every problem gets first.
+            step: The samples given to a problem per allocation after that.
+            max_samples_per_problem: The most samples drawn for one problem.
+            max_paths_per_problem: The saved paths after which a problem is
+                saturated.
+            min_yield: The estimated yield below which a problem gets no
+                more samples.
+            prior_strength: How many samples the pooled yield counts as.
+            verbose: If True, print each allocation round.
+        """
+        if unit not in BUDGET_UNITS:
+            raise ValueError(f"Unknown budget unit '{unit}'; expected one of {BUDGET_UNITS}.")
+        if budget <= 0:
+            raise ValueError("budget must be positive.")
+        if initial_samples <= 0 or step <= 0:
+            raise ValueError("initial_samples and step must be positive integers.")
+        self.generator = generator
+        self.llm_client = generator.self_consistency.llm_client
+        self.budget = budget
+        self.unit = unit
+        self.prices = prices or {}
+        self.initial_samples = initial_samples
+        self.step = step
+        self.max_samples_per_problem = max_samples_per_problem
+        self.max_paths_per_problem = max_paths_per_problem
+        self.min_yield = min_yield
+        self.prior_strength = prior_strength
+        self.verbose = verbose
+
+        if unit != "samples" and getattr(self.llm_client, "usage", None) is None:
+            raise ValueError(f"A '{unit}' budget needs a client that tracks its usage.")
+        model = getattr(self.llm_client, "model", None)
+        if unit == "usd" and model not in self.prices:
+            raise ValueError(f"A 'usd' budget needs prices for '{model}'.")
+
+        self._start_usage = dict(getattr(self.llm_client, "usage", None) or {})
+        # Per-problem "drawn", "saved" and "expected" (saved paths predicted
+        # when samples were allocated), for this planner's run only
+        self.problems: Dict[str, Dict[str, float]] = {}
+        self._offsets: Dict[str, int] = {}
+        self._saturated: Dict[str, str] = {}
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _usage(self) -> Dict[str, int]:
+        """Returns the client's usage since the planner was created."""
+        usage = getattr(self.llm_client, "usage", None) or {}
+        return {k: v - self._start_usage.get(k, 0) for k, v in usage.items()}
+
+    def usd_spent(self) -> Optional[float]:
+        """Returns the USD spent so far, or None if the model has no price."""
+        model = getattr(self.llm_client, "model", None)
+        if model not in self.prices:
+            return None
+        prompt_price, completion_price = self.prices[model]
+        usage = self._usage()
+        return (
+            usage.get("prompt_tokens", 0) * prompt_price
+            + usage.get("completion_tokens", 0) * completion_price
+        ) / 1e6
+
+    def spent(self) -> float:
+        """Returns how much of the budget has been spent, in `unit`s."""
+        if self.unit == "samples":
+            return sum(p["drawn"] for p in self.problems.values())
+        if self.unit == "usd":
+            return self.usd_spent()
+        usage = self._usage()
+        if self.unit == "tokens":
+            return usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        return usage.get("requests", 0)
+
+    def pooled_yield(self) -> float:
+        """Returns the saved paths per sample over all problems (0.5 with no data)."""
+        drawn = sum(p["drawn"] for p in self.problems.values())
+        saved = sum(p["saved"] for p in self.problems.values())
+        return saved / drawn if drawn else 0.5
+
+    def estimate(self, problem_id: str) -> float:
+        """Returns the estimated yield of one more sample for a problem."""
+        problem = self.problems[problem_id]
+        prior = self.pooled_yield()
+        return (problem["saved"] + self.prior_strength * prior) / (
+            problem["drawn"] + self.prior_strength
+        )
+
+    def _samples_affordable(self) -> Optional[int]:
+        """
+        Returns roughly how many more samples the budget covers, from the
+        average cost per sample so far, or None before anything is known.
+        """
+        remaining = self.budget - self.spent()
+        if remaining <= 0:
+            return 0
+        drawn = sum(p["drawn"] for p in self.problems.values())
+        spent = self.spent()
+        if not drawn or not spent:
+            return None
+        return int(remaining / (spent / drawn))
+
+    def _check_saturation(self, problem_id: str):
+        problem = self.problems[problem_id]
+        reason = None
+        if problem["saved"] >= self.max_paths_per_problem:
+            reason = "enough paths"
+        elif problem["drawn"] >= self.max_samples_per_problem:
+            reason = "sample limit"
+        elif problem["drawn"] and self.estimate(problem_id) < self.min_yield:
+            reason = "low yield"
+        if reason:
+            self._saturated[problem_id] = reason
+
+    async def _sample(self, problem_id: str, n_samples: int):
+        """Draws samples for one problem and updates its statistics."""
+        problem = self.problems[problem_id]
+        expected = min(
+            n_samples * self.estimate(problem_id),
+            self.max_paths_per_problem - problem["saved"],
+        )
+        try:
+            drawn, saved = await self.generator.asample_more(
+                problem_id, n_samples, self._offsets[problem_id]
+            )
+        except Exception as e:
+            # One failing problem should not take down the whole plan
+            print(f"Error while generating data for '{problem_id}': {e}")
+            self._saturated[problem_id] = f"error: {type(e).__name__}"
+            return
+        problem["drawn"] += drawn
+        problem["saved"] += saved
+        problem["expected"] += expected
+        self._offsets[problem_id] += drawn
+        metrics.inc("budget_samples_total", drawn)
+        if not drawn:
+            # The API returned no samples; retrying would likely spend the budget for nothing
+            self._saturated[problem_id] = "no samples returned"
+        else:
+            self._check_saturation(problem_id)
+
+    async def _run_round(self, allocations: List[Tuple[str, int]]):
+        await asyncio.gather(*(self._sample(pid, n) for pid, n in allocations))
+        self.generator.flush()
+
+    def _allocate(
+        self, candidates: List[str], n_samples: int, limit: int
+    ) -> List[Tuple[str, int]]:
+        """Gives up to `limit` candidates `n_samples` each, within the budget."""
+        affordable = self._samples_affordable()
+        allocations = []
+        for problem_id in candidates[:limit]:
+            drawn = self.problems[problem_id]["drawn"]
+            n = min(n_samples, self.max_samples_per_problem - drawn)
+            if affordable is not None:
+                n = min(n, affordable)
+                affordable -= n
+            if n <= 0:
+                break
+            allocations.append((problem_id, n))
+        return allocations
+
+    async def arun(self, problem_ids: Iterable[str], concurrency: int = 8) -> Dict[str, int]:
+        """
+        Spends the budget on `problem_ids`, at most `concurrency` problems at
+        a time.
+
+        Returns:
+            A mapping from problem ID to the number of correct paths saved.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        # Only IDs and offsets are kept; each problem is read when it is sampled
+        for problem_id in problem_ids:
+            if problem_id not in self.generator.problem_bank:
+                print(f"Error: Problem with ID '{problem_id}' not found.")
+                continue
+            self.problems[problem_id] = {"drawn": 0, "saved": 0, "expected": 0.0}
+            self._offsets[problem_id] = self.generator.samples_done(problem_id)
+
+        # Explore: every problem gets a few samples, in rounds of `concurrency`
+        unexplored = list(self.problems)
+        while unexplored and self.spent() < self.budget:
+            allocations = self._allocate(unexplored, self.initial_samples, concurrency)
+            if not allocations:
+                break
+            del unexplored[: len(allocations)]
+            await self._run_round(allocations)
+
+        # Exploit: more samples where the estimated yield is highest
+        rounds = 0
+        while self.spent() < self.budget:
+            for problem_id in self.problems:
+                if problem_id not in self._saturated:
+                    self._check_saturation(problem_id)
+            candidates = sorted(
+                (
+                    p
+                    for p in self.problems
+                    if p not in self._saturated and self.problems[p]["drawn"]
+                ),
+                key=lambda p: (-self.estimate(p), self.problems[p]["drawn"]),
+            )
+            allocations = self._allocate(candidates, self.step, concurrency)
+            if not allocations:
+                break
+            rounds += 1
+            self._log(
+                f"Budget round {rounds}: {self.spent():g}/{self.budget:g} {self.unit} spent; "
+                f"sampling {', '.join(f'{p} (yield ~{self.estimate(p):.2f})' for p, _ in allocations)}"
+            )
+            await self._run_round(allocations)
+
+        report = self.report()
+        self._log(
+            f"Budget spent: {report['spent']:g}/{self.budget:g} {self.unit}; "
+            f"{report['actual_paths']} verified paths saved "
+            f"(expected {report['expected_paths']:.1f})."
+        )
+        return {problem_id: int(p["saved"]) for problem_id, p in self.problems.items()}
+
+    def run(
+        self, problem_ids: Optional[Iterable[str]] = None, concurrency: int = 8
+    ) -> Dict[str, int]:
+        """
+        Runs `arun` in its own event loop, over the whole problem bank by default.
+
+        This must not be called from async code; use `arun` there instead.
+        """
+        if problem_ids is None:
+            problem_ids = self.generator.problem_bank.ids()
+        return asyncio.run(self.arun(problem_ids, concurrency))
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarizes the plan: the spend, the saved paths the planner expected
+        against those actually saved, and both per dollar when prices are
+        known.
+
+        Returns:
+            A dict with "spent", "unit", "usd", "expected_paths",
+            "actual_paths", "expected_paths_per_usd", "actual_paths_per_usd"
+            and, under "problems", each problem's "drawn", "saved",
+            "expected", "yield" and (if it stopped early) "saturated" reason.
+        """
+        problems = {}
+        for problem_id, p in self.problems.items():
+            entry = {
+                "drawn": int(p["drawn"]),
+                "saved": int(p["saved"]),
+                "expected": round(p["expected"], 3),
+                "yield": p["saved"] / p["drawn"] if p["drawn"] else None,
+            }
+            if problem_id in self._saturated:
+                entry["saturated"] = self._saturated[problem_id]
+            problems[problem_id] = entry
+
+        expected = sum(p["expected"] for p in self.problems.values())
+        actual = int(sum(p["saved"] for p in self.problems.values()))
+        usd = self.usd_spent()
+        return {
+            "spent": self.spent(),
+            "unit": self.unit,
+            "usd": usd,
+            "expected_paths": expected,
+            "actual_paths": actual,
+            "expected_paths_per_usd": expected / usd if usd else None,
+            "actual_paths_per_usd": actual / usd if usd else None,
+            "problems": problems,
+        }
@@ -0,0 +1,95 @@
+import json
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+
+class Checkpoint:
+    """
+    An append-only manifest of the work a data-generation run has committed.
+
+    Each line records a problem ID, the number of samples drawn for it so far
+    (samples 0..n-1 are done), and the size of the output file once that
+    problem's paths were written. The last recorded size marks the end of the
+    committed output, so anything past it is a torn write from a crash and
+    can be safely discarded on resume.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the Checkpoint, loading any existing manifest at `path`.
+
+        Args:
+            path: The path of the manifest file.
+        """
+        self.path = path
+        self.samples_done: Dict[str, int] = {}
+        self.committed_offset = 0
+        # The end of the last complete line; anything after it is torn
+        self._valid_end = 0
+        self._load()
+
+    def _load(self):
+        for entry, end in self._entries():
+            self.samples_done[entry["problem_id"]] = entry["samples"]
+            self.committed_offset = entry["offset"]
+            self._valid_end = end
+
+    def _entries(self) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """Yields each complete entry with the byte offset where its line ends."""
+        if not os.path.exists(self.path):
+            return
+        end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from a crash mid-write; it was never committed
+                    return
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    return
+                end += len(line)
+                yield entry, end
+
+    def commits(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yields every commit as (problem_id, start, end): the byte range of
+        the output file holding the paths written for that problem.
+        """
+        start = 0
+        for entry, _ in self._entries():
+            yield entry["problem_id"], start, entry["offset"]
+            start = entry["offset"]
+
+    def samples_remaining(self, problem_id: str, n_samples: int) -> int:
+        """Returns how many of `n_samples` samples are still to be drawn for a problem."""
+        return max(0, n_samples - self.samples_done.get(problem_id, 0))
+
+    def record(self, problem_id: str, samples: int, offset: int):
+        """
+        Durably records that `samples` samples are done for a problem.
+
+        Args:
+            problem_id: The ID of the finished problem.
+            samples: The total number of samples drawn for it so far.
+            offset: The size of the output file after its paths were written.
+        """
+        entry = {"problem_id": problem_id, "samples": samples, "offset": offset}
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            if f.tell() > self._valid_end:
+                # Drop a torn line left by a crash, or this entry would extend it
+                f.truncate(self._valid_end)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.samples_done[problem_id] = samples
+        self.committed_offset = offset
+        self._valid_end += len(line)
+
+    def reset(self):
+        """Discards all recorded progress."""
+        open(self.path, "w").close()
+        self.samples_done = {}
+        self.committed_offset = 0
+        self._valid_end = 0
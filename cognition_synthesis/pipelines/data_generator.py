@@ -1,10 +1,17 @@
-import json
+import asyncio
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 
-from cognition_synthesis.llm.client import LLMClient
+from cognition_synthesis.llm.client import AsyncLLMClient, LLMClient
+from cognition_synthesis.pipelines.checkpoint import Checkpoint
+from cognition_synthesis.pipelines.dedup import PathDeduplicator
+from cognition_synthesis.pipelines.sinks import SINKS
 from cognition_synthesis.prompts.manager import PromptManager
+from cognition_synthesis.reasoning.paths import ReasoningPaths
 from cognition_synthesis.reasoning.self_consistency import SelfConsistency
 from cognition_synthesis.verification.verifier import Verifier, ProblemBank
 from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.telemetry.metrics import metrics
 
 
 class DataGenerator:
@@ -13,52 +20,311 @@ class DataGenerator:
     to select correct reasoning paths from an LLM.
     """
 
-    def __init__(self, llm_client: LLMClient, output_file: str):
+    def __init__(
+        self,
+        llm_client: Union[LLMClient, AsyncLLMClient],
+        output_file: str,
+        checkpoint_file: Optional[str] = None,
+        resume: bool = True,
+        problem_bank: Optional[ProblemBank] = None,
+        verbose: bool = True,
+        output_format: str = "jsonl",
+        deduplicator: Optional[PathDeduplicator] = None,
+        sample_batch_size: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initializes the DataGenerator.
+
+        Args:
+            llm_client: The client used to sample reasoning paths.
+            output_file: The JSONL file that correct paths are appended to.
+            checkpoint_file: An optional manifest of completed work. When set,
+                every problem's paths are committed together with a manifest
+                entry, so an interrupted run can be resumed.
+            resume: If True, skip the work recorded in `checkpoint_file` and
+                discard any uncommitted output. If False, start from scratch,
+                clearing both the output file and the checkpoint.
+            problem_bank: The problems to draw from; the built-in set by default.
+            verbose: If True, print per-problem and per-path progress.
+            output_format: "jsonl" for one JSON object per path, or "compact"
+                for compressed blocks that store each problem's text once
+                (see `sinks.CompactSink`).
+            deduplicator: If set, verified paths that duplicate or nearly
+                duplicate a path already kept for the same problem are
+                dropped before writing.
+            sample_batch_size: If set, draw at most this many samples per
+                request, bounding the raw responses held at once.
+            spill_dir: If set, large sets of sampled responses are spilled to
+                a temporary file in this directory while they are verified.
+        """
+        if output_format not in SINKS:
+            raise ValueError(
+                f"Unknown output_format '{output_format}'; expected one of {sorted(SINKS)}."
+            )
         self.prompt_manager = PromptManager()
         self.parser = AnswerParser()
-        self.self_consistency = SelfConsistency(llm_client, self.parser)
-        self.problem_bank = ProblemBank()
+        self.self_consistency = SelfConsistency(
+            llm_client,
+            self.parser,
+            verbose,
+            batch_size=sample_batch_size,
+            spill_dir=spill_dir,
+        )
+        self.verbose = verbose
+        self.problem_bank = problem_bank or ProblemBank()
         self.verifier = Verifier()
         self.output_file = output_file
+        self.checkpoint = Checkpoint(checkpoint_file) if checkpoint_file else None
+        self.sink = SINKS[output_format](output_file)
+        self.deduplicator = deduplicator
 
-    def run(self, problem_id: str, n_samples: int = 8):
+        if self.checkpoint:
+            if resume:
+                self._discard_uncommitted_output()
+            else:
+                open(self.output_file, "w").close()
+                self.checkpoint.reset()
+
+    def run(self, problem_id: str, n_samples: int = 8) -> int:
         """
         Runs the data generation pipeline for a single problem.
+
+        Returns:
+            The number of correct reasoning paths saved.
+        """
+        remaining = self._samples_remaining(problem_id, n_samples)
+        if not remaining:
+            return 0
+
+        problem_data = self._load_problem(problem_id)
+        if not problem_data:
+            return 0
+
+        cot_prompt = self.prompt_manager.create_zero_shot_cot_prompt(
+            problem_data["problem"]
+        )
+
+        # We don't need the final answer from self_consistency, just the parsed paths
+        _, paths = self.self_consistency.sample(
+            cot_prompt, remaining, self.samples_done(problem_id)
+        )
+
+        correct_paths = self._save_correct_paths(problem_data, paths, remaining)
+        self.flush()
+        return correct_paths
+
+    async def arun(self, problem_id: str, n_samples: int = 8) -> int:
+        """
+        Async version of `run`, for use with an `AsyncLLMClient`.
+        """
+        correct_paths = await self._arun(problem_id, n_samples)
+        self.flush()
+        return correct_paths
+
+    async def _arun(self, problem_id: str, n_samples: int) -> int:
+        """Runs one problem without flushing, so `arun_many` can batch writes."""
+        remaining = self._samples_remaining(problem_id, n_samples)
+        if not remaining:
+            return 0
+
+        problem_data = self._load_problem(problem_id)
+        if not problem_data:
+            return 0
+
+        _, saved = await self._asample(
+            problem_data, remaining, self.samples_done(problem_id)
+        )
+        return saved
+
+    async def asample_more(
+        self, problem_id: str, n_samples: int, sample_offset: int
+    ) -> Tuple[int, int]:
+        """
+        Draws `n_samples` more paths for a problem, starting at sample
+        `sample_offset`, and saves the correct ones without flushing. Unlike
+        `arun`, this ignores how many samples the checkpoint has recorded,
+        so callers such as `BudgetPlanner` decide how many to draw.
+
+        Returns:
+            The number of paths actually drawn (the API may return fewer)
+            and the number saved.
+
+        Raises:
+            KeyError: If the problem is not in the problem bank.
         """
         problem_data = self.problem_bank.get_problem(problem_id)
         if not problem_data:
-            print(f"Error: Problem with ID '{problem_id}' not found.")
-            return
+            raise KeyError(f"Problem with ID '{problem_id}' not found.")
+        return await self._asample(problem_data, n_samples, sample_offset)
 
-        problem = problem_data["problem"]
-        ground_truth = problem_data["ground_truth_answer"]
+    async def _asample(
+        self, problem_data: Dict[str, Any], n_samples: int, sample_offset: int
+    ) -> Tuple[int, int]:
+        """Draws and saves paths for an already loaded problem; see `asample_more`."""
+        cot_prompt = self.prompt_manager.create_zero_shot_cot_prompt(
+            problem_data["problem"]
+        )
+        _, paths = await self.self_consistency.asample(cot_prompt, n_samples, sample_offset)
+        drawn = len(paths)
+        saved = self._save_correct_paths(problem_data, paths, n_samples)
+        return drawn, saved
 
-        print(f"\n--- Generating dataset for problem: {problem_id} ---")
-        print(f"Problem: {problem}")
-        print(f"Ground Truth Answer: {ground_truth}\n")
+    async def arun_many(
+        self, problem_ids: Iterable[str], n_samples: int = 8, concurrency: int = 8
+    ) -> Dict[str, int]:
+        """
+        Runs the pipeline for many problems concurrently.
+
+        A producer feeds problem IDs into a bounded queue drained by a fixed
+        pool of workers, so `problem_ids` may be a lazy iterable of any size
+        and at most `concurrency` problems are in progress at any time.
+        Correct paths are appended to the output file as each problem finishes.
+
+        Args:
+            problem_ids: The IDs of the problems to process.
+            n_samples: The number of reasoning paths to sample per problem.
+            concurrency: The number of problems to process at once.
+
+        Returns:
+            A mapping from problem ID to the number of correct paths saved.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        results: Dict[str, int] = {}
+
+        async def produce():
+            for problem_id in problem_ids:
+                # Blocks while the queue is full, applying backpressure
+                await queue.put(problem_id)
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                problem_id = await queue.get()
+                if problem_id is None:
+                    return
+                try:
+                    results[problem_id] = await self._arun(problem_id, n_samples)
+                except Exception as e:
+                    # One failing problem should not take down the whole batch
+                    print(f"Error while generating data for '{problem_id}': {e}")
+                    results[problem_id] = 0
+
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+        self.flush()
+        return results
+
+    def run_all(self, n_samples: int = 8, concurrency: int = 8) -> Dict[str, int]:
+        """
+        Runs the pipeline concurrently for every problem in the problem bank.
+
+        This starts its own event loop, so it must not be called from async
+        code; use `arun_many` there instead.
+        """
+        return asyncio.run(
+            self.arun_many(self.problem_bank.ids(), n_samples, concurrency)
+        )
 
-        cot_prompt = self.prompt_manager.create_zero_shot_cot_prompt(problem)
+    def flush(self):
+        """Writes any buffered output to the output file."""
+        with metrics.timer("write"):
+            self.sink.flush()
 
-        # We don't need the final answer from self_consistency, just the raw paths
-        _, raw_responses = self.self_consistency.reason(cot_prompt, n_samples)
+    def close(self):
+        """Flushes buffered output and closes the output file."""
+        self.sink.close()
 
-        correct_paths = 0
-        with open(self.output_file, "a") as f:
-            for response in raw_responses:
-                extracted_answer = self.parser.extract_answer(response)
+    def samples_done(self, problem_id: str) -> int:
+        """Returns how many samples the checkpoint records for a problem (0 without one)."""
+        return self.checkpoint.samples_done.get(problem_id, 0) if self.checkpoint else 0
 
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _discard_uncommitted_output(self):
+        """Truncates the output file back to the last checkpointed offset."""
+        committed = self.checkpoint.committed_offset
+        size = os.path.getsize(self.output_file) if os.path.exists(self.output_file) else 0
+        if size < committed:
+            raise ValueError(
+                f"Output file '{self.output_file}' is smaller than its checkpoint "
+                f"records; delete '{self.checkpoint.path}' to start a fresh run."
+            )
+        if size > committed:
+            with open(self.output_file, "r+b") as f:
+                f.truncate(committed)
+
+    def _samples_remaining(self, problem_id: str, n_samples: int) -> int:
+        """Returns how many samples still need to be drawn, announcing skips."""
+        if not self.checkpoint:
+            return n_samples
+        remaining = self.checkpoint.samples_remaining(problem_id, n_samples)
+        if not remaining:
+            self._log(f"Skipping problem '{problem_id}': already completed.")
+        return remaining
+
+    def _load_problem(self, problem_id: str) -> Optional[Dict[str, Any]]:
+        """Looks up a problem in the bank and announces it."""
+        problem_data = self.problem_bank.get_problem(problem_id)
+        if not problem_data:
+            print(f"Error: Problem with ID '{problem_id}' not found.")
+            return None
+
+        self._log(f"\n--- Generating dataset for problem: {problem_id} ---")
+        self._log(f"Problem: {problem_data['problem']}")
+        self._log(f"Ground Truth Answer: {problem_data['ground_truth_answer']}\n")
+        return problem_data
+
+    def _save_correct_paths(
+        self, problem_data: Dict[str, Any], paths: ReasoningPaths, n_samples: int
+    ) -> int:
+        """
+        Verifies each reasoning path and appends the correct ones to the
+        output file, then releases the paths.
+        """
+        ground_truth = problem_data["ground_truth_answer"]
+        drawn = len(paths)
+
+        correct_responses = []
+        with metrics.timer("verify"):
+            # The answers were extracted once, when the paths were sampled
+            for path in paths:
                 # Use the verifier to check correctness
-                if self.verifier.verify(extracted_answer, ground_truth):
-                    correct_paths += 1
-                    # Format the data point as a JSON object for fine-tuning
-                    data_point = {
-                        "problem": problem,
-                        "reasoning_path": response,
-                    }
-                    # Write the JSON object as a single line in the output file
-                    f.write(json.dumps(data_point) + "\n")
-
-        print(
+                if self.verifier.verify(path.answer, ground_truth):
+                    correct_responses.append(path.response)
+        paths.close()
+        if self.deduplicator:
+            with metrics.timer("dedup"):
+                correct_responses = self.deduplicator.filter(
+                    problem_data["id"], correct_responses
+                )
+            stats = self.deduplicator.stats(problem_data["id"])
+            self._log(
+                f"Kept {stats['kept']}/{stats['candidates']} distinct paths so far "
+                f"({stats['exact_duplicates']} exact and "
+                f"{stats['near_duplicates']} near duplicates dropped)."
+            )
+
+        correct_paths = len(correct_responses)
+        metrics.inc("paths_sampled_total", drawn)
+        metrics.inc("paths_verified_total", correct_paths)
+        with metrics.timer("write"):
+            self.sink.write(problem_data, correct_responses)
+            if self.checkpoint and drawn:
+                # Commit the paths durably before recording them as done
+                offset = self.sink.commit()
+                # Count only the samples actually drawn, so failed requests are retried
+                problem_id = problem_data["id"]
+                samples = self.checkpoint.samples_done.get(problem_id, 0)
+                self.checkpoint.record(problem_id, samples + drawn, offset)
+
+        self._log(
             f"\nFinished. Found and saved {correct_paths}/{n_samples} correct reasoning paths to '{self.output_file}'."
         )
-        print("-------------------------------------------------")
+        self._log("-------------------------------------------------")
+        return correct_paths
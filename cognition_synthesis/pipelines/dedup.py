@@ -0,0 +1,121 @@
+import hashlib
+import heapq
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from cognition_synthesis.telemetry.metrics import metrics
+
+
+def _hash64(data: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class _ProblemIndex:
+    """The kept paths' fingerprints and the dedup counts for one problem."""
+
+    __slots__ = ("exact", "sketches", "stats")
+
+    def __init__(self):
+        self.exact: Set[bytes] = set()
+        self.sketches: List[List[int]] = []
+        self.stats = {"candidates": 0, "exact_duplicates": 0, "near_duplicates": 0, "kept": 0}
+
+
+class PathDeduplicator:
+    """
+    Drops reasoning paths that repeat, or nearly repeat, a path already kept
+    for the same problem.
+
+    Exact duplicates are detected by hashing each path after lowercasing and
+    collapsing whitespace. Near duplicates are detected with bottom-k MinHash
+    sketches of word shingles: two paths whose estimated Jaccard similarity
+    reaches `threshold` count as the same path.
+
+    Memory is bounded: each kept path costs one hash and a sketch of at most
+    `sketch_size` integers, and only the `max_problems` most recently seen
+    problems are indexed (older ones are evicted, least recently used first).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        sketch_size: int = 64,
+        max_problems: int = 10_000,
+    ):
+        """
+        Initializes the PathDeduplicator.
+
+        Args:
+            threshold: The estimated Jaccard similarity at which two paths
+                are considered near duplicates, in (0, 1].
+            shingle_size: The number of consecutive words per shingle.
+            sketch_size: The number of minimum hashes kept per path; larger
+                sketches give more accurate similarity estimates.
+            max_problems: The number of problems whose paths are indexed.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.sketch_size = sketch_size
+        self.max_problems = max_problems
+        self._problems: "OrderedDict[str, _ProblemIndex]" = OrderedDict()
+
+    def filter(self, problem_id: str, reasoning_paths: List[str]) -> List[str]:
+        """
+        Returns the paths that are not duplicates of each other or of paths
+        already kept for `problem_id`, remembering the ones kept.
+        """
+        index = self._problems.get(problem_id)
+        if index is None:
+            index = self._problems[problem_id] = _ProblemIndex()
+            if len(self._problems) > self.max_problems:
+                self._problems.popitem(last=False)
+        else:
+            self._problems.move_to_end(problem_id)
+
+        kept = []
+        for path in reasoning_paths:
+            index.stats["candidates"] += 1
+            words = path.lower().split()
+            digest = hashlib.blake2b(" ".join(words).encode("utf-8")).digest()
+            if digest in index.exact:
+                index.stats["exact_duplicates"] += 1
+                metrics.inc("paths_deduplicated_total", kind="exact")
+                continue
+
+            sketch = self.sketch(words)
+            if any(self.similarity(sketch, other) >= self.threshold for other in index.sketches):
+                index.stats["near_duplicates"] += 1
+                metrics.inc("paths_deduplicated_total", kind="near")
+                continue
+
+            index.exact.add(digest)
+            index.sketches.append(sketch)
+            index.stats["kept"] += 1
+            kept.append(path)
+        return kept
+
+    def stats(self, problem_id: str) -> Optional[Dict[str, int]]:
+        """Returns a problem's diversity stats, or None if it is not indexed."""
+        index = self._problems.get(problem_id)
+        return dict(index.stats) if index else None
+
+    def sketch(self, words: List[str]) -> List[int]:
+        """Returns the bottom-k MinHash sketch of a path's word shingles."""
+        size = self.shingle_size
+        shingles = {
+            " ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))
+        }
+        return sorted(heapq.nsmallest(self.sketch_size, map(_hash64, shingles)))
+
+    def similarity(self, a: List[int], b: List[int]) -> float:
+        """Estimates the Jaccard similarity of two paths from their sketches."""
+        if not a or not b:
+            return 1.0 if a == b else 0.0
+        union = heapq.nsmallest(self.sketch_size, set(a).union(b))
+        both = set(a).intersection(b)
+        return sum(h in both for h in union) / len(union)
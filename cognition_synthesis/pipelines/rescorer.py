@@ -0,0 +1,193 @@
+"""
+Re-scores an existing corpus of reasoning paths without calling the LLM.
+
+Usage:
+    python -m cognition_synthesis.pipelines.rescorer INPUT OUTPUT
+        [--problems problems.jsonl] [--processes N] [--chunk-size 1000]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing.pool import AsyncResult
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.verification.verifier import ProblemBank, Verifier
+
+# Per-process state, set up once by `_init_worker` in each pool process
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(
+    parser: AnswerParser,
+    verifier: Verifier,
+    bank_path: Optional[str],
+    bank_problems: Optional[List[Dict[str, Any]]],
+):
+    """Builds each worker's parser, verifier and problem bank."""
+    _worker["parser"] = parser
+    _worker["verifier"] = verifier
+    # A file-backed bank holds an mmap, so each worker re-indexes the file
+    _worker["problem_bank"] = ProblemBank(bank_path, bank_problems)
+
+
+def _score_chunk(chunk: bytes) -> Tuple[bytes, int, int, int]:
+    """
+    Scores a chunk of JSONL records in a worker process.
+
+    Returns:
+        The output lines, and the number of records, correct records and
+        records whose problem could not be found.
+    """
+    parser: AnswerParser = _worker["parser"]
+    verifier: Verifier = _worker["verifier"]
+    problem_bank: ProblemBank = _worker["problem_bank"]
+
+    records = [json.loads(line) for line in chunk.splitlines() if line.strip()]
+    responses = [r.get("response", r.get("reasoning_path", "")) for r in records]
+    answers = parser.extract_answers(responses)
+
+    lines = []
+    correct = missing = 0
+    for record, answer in zip(records, answers):
+        ground_truth = record.get("ground_truth_answer")
+        if ground_truth is None:
+            problem = problem_bank.get_problem(record.get("problem_id"))
+            ground_truth = problem["ground_truth_answer"] if problem else None
+        if ground_truth is None:
+            missing += 1
+            is_correct = False
+        else:
+            is_correct = verifier.verify(answer, ground_truth)
+            correct += is_correct
+        record["extracted_answer"] = answer
+        record["is_correct"] = is_correct
+        lines.append(json.dumps(record) + "\n")
+    return "".join(lines).encode("utf-8"), len(records), correct, missing
+
+
+class Rescorer:
+    """
+    Re-runs answer extraction and verification over a JSONL corpus of
+    reasoning paths, using a process pool.
+
+    Each input record needs a "response" (or "reasoning_path") and either a
+    "ground_truth_answer" or a "problem_id" to look up in the problem bank.
+    The output file receives every input record, in input order, with
+    "extracted_answer" and "is_correct" added.
+
+    The input is read in chunks of lines and at most `max_pending` chunks
+    are in flight at once, so memory stays bounded regardless of file size.
+    """
+
+    def __init__(
+        self,
+        parser: Optional[AnswerParser] = None,
+        verifier: Optional[Verifier] = None,
+        problem_bank: Optional[ProblemBank] = None,
+        processes: Optional[int] = None,
+        chunk_size: int = 1000,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Initializes the Rescorer.
+
+        Args:
+            parser: The answer parser to apply; a default AnswerParser if None.
+            verifier: The verifier to apply; a default Verifier if None.
+            problem_bank: Where to look up ground truth answers by problem ID.
+            processes: The number of worker processes (all CPUs by default).
+            chunk_size: The number of records sent to a worker at a time.
+            max_pending: The number of chunks in flight at once (twice the
+                number of processes by default).
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+        self.parser = parser or AnswerParser()
+        self.verifier = verifier or Verifier()
+        self.problem_bank = problem_bank or ProblemBank()
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or self.processes * 2
+
+    def _chunks(self, input_file: str) -> Iterator[bytes]:
+        """Yields the input file as chunks of `chunk_size` raw lines."""
+        with open(input_file, "rb") as f:
+            lines = []
+            for line in f:
+                lines.append(line)
+                if len(lines) == self.chunk_size:
+                    yield b"".join(lines)
+                    lines = []
+            if lines:
+                yield b"".join(lines)
+
+    def run(self, input_file: str, output_file: str) -> Dict[str, int]:
+        """
+        Re-scores `input_file` into `output_file`.
+
+        Returns:
+            The number of records, correct records and records whose problem
+            could not be found (which are marked incorrect).
+        """
+        bank = self.problem_bank
+        initargs = (
+            self.parser,
+            self.verifier,
+            bank.path,
+            bank.problems if bank.path is None else None,
+        )
+        stats = {"records": 0, "correct": 0, "missing_problems": 0}
+
+        def write(result, out):
+            data, records, correct, missing = result.get()
+            out.write(data)
+            stats["records"] += records
+            stats["correct"] += correct
+            stats["missing_problems"] += missing
+
+        with multiprocessing.Pool(self.processes, _init_worker, initargs) as pool:
+            with open(output_file, "wb") as out:
+                # Pool.imap would read the whole input ahead, so keep a bounded
+                # window of pending chunks and write them back in order
+                pending: Deque[AsyncResult] = deque()
+                for chunk in self._chunks(input_file):
+                    if len(pending) >= self.max_pending:
+                        write(pending.popleft(), out)
+                    pending.append(pool.apply_async(_score_chunk, (chunk,)))
+                while pending:
+                    write(pending.popleft(), out)
+        return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("input", help="The JSONL file of reasoning paths to score.")
+    arg_parser.add_argument("output", help="Where to write the scored JSONL records.")
+    arg_parser.add_argument(
+        "--problems", help="A JSONL problem bank to look up ground truth answers in."
+    )
+    arg_parser.add_argument(
+        "--processes", type=int, help="The number of worker processes (default: all CPUs)."
+    )
+    arg_parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Records per worker task."
+    )
+    args = arg_parser.parse_args(argv)
+
+    problem_bank = ProblemBank(args.problems) if args.problems else None
+    rescorer = Rescorer(
+        problem_bank=problem_bank, processes=args.processes, chunk_size=args.chunk_size
+    )
+    stats = rescorer.run(args.input, args.output)
+    print(
+        f"Scored {stats['records']} records: {stats['correct']} correct, "
+        f"{stats['missing_problems']} with unknown problems. Wrote '{args.output}'."
+    )
+
+
+if __name__ == "__main__":
+    main()
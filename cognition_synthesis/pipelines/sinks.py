@@ -0,0 +1,245 @@
+"""
+Output sinks for generated training data, and a converter from the compact
+format back to JSONL.
+
+Usage:
+    python -m cognition_synthesis.pipelines.sinks INPUT.csd OUTPUT.jsonl
+"""
+
+import argparse
+import json
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+COMPACT_MAGIC = b"CSD1"
+_BLOCK_HEADER = struct.Struct(">I")
+
+
+class OutputSink(ABC):
+    """
+    Buffers verified reasoning paths and appends them to an output file.
+
+    Records are kept in memory until `flush` (or until `buffer_bytes` is
+    exceeded), then written with a single append. `commit` additionally
+    fsyncs and returns the file size, which the checkpoint records as the
+    end of the committed output.
+    """
+
+    def __init__(self, path: str, buffer_bytes: int = 1 << 20):
+        """
+        Initializes the OutputSink.
+
+        Args:
+            path: The file to append to.
+            buffer_bytes: Roughly how much data to buffer before writing.
+        """
+        self.path = path
+        self.buffer_bytes = buffer_bytes
+        self._file: Optional[BinaryIO] = None
+        self._buffered = 0
+
+    def write(self, problem_data: Dict[str, Any], reasoning_paths: List[str]):
+        """Buffers the verified paths for one problem."""
+        if reasoning_paths:
+            self._buffered += self._add(problem_data, reasoning_paths)
+            if self._buffered >= self.buffer_bytes:
+                self.flush()
+
+    def flush(self):
+        """Writes any buffered records to the file."""
+        data = self._drain() if self._buffered else b""
+        self._buffered = 0
+        f = self._open()
+        if data:
+            f.write(data)
+        f.flush()
+
+    def commit(self) -> int:
+        """
+        Flushes and fsyncs the file.
+
+        Returns:
+            The size of the output file after the write.
+        """
+        self.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        """Flushes any buffered records and closes the file."""
+        if self._file is not None or self._buffered:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> BinaryIO:
+        # Opened lazily, so the generator can truncate torn output on resume first
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    @abstractmethod
+    def _add(self, problem_data: Dict[str, Any], reasoning_paths: List[str]) -> int:
+        """Adds records to the buffer, returning roughly how many bytes they take."""
+
+    @abstractmethod
+    def _drain(self) -> bytes:
+        """Returns the encoded buffer and empties it."""
+
+
+class JsonlSink(OutputSink):
+    """Writes one `{"problem", "reasoning_path"}` JSON object per line."""
+
+    def __init__(self, path: str, buffer_bytes: int = 1 << 20):
+        super().__init__(path, buffer_bytes)
+        self._lines: List[str] = []
+
+    def _add(self, problem_data: Dict[str, Any], reasoning_paths: List[str]) -> int:
+        size = 0
+        for path in reasoning_paths:
+            line = json.dumps({"problem": problem_data["problem"], "reasoning_path": path})
+            self._lines.append(line + "\n")
+            size += len(line) + 1
+        return size
+
+    def _drain(self) -> bytes:
+        data = "".join(self._lines).encode("utf-8")
+        self._lines = []
+        return data
+
+
+class CompactSink(OutputSink):
+    """
+    Writes compressed, columnar blocks in which each problem's text appears
+    only once.
+
+    The file starts with `COMPACT_MAGIC`. Each block is a 4-byte big-endian
+    length followed by that many bytes of zlib-compressed JSON:
+    `{"ids": [...], "problems": [...], "index": [...], "paths": [...]}`,
+    where `index[i]` is the position in `ids`/`problems` of the problem that
+    `paths[i]` solves. Blocks are self-contained, so a file can be read as a
+    stream and truncated at any block boundary.
+    """
+
+    def __init__(self, path: str, buffer_bytes: int = 1 << 20, level: int = 6):
+        """
+        Initializes the CompactSink.
+
+        Args:
+            path: The file to append to.
+            buffer_bytes: Roughly how much uncompressed text to put in a block.
+            level: The zlib compression level.
+        """
+        super().__init__(path, buffer_bytes)
+        self.level = level
+        self._ids: List[str] = []
+        self._problems: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._index: List[int] = []
+        self._paths: List[str] = []
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            super()._open()
+            if self._file.tell() == 0:
+                self._file.write(COMPACT_MAGIC)
+        return self._file
+
+    def _add(self, problem_data: Dict[str, Any], reasoning_paths: List[str]) -> int:
+        problem_id = problem_data["id"]
+        size = sum(len(p) for p in reasoning_paths)
+        position = self._positions.get(problem_id)
+        if position is None:
+            position = self._positions[problem_id] = len(self._ids)
+            self._ids.append(problem_id)
+            self._problems.append(problem_data["problem"])
+            size += len(problem_data["problem"])
+        self._index.extend([position] * len(reasoning_paths))
+        self._paths.extend(reasoning_paths)
+        return size
+
+    def _drain(self) -> bytes:
+        block = json.dumps(
+            {
+                "ids": self._ids,
+                "problems": self._problems,
+                "index": self._index,
+                "paths": self._paths,
+            }
+        ).encode("utf-8")
+        self._ids, self._problems, self._index, self._paths = [], [], [], []
+        self._positions = {}
+        compressed = zlib.compress(block, self.level)
+        return _BLOCK_HEADER.pack(len(compressed)) + compressed
+
+
+SINKS = {"jsonl": JsonlSink, "compact": CompactSink}
+
+
+def read_compact(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Streams the records of a compact file, one block in memory at a time.
+
+    Yields:
+        Dicts with "problem_id", "problem" and "reasoning_path" keys.
+
+    Raises:
+        ValueError: If the file is not in the compact format or ends in a
+            partially written block.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(COMPACT_MAGIC))
+        if magic and magic != COMPACT_MAGIC:
+            raise ValueError(f"'{path}' is not a compact training data file.")
+        while True:
+            header = f.read(_BLOCK_HEADER.size)
+            if not header:
+                return
+            data = f.read(_BLOCK_HEADER.unpack(header)[0]) if len(header) == 4 else b""
+            try:
+                block = json.loads(zlib.decompress(data))
+            except zlib.error:
+                raise ValueError(f"'{path}' ends in a truncated block.") from None
+            ids, problems = block["ids"], block["problems"]
+            for i, reasoning_path in zip(block["index"], block["paths"]):
+                yield {
+                    "problem_id": ids[i],
+                    "problem": problems[i],
+                    "reasoning_path": reasoning_path,
+                }
+
+
+def compact_to_jsonl(input_path: str, output_path: str) -> int:
+    """
+    Converts a compact file to the JSONL format `JsonlSink` writes.
+
+    Returns:
+        The number of records converted.
+    """
+    count = 0
+    with open(output_path, "w") as out:
+        for record in read_compact(input_path):
+            data_point = {
+                "problem": record["problem"],
+                "reasoning_path": record["reasoning_path"],
+            }
+            out.write(json.dumps(data_point) + "\n")
+            count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("input", help="The compact file to convert.")
+    arg_parser.add_argument("output", help="Where to write the JSONL records.")
+    args = arg_parser.parse_args(argv)
+
+    count = compact_to_jsonl(args.input, args.output)
+    print(f"Converted {count} records to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List
+
+from cognition_synthesis.pipelines.checkpoint import Checkpoint
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.pipelines.sinks import COMPACT_MAGIC
+
+
+class WorkQueue:
+    """
+    A shared queue of problem IDs that workers lease, backed by a SQLite file.
+
+    A lease lasts `lease_seconds` unless renewed. Problems whose lease
+    expires (because the worker died or stalled) are delivered again, up to
+    `max_attempts` times in total, after which they are marked failed. Only
+    the current lease holder can complete a problem, so a stalled worker
+    that finishes late cannot double-count it.
+
+    The database can live on any filesystem every worker can reach with
+    working file locks; all state changes are single SQLite transactions.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600.0, max_attempts: int = 3):
+        """
+        Initializes the WorkQueue, creating the database if needed.
+
+        Args:
+            path: The SQLite database file.
+            lease_seconds: How long a lease lasts without a heartbeat.
+            max_attempts: How many times a problem is delivered before it is
+                marked failed.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode; transactions are opened explicitly where needed
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "problem_id TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'pending', "
+            "worker TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "result INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            "worker_id TEXT PRIMARY KEY, output_file TEXT NOT NULL, "
+            "checkpoint_file TEXT NOT NULL, output_format TEXT NOT NULL)"
+        )
+
+    def enqueue(self, problem_ids: Iterable[str]) -> int:
+        """
+        Adds problems to the queue, ignoring ones already present.
+
+        Returns:
+            The number of problems added.
+        """
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (problem_id) VALUES (?)",
+                ((problem_id,) for problem_id in problem_ids),
+            )
+            return self.conn.total_changes - before
+
+    def register(self, worker_id: str, output_file: str, checkpoint_file: str, output_format: str):
+        """Records where a worker writes its output, for `merge`."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO workers VALUES (?, ?, ?, ?)",
+                (worker_id, output_file, checkpoint_file, output_format),
+            )
+
+    def lease(self, worker_id: str, n: int = 1) -> List[str]:
+        """
+        Leases up to `n` problems that are pending or whose lease expired.
+
+        Returns:
+            The leased problem IDs (empty if nothing is available right now).
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts will not be retried
+            self.conn.execute(
+                "UPDATE tasks SET state = 'failed', worker = NULL "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT problem_id FROM tasks WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) ORDER BY rowid LIMIT ?",
+                (now, n),
+            ).fetchall()
+            problem_ids = [row[0] for row in rows]
+            self.conn.executemany(
+                "UPDATE tasks SET state = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE problem_id = ?",
+                ((worker_id, now + self.lease_seconds, pid) for pid in problem_ids),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return problem_ids
+
+    def heartbeat(self, worker_id: str, problem_ids: Iterable[str]):
+        """Renews this worker's leases on `problem_ids`."""
+        expires = time.time() + self.lease_seconds
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE problem_id = ? AND worker = ? AND state = 'leased'",
+                ((expires, pid, worker_id) for pid in problem_ids),
+            )
+
+    def complete(self, worker_id: str, problem_id: str, result: int) -> bool:
+        """
+        Marks a problem done, if this worker still holds its lease.
+
+        Returns:
+            False if the lease was lost (the problem belongs to another worker).
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = 'done', result = ? "
+                "WHERE problem_id = ? AND worker = ? AND state = 'leased'",
+                (result, problem_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, worker_id: str, problem_id: str):
+        """Gives up a lease after a failure, so the problem is retried (or failed)."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' "
+                "ELSE 'pending' END, worker = NULL, lease_expires = NULL "
+                "WHERE problem_id = ? AND worker = ? AND state = 'leased'",
+                (self.max_attempts, problem_id, worker_id),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of problems in each state."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for state, count in self.conn.execute(
+            "SELECT state, COUNT(*) FROM tasks GROUP BY state"
+        ):
+            counts[state] = count
+        return counts
+
+    def is_finished(self) -> bool:
+        """Returns True once no problem is pending or leased."""
+        stats = self.stats()
+        return not stats["pending"] and not stats["leased"]
+
+    def merge(self, merged_file: str) -> int:
+        """
+        Concatenates the registered workers' outputs into one file.
+
+        Each worker's checkpoint maps byte ranges of its output file to
+        problems. A range is kept only if that worker completed the problem
+        in the queue, so problems that were re-delivered after a lost lease
+        appear exactly once.
+
+        Returns:
+            The number of problems whose output was merged.
+        """
+        owners = dict(
+            self.conn.execute("SELECT problem_id, worker FROM tasks WHERE state = 'done'")
+        )
+        workers = self.conn.execute(
+            "SELECT worker_id, output_file, checkpoint_file, output_format "
+            "FROM workers ORDER BY worker_id"
+        ).fetchall()
+        if len({row[3] for row in workers}) > 1:
+            raise ValueError("Workers wrote different output formats; merge them separately.")
+        # Compact files start with a header, which the merged file needs only once
+        compact = bool(workers) and workers[0][3] == "compact"
+
+        merged = set()
+        with open(merged_file, "wb") as out:
+            if compact:
+                out.write(COMPACT_MAGIC)
+            for worker_id, output_file, checkpoint_file, _ in workers:
+                if not os.path.exists(checkpoint_file):
+                    continue
+                with open(output_file, "rb") as f:
+                    for problem_id, start, end in Checkpoint(checkpoint_file).commits():
+                        if owners.get(problem_id) != worker_id:
+                            continue
+                        if compact:
+                            start = max(start, len(COMPACT_MAGIC))
+                        f.seek(start)
+                        _copy_range(f, out, end - start)
+                        merged.add(problem_id)
+        return len(merged)
+
+
+def _copy_range(src, dst, length: int):
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise ValueError("Output file is shorter than its checkpoint records.")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+class QueueWorker:
+    """
+    Runs a DataGenerator on problems leased from a WorkQueue until the queue
+    is drained.
+
+    The generator must have a checkpoint, which `WorkQueue.merge` uses to
+    attribute each worker's output to problems. Each worker needs its own
+    output and checkpoint files.
+    """
+
+    def __init__(
+        self,
+        generator: DataGenerator,
+        queue: WorkQueue,
+        worker_id: str,
+        output_format: str = "jsonl",
+    ):
+        """
+        Initializes the QueueWorker.
+
+        Args:
+            generator: The generator to run; it must have a checkpoint file.
+            queue: The shared work queue.
+            worker_id: A name for this worker, unique across the cluster.
+            output_format: The generator's output format, recorded for merging.
+        """
+        if not generator.checkpoint:
+            raise ValueError("A QueueWorker's DataGenerator needs a checkpoint_file.")
+        self.generator = generator
+        self.queue = queue
+        self.worker_id = worker_id
+        queue.register(
+            worker_id,
+            os.path.abspath(generator.output_file),
+            os.path.abspath(generator.checkpoint.path),
+            output_format,
+        )
+
+    async def run(
+        self, n_samples: int = 8, concurrency: int = 8, poll_interval: float = 5.0
+    ) -> Dict[str, int]:
+        """
+        Leases and processes problems, at most `concurrency` at a time, until
+        no problem is pending or leased by anyone. A problem is completed
+        only once this worker's checkpoint records all `n_samples`; otherwise
+        its lease is released, so it is retried up to the queue's
+        `max_attempts`.
+
+        Returns:
+            A mapping from each problem this worker completed to the number
+            of correct paths saved.
+        """
+        queue = self.queue
+        results: Dict[str, int] = {}
+        running: Dict[asyncio.Task, str] = {}
+        heartbeat_interval = queue.lease_seconds / 3
+
+        while True:
+            free = concurrency - len(running)
+            for problem_id in queue.lease(self.worker_id, free) if free else []:
+                task = asyncio.ensure_future(self.generator.arun(problem_id, n_samples))
+                running[task] = problem_id
+
+            if not running:
+                if queue.is_finished():
+                    break
+                # Other workers hold the remaining leases; wait in case one expires
+                await asyncio.sleep(poll_interval)
+                continue
+
+            done, _ = await asyncio.wait(
+                running,
+                timeout=min(heartbeat_interval, poll_interval),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                problem_id = running.pop(task)
+                if task.exception() is not None:
+                    print(f"Error while generating data for '{problem_id}': {task.exception()}")
+                    queue.release(self.worker_id, problem_id)
+                elif self.generator.checkpoint.samples_remaining(problem_id, n_samples):
+                    # Fewer samples came back than asked for; retry rather than lose them
+                    print(f"Not all samples were drawn for '{problem_id}'; releasing it.")
+                    queue.release(self.worker_id, problem_id)
+                elif queue.complete(self.worker_id, problem_id, task.result()):
+                    results[problem_id] = task.result()
+                else:
+                    print(f"Lost the lease on '{problem_id}'; its output will not be merged.")
+            queue.heartbeat(self.worker_id, running.values())
+
+        self.generator.flush()
+        return results
@@ -1,4 +1,40 @@
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+EXAMPLE_SEPARATOR = "\n\n---\n\n"
+
+
+class FewShotTemplate:
+    """
+    A few-shot Chain-of-Thought prompt with its examples pre-rendered.
+
+    The examples are formatted once into a fixed prefix, and each problem is
+    appended after it. Every prompt rendered from the same template therefore
+    starts with a byte-identical prefix, which lets the provider's prompt
+    caching reuse it across requests instead of billing it in full each time.
+    """
+
+    def __init__(self, examples: List[Dict[str, Any]]):
+        """
+        Initializes the FewShotTemplate.
+
+        Args:
+            examples: A list of dictionaries, where each dict has 'problem',
+                      'reasoning', and 'answer' keys.
+        """
+        formatted_examples = [
+            f"Problem: {ex['problem']}\n"
+            f"Answer: {ex['reasoning']}\n"
+            f"The final answer is {ex['answer']}."
+            for ex in examples
+        ]
+        self.prefix = EXAMPLE_SEPARATOR.join(formatted_examples) + EXAMPLE_SEPARATOR
+        # Identifies the prefix, e.g. to check that two runs share a cache entry
+        self.prefix_hash = hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+    def render(self, problem: str) -> str:
+        """Returns the prompt for `problem`: the shared prefix, then the problem."""
+        return f"{self.prefix}Problem: {problem}\nAnswer:"
 
 
 class PromptManager:
@@ -8,6 +44,9 @@ class PromptManager:
 
     ZERO_SHOT_COT_PHRASE = "Let's think step by step."
 
+    def __init__(self):
+        self._templates: Dict[Tuple[Tuple[str, str, str], ...], FewShotTemplate] = {}
+
     def create_zero_shot_cot_prompt(self, problem: str) -> str:
         """
         Creates a zero-shot Chain-of-Thought prompt.
@@ -20,12 +59,40 @@ class PromptManager:
         """
         return f"{problem}\n\n{self.ZERO_SHOT_COT_PHRASE}"
 
+    def compile_few_shot_cot_template(
+        self, examples: List[Dict[str, Any]]
+    ) -> FewShotTemplate:
+        """
+        Compiles few-shot examples into a reusable template.
+
+        Templates are cached by the examples' contents, so compiling the same
+        examples again returns the same template.
+
+        Args:
+            examples: A list of dictionaries, where each dict has 'problem',
+                      'reasoning', and 'answer' keys.
+
+        Returns:
+            A template whose `render` method formats a problem.
+        """
+        key = tuple(
+            (str(ex["problem"]), str(ex["reasoning"]), str(ex["answer"]))
+            for ex in examples
+        )
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = FewShotTemplate(examples)
+        return template
+
     def create_few_shot_cot_prompt(
         self, problem: str, examples: List[Dict[str, Any]]
     ) -> str:
         """
         Creates a few-shot Chain-of-Thought prompt from examples.
 
+        For many problems sharing the same examples, prefer
+        `compile_few_shot_cot_template` and render each problem with it.
+
         Args:
             problem: The user's new problem statement.
             examples: A list of dictionaries, where each dict has 'problem',
@@ -34,16 +101,4 @@ class PromptManager:
         Returns:
             A prompt formatted with the provided examples.
         """
-        formatted_examples = []
-        for ex in examples:
-            formatted_example = (
-                f"Problem: {ex['problem']}\n"
-                f"Answer: {ex['reasoning']}\n"
-                f"The final answer is {ex['answer']}."
-            )
-            formatted_examples.append(formatted_example)
-
-        prompt = "\n\n---\n\n".join(formatted_examples)
-        prompt += f"\n\n---\n\nProblem: {problem}\nAnswer:"
-
-        return prompt
+        return self.compile_few_shot_cot_template(examples).render(problem)
@@ -0,0 +1,141 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from cognition_synthesis.llm.client import AsyncLLMClient, LLMClient
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.paths import ReasoningPaths
+from cognition_synthesis.reasoning.self_consistency import SelfConsistency
+from cognition_synthesis.reasoning.voting import VotingEngine
+from cognition_synthesis.telemetry.metrics import metrics
+
+
+class ModelCascade:
+    """
+    Runs self-consistency on a cheap model first and escalates to stronger
+    models only when the cheap model's vote is not convincing.
+
+    A problem is escalated to the next model when no sample yields a
+    parseable answer, or when the share of samples agreeing with the winning
+    answer is below `agreement_threshold`. The last model's result is final.
+    """
+
+    def __init__(
+        self,
+        llm_clients: Sequence[Union[LLMClient, AsyncLLMClient]],
+        parser: AnswerParser,
+        agreement_threshold: float = 0.7,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        verbose: bool = True,
+    ):
+        """
+        Initializes the ModelCascade.
+
+        Args:
+            llm_clients: The clients to try, cheapest first.
+            parser: The parser used to extract each path's answer.
+            agreement_threshold: The share of samples that must agree with
+                the winning answer for a model's result to be accepted.
+            prices: Optional USD prices per million (prompt, completion)
+                tokens, keyed by model name, used by `cost`.
+            verbose: If True, print routing decisions and each vote.
+        """
+        if not llm_clients:
+            raise ValueError("llm_clients must contain at least one client.")
+        if not 0.0 < agreement_threshold <= 1.0:
+            raise ValueError("agreement_threshold must be in (0, 1].")
+        self.llm_clients = list(llm_clients)
+        self.parser = parser
+        self.agreement_threshold = agreement_threshold
+        self.prices = prices or {}
+        self.verbose = verbose
+        self.voting = VotingEngine()
+        self.stages = [
+            SelfConsistency(c, parser, verbose, self.voting) for c in self.llm_clients
+        ]
+        # How many problems each model accepted or escalated
+        self.routes: Counter = Counter()
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def reason(
+        self, prompt: str, n_samples: int = 5
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Answers `prompt`, escalating through the models as needed.
+
+        Args:
+            prompt: The prompt to send to the LLM.
+            n_samples: The number of samples to draw from each model tried.
+
+        Returns:
+            The (answer, raw_responses) tuple of the model whose result was
+            accepted (or of the last model).
+        """
+        for i, stage in enumerate(self.stages):
+            answer, paths = stage.sample(prompt, n_samples)
+            if self._accept(i, answer, paths):
+                break
+        return answer, list(paths.responses())
+
+    async def areason(
+        self, prompt: str, n_samples: int = 5
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Async version of `reason`, for use with `AsyncLLMClient`s.
+        """
+        for i, stage in enumerate(self.stages):
+            answer, paths = await stage.asample(prompt, n_samples)
+            if self._accept(i, answer, paths):
+                break
+        return answer, list(paths.responses())
+
+    def agreement(self, answer: Optional[str], paths: ReasoningPaths) -> float:
+        """Returns the share of the sampled paths that voted for `answer`."""
+        if answer is None or not len(paths):
+            return 0.0
+        # The answers were extracted when the paths were sampled
+        tally = self.voting.vote(paths.answers)
+        return tally.weight(answer) / tally.total
+
+    def _accept(self, stage: int, answer: Optional[str], paths: ReasoningPaths) -> bool:
+        """Decides whether a model's result is final, logging the decision."""
+        model = self.llm_clients[stage].model
+        agreement = self.agreement(answer, paths)
+        if stage == len(self.stages) - 1:
+            route = "final"
+        elif agreement >= self.agreement_threshold:
+            route = "accepted"
+        else:
+            route = "escalated"
+
+        self.routes[(model, route)] += 1
+        metrics.inc("cascade_routes_total", model=model, route=route)
+        self._log(
+            f"Cascade: {model} answered {answer!r} with {agreement:.0%} agreement "
+            f"-> {route}"
+        )
+        return route != "escalated"
+
+    def cost(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the token usage of each model so far, and its USD cost when
+        a price is known.
+        """
+        report = {}
+        for client in self.llm_clients:
+            usage = client.usage
+            entry = {
+                "requests": usage["requests"],
+                "prompt_tokens": usage["prompt_tokens"],
+                "completion_tokens": usage["completion_tokens"],
+            }
+            if client.model in self.prices:
+                prompt_price, completion_price = self.prices[client.model]
+                entry["usd"] = (
+                    usage["prompt_tokens"] * prompt_price
+                    + usage["completion_tokens"] * completion_price
+                ) / 1e6
+            report[client.model] = entry
+        return report
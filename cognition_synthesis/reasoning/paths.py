@@ -0,0 +1,115 @@
+import os
+import tempfile
+from array import array
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from cognition_synthesis.parsing.parser import AnswerParser
+
+
+class ReasoningPath:
+    """One sampled response and the answer extracted from it."""
+
+    __slots__ = ("response", "answer")
+
+    def __init__(self, response: str, answer: Optional[str]):
+        self.response = response
+        self.answer = answer
+
+    def __repr__(self) -> str:
+        return f"ReasoningPath(answer={self.answer!r}, response={self.response[:40]!r})"
+
+
+class ReasoningPaths:
+    """
+    The sampled paths for one prompt, each parsed exactly once.
+
+    Answers are kept in memory. Response texts are kept in memory too until
+    they exceed `spill_bytes`, after which they are moved to an anonymous
+    temporary file in `spill_dir` and only their offsets stay in memory, so
+    memory use does not grow with the number or length of the responses.
+    Iterating reads spilled responses back one at a time.
+    """
+
+    __slots__ = ("answers", "spill_dir", "spill_bytes", "_responses", "_size", "_file", "_offsets")
+
+    def __init__(self, spill_dir: Optional[str] = None, spill_bytes: int = 1 << 20):
+        """
+        Initializes an empty ReasoningPaths.
+
+        Args:
+            spill_dir: The directory to spill responses to. None keeps every
+                response in memory.
+            spill_bytes: How much response text to hold in memory before
+                spilling, when `spill_dir` is set.
+        """
+        self.answers: List[Optional[str]] = []
+        self.spill_dir = spill_dir
+        self.spill_bytes = spill_bytes
+        self._responses: List[str] = []
+        self._size = 0
+        self._file: Optional[BinaryIO] = None
+        # Start offsets of the spilled responses, plus the end of the last one
+        self._offsets = array("Q", [0])
+
+    @classmethod
+    def parse(
+        cls,
+        responses: Iterable[str],
+        parser: AnswerParser,
+        spill_dir: Optional[str] = None,
+    ) -> "ReasoningPaths":
+        """Parses already drawn responses into a ReasoningPaths."""
+        paths = cls(spill_dir)
+        for response in responses:
+            paths.add(response, parser.extract_answer(response))
+        return paths
+
+    def add(self, response: str, answer: Optional[str]):
+        """Appends one parsed response."""
+        self.answers.append(answer)
+        if self._file is not None:
+            self._spill(response)
+            return
+        self._responses.append(response)
+        self._size += len(response)
+        if self.spill_dir is not None and self._size > self.spill_bytes:
+            self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+            for kept in self._responses:
+                self._spill(kept)
+            self._responses = []
+
+    def _spill(self, response: str):
+        data = response.encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    @property
+    def spilled(self) -> bool:
+        """True once the responses have been moved to disk."""
+        return self._file is not None
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def responses(self) -> Iterator[str]:
+        """Yields the responses in order, reading spilled ones back one at a time."""
+        if self._file is None:
+            yield from self._responses
+            return
+        self._file.flush()
+        for i in range(len(self.answers)):
+            start, end = self._offsets[i], self._offsets[i + 1]
+            yield os.pread(self._file.fileno(), end - start, start).decode("utf-8")
+
+    def __iter__(self) -> Iterator[ReasoningPath]:
+        for response, answer in zip(self.responses(), self.answers):
+            yield ReasoningPath(response, answer)
+
+    def close(self):
+        """Deletes the spill file, if any; the responses are gone afterwards."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._offsets = array("Q", [0])
+        self._responses = []
+        self.answers = []
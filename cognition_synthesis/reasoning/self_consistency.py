@@ -1,8 +1,11 @@
-from collections import Counter
-from typing import List, Optional, Tuple
+import math
+from typing import List, Optional, Sized, Tuple, Union
 
-from cognition_synthesis.llm.client import LLMClient
+from cognition_synthesis.llm.client import AsyncLLMClient, LLMClient
 from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.paths import ReasoningPaths
+from cognition_synthesis.reasoning.voting import VoteTally, VotingEngine
+from cognition_synthesis.telemetry.metrics import metrics
 
 
 class SelfConsistency:
@@ -10,12 +13,47 @@ class SelfConsistency:
     Implements the self-consistency reasoning technique.
     """
 
-    def __init__(self, llm_client: LLMClient, parser: AnswerParser):
+    def __init__(
+        self,
+        llm_client: Union[LLMClient, AsyncLLMClient],
+        parser: AnswerParser,
+        verbose: bool = True,
+        voting: Optional[VotingEngine] = None,
+        batch_size: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initializes SelfConsistency.
+
+        Args:
+            llm_client: The client used to sample reasoning paths.
+            parser: The parser used to extract each path's answer.
+            verbose: If True, print each path's answer and the vote tally.
+            voting: How answers are canonicalized and weighted; by default
+                formatting variants ("70", "70.0", "$70") share one vote
+                and every path weighs the same.
+            batch_size: If set, `sample` and `asample` draw at most this many
+                responses per request, so only one batch of raw responses is
+                held at a time.
+            spill_dir: If set, `sample` and `asample` spill response texts
+                to a temporary file in this directory once they grow large
+                (see `ReasoningPaths`).
+        """
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
         self.llm_client = llm_client
         self.parser = parser
+        self.verbose = verbose
+        self.voting = voting or VotingEngine()
+        self.batch_size = batch_size
+        self.spill_dir = spill_dir
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
 
     def reason(
-        self, prompt: str, n_samples: int = 5
+        self, prompt: str, n_samples: int = 5, sample_offset: int = 0
     ) -> Tuple[Optional[str], List[str]]:
         """
         Generates multiple reasoning paths and finds the most consistent answer.
@@ -23,34 +61,255 @@ class SelfConsistency:
         Args:
             prompt: The prompt to send to the LLM.
             n_samples: The number of samples to generate.
+            sample_offset: How many samples were already drawn for this
+                prompt, so that a top-up batch is not served from the cache.
 
         Returns:
             A tuple containing:
             - The most frequent answer (or None if no answers are found).
             - The list of all raw responses from the LLM.
         """
-        print(f"\n--- Generating {n_samples} diverse reasoning paths... ---")
-        raw_responses = self.llm_client.query_sample_n(prompt, n_samples)
+        self._log(f"\n--- Generating {n_samples} diverse reasoning paths... ---")
+        raw_responses = self.llm_client.query_sample_n(
+            prompt, n_samples, sample_offset=sample_offset
+        )
+        return self._vote(raw_responses)
+
+    async def areason(
+        self, prompt: str, n_samples: int = 5, sample_offset: int = 0
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Async version of `reason`, for use with an `AsyncLLMClient`.
 
+        Args:
+            prompt: The prompt to send to the LLM.
+            n_samples: The number of samples to generate.
+            sample_offset: As for `reason`.
+
+        Returns:
+            The same (answer, raw_responses) tuple as `reason`.
+        """
+        self._log(f"\n--- Generating {n_samples} diverse reasoning paths... ---")
+        raw_responses = await self.llm_client.aquery_sample_n(
+            prompt, n_samples, sample_offset=sample_offset
+        )
+        return self._vote(raw_responses)
+
+    def sample(
+        self, prompt: str, n_samples: int = 5, sample_offset: int = 0
+    ) -> Tuple[Optional[str], ReasoningPaths]:
+        """
+        Like `reason`, but returns the parsed paths, for callers that need
+        every path's answer (e.g. to verify it) and not just the vote.
+
+        Every response is parsed exactly once, so the vote does not stop
+        early. Responses are drawn `batch_size` at a time and may be spilled
+        to `spill_dir`.
+
+        Returns:
+            The most frequent answer and the parsed paths.
+        """
+        self._log(f"\n--- Generating {n_samples} diverse reasoning paths... ---")
+        paths = ReasoningPaths(self.spill_dir)
+        tally = self.voting.tally()
+        for n in self._batches(n_samples):
+            batch = self.llm_client.query_sample_n(
+                prompt, n, sample_offset=sample_offset + len(paths)
+            )
+            self._add_paths(batch, paths, tally)
+            if len(batch) < n:
+                break
+        return self._conclude(tally, paths), paths
+
+    async def asample(
+        self, prompt: str, n_samples: int = 5, sample_offset: int = 0
+    ) -> Tuple[Optional[str], ReasoningPaths]:
+        """
+        Async version of `sample`, for use with an `AsyncLLMClient`.
+        """
+        self._log(f"\n--- Generating {n_samples} diverse reasoning paths... ---")
+        paths = ReasoningPaths(self.spill_dir)
+        tally = self.voting.tally()
+        for n in self._batches(n_samples):
+            batch = await self.llm_client.aquery_sample_n(
+                prompt, n, sample_offset=sample_offset + len(paths)
+            )
+            self._add_paths(batch, paths, tally)
+            if len(batch) < n:
+                break
+        return self._conclude(tally, paths), paths
+
+    def _batches(self, n_samples: int) -> List[int]:
+        """Splits `n_samples` into request sizes of at most `batch_size`."""
+        size = self.batch_size or n_samples
+        return [min(size, n_samples - i) for i in range(0, n_samples, size)]
+
+    def _add_paths(self, raw_responses: List[str], paths: ReasoningPaths, tally: VoteTally):
+        """Parses each response once, recording it in `paths` and the tally."""
+        weights = self.voting.weights(raw_responses)
+        with metrics.timer("parse"):
+            for response, weight in zip(raw_responses, weights):
+                extracted_answer = self.parser.extract_answer(response)
+                paths.add(response, extracted_answer)
+                tally.add(extracted_answer, weight)
+                self._log(f"Path {len(paths)} Answer: {extracted_answer or 'N/A'}")
+
+    def reason_adaptive(
+        self,
+        prompt: str,
+        max_samples: int = 16,
+        round_size: int = 2,
+        confidence: float = 0.9,
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Samples reasoning paths in small rounds, stopping early once the vote
+        is decisive.
+
+        After each round, a one-sided sign test compares the votes for the
+        leading answer against those for the runner-up. Sampling stops when
+        the leader is ahead with at least `confidence` certainty, or when
+        `max_samples` paths have been drawn.
+
+        Args:
+            prompt: The prompt to send to the LLM.
+            max_samples: The maximum number of samples to draw in total.
+            round_size: The number of samples to draw per round.
+            confidence: The certainty required to stop early, in (0, 1).
+
+        Returns:
+            The same (answer, raw_responses) tuple as `reason`, where
+            raw_responses holds only the paths actually drawn.
+        """
+        self._check_adaptive_args(max_samples, round_size, confidence)
+        self._log(f"\n--- Generating up to {max_samples} reasoning paths adaptively... ---")
+
+        raw_responses: List[str] = []
+        tally = self.voting.tally()
+        while len(raw_responses) < max_samples:
+            n = min(round_size, max_samples - len(raw_responses))
+            batch = self.llm_client.query_sample_n(
+                prompt, n, sample_offset=len(raw_responses)
+            )
+            if not batch:
+                break
+            self._tally(batch, tally, start=len(raw_responses))
+            raw_responses.extend(batch)
+            if self._is_decisive(tally, confidence, max_samples - len(raw_responses)):
+                break
+
+        return self._conclude(tally, raw_responses), raw_responses
+
+    async def areason_adaptive(
+        self,
+        prompt: str,
+        max_samples: int = 16,
+        round_size: int = 2,
+        confidence: float = 0.9,
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Async version of `reason_adaptive`, for use with an `AsyncLLMClient`.
+        """
+        self._check_adaptive_args(max_samples, round_size, confidence)
+        self._log(f"\n--- Generating up to {max_samples} reasoning paths adaptively... ---")
+
+        raw_responses: List[str] = []
+        tally = self.voting.tally()
+        while len(raw_responses) < max_samples:
+            n = min(round_size, max_samples - len(raw_responses))
+            batch = await self.llm_client.aquery_sample_n(
+                prompt, n, sample_offset=len(raw_responses)
+            )
+            if not batch:
+                break
+            self._tally(batch, tally, start=len(raw_responses))
+            raw_responses.extend(batch)
+            if self._is_decisive(tally, confidence, max_samples - len(raw_responses)):
+                break
+
+        return self._conclude(tally, raw_responses), raw_responses
+
+    @staticmethod
+    def _check_adaptive_args(max_samples: int, round_size: int, confidence: float):
+        if max_samples <= 0 or round_size <= 0:
+            raise ValueError("max_samples and round_size must be positive integers.")
+        if not 0.0 < confidence < 1.0:
+            raise ValueError("confidence must be between 0 and 1.")
+
+    def _is_decisive(
+        self, tally: VoteTally, confidence: float, samples_left: int
+    ) -> bool:
+        """
+        Returns True if sampling can stop: either the leader can no longer be
+        overtaken within the remaining budget, or it beats the runner-up with
+        the given confidence under a one-sided sign test against a fair coin.
+
+        Weighted votes are not counts, so the sign test does not apply to
+        them; they stop early only once unassailable, and only if the
+        voting engine bounds the weight of a vote.
+        """
+        top_two = tally.most_common(2)
+        if not top_two:
+            return False
+        bound = self.voting.weight_bound()
+        if bound is not None and tally.is_unassailable(samples_left * bound):
+            return True
+        if self.voting.weight_fn is not None:
+            return False
+        leader = round(top_two[0][1])
+        runner_up = round(top_two[1][1]) if len(top_two) > 1 else 0
+        total = leader + runner_up
+        # P(at least `leader` of `total` votes go to one answer if both were equally likely)
+        p_value = sum(math.comb(total, k) for k in range(leader, total + 1)) / 2**total
+        return 1.0 - p_value >= confidence
+
+    def _vote(self, raw_responses: List[str]) -> Tuple[Optional[str], List[str]]:
+        """
+        Extracts answers and takes the (weighted) majority vote, stopping
+        early once the remaining responses can no longer change the winner.
+        """
         if not raw_responses:
             return None, []
 
-        answers = []
-        for i, resp in enumerate(raw_responses):
-            extracted_answer = self.parser.extract_answer(resp)
-            if extracted_answer:
-                answers.append(extracted_answer)
-            print(f"Path {i+1} Answer: {extracted_answer or 'N/A'}")
+        tally = self.voting.tally()
+        self._tally(raw_responses, tally, early_exit=True)
+        return self._conclude(tally, raw_responses), raw_responses
+
+    def _tally(
+        self,
+        raw_responses: List[str],
+        tally: VoteTally,
+        start: int = 0,
+        early_exit: bool = False,
+    ):
+        """Extracts an answer from each response and adds it to the tally."""
+        weights = self.voting.weights(raw_responses)
+        remaining = sum(weights)
+        with metrics.timer("parse"):
+            for i, (response, weight) in enumerate(zip(raw_responses, weights)):
+                extracted_answer = self.parser.extract_answer(response)
+                tally.add(extracted_answer, weight)
+                self._log(f"Path {start+i+1} Answer: {extracted_answer or 'N/A'}")
+                remaining -= weight
+                if early_exit and remaining > 0 and tally.is_unassailable(remaining):
+                    self._log(
+                        f"Majority is unassailable; skipping the last "
+                        f"{len(raw_responses) - i - 1} paths."
+                    )
+                    break
+
+    def _conclude(self, tally: VoteTally, raw_responses: Sized) -> Optional[str]:
+        """Picks the winning answer from the tally."""
+        if not len(raw_responses):
+            return None
 
-        if not answers:
-            print("Could not extract any valid answers from the paths.")
-            return None, raw_responses
+        if not tally:
+            self._log("Could not extract any valid answers from the paths.")
+            return None
 
-        # Tally the answers and find the most common one
-        answer_counts = Counter(answers)
-        most_common_answer = answer_counts.most_common(1)[0][0]
+        with metrics.timer("vote"):
+            most_common_answer = tally.leader()
 
-        print(f"Answer counts: {dict(answer_counts)}")
-        print(f"Most consistent answer: {most_common_answer}")
+        self._log(f"Answer counts: {tally.counts()}")
+        self._log(f"Most consistent answer: {most_common_answer}")
 
-        return most_common_answer, raw_responses
+        return most_common_answer
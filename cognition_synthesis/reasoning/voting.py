@@ -0,0 +1,164 @@
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cognition_synthesis.verification.normalizers import DEFAULT_NORMALIZERS, parse_number
+
+
+def canonical_answer(answer: str) -> str:
+    """
+    Returns the form an answer votes under, so formatting variants such as
+    "70", "70.0", "$70" and "70 apples" count as one answer.
+    """
+    for normalizer in DEFAULT_NORMALIZERS:
+        answer = normalizer(answer)
+    number = parse_number(answer)
+    if number is not None and math.isfinite(number):
+        # "%.12g" prints 70.0 as "70" and 3/4 as "0.75"; + 0.0 turns -0 into 0
+        return format(number + 0.0, ".12g")
+    return answer
+
+
+class VoteTally:
+    """
+    A running, weighted tally of votes, grouped by canonical answer.
+
+    Each group remembers the surface forms it was given, and reports the
+    most common one (the first seen on ties), so "70" rather than its
+    canonical key is what callers see.
+    """
+
+    def __init__(self, canonicalize: Callable[[str], str]):
+        self.canonicalize = canonicalize
+        self.total = 0.0
+        self._weights: Dict[str, float] = {}
+        self._forms: Dict[str, Dict[str, int]] = {}
+
+    def add(self, answer: Optional[str], weight: float = 1.0):
+        """Counts one response; unparseable responses (None) only add to the total."""
+        self.total += weight
+        if not answer:
+            return
+        key = self.canonicalize(answer)
+        self._weights[key] = self._weights.get(key, 0.0) + weight
+        forms = self._forms.setdefault(key, {})
+        forms[answer] = forms.get(answer, 0) + 1
+
+    def __bool__(self) -> bool:
+        return bool(self._weights)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Returns (answer, weight) pairs, heaviest first (first seen on ties)."""
+        ranked = sorted(self._weights.items(), key=lambda kv: -kv[1])[:n]
+        return [(self._display(key), weight) for key, weight in ranked]
+
+    def leader(self) -> Optional[str]:
+        """Returns the winning answer, or None if no votes were cast."""
+        top = self.most_common(1)
+        return top[0][0] if top else None
+
+    def weight(self, answer: str) -> float:
+        """Returns the weight of the votes for `answer` (in any surface form)."""
+        return self._weights.get(self.canonicalize(answer), 0.0)
+
+    def is_unassailable(self, remaining_weight: float) -> bool:
+        """
+        Returns True if the leader would still win even if every remaining
+        vote went to the runner-up.
+        """
+        top_two = sorted(self._weights.values(), reverse=True)[:2]
+        if not top_two:
+            return False
+        runner_up = top_two[1] if len(top_two) > 1 else 0.0
+        return top_two[0] > runner_up + remaining_weight
+
+    def counts(self) -> Dict[str, float]:
+        """Returns the weight per answer, for display."""
+        return {
+            answer: int(weight) if float(weight).is_integer() else round(weight, 4)
+            for answer, weight in self.most_common()
+        }
+
+    def _display(self, key: str) -> str:
+        forms = self._forms[key]
+        return max(forms, key=forms.get)
+
+
+class VotingEngine:
+    """
+    Aggregates the answers of many reasoning paths into one.
+
+    Answers are canonicalized before voting, and each path's vote can be
+    weighted, e.g. by a confidence score stated in the response, through
+    `weight_fn` or explicit weights.
+    """
+
+    def __init__(
+        self,
+        canonicalize: Optional[Callable[[str], str]] = canonical_answer,
+        weight_fn: Optional[Callable[[str], float]] = None,
+        max_weight: Optional[float] = None,
+    ):
+        """
+        Initializes the VotingEngine.
+
+        Args:
+            canonicalize: Maps an answer to the key it votes under. None
+                votes on the exact answer strings.
+            weight_fn: Optionally computes a response's vote weight from its
+                raw text. Every vote weighs 1 by default.
+            max_weight: The most `weight_fn` can return, if bounded. Adaptive
+                sampling with `weight_fn` stops early only when this is set.
+        """
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("max_weight must be positive.")
+        self.canonicalize = canonicalize or (lambda answer: answer)
+        self.weight_fn = weight_fn
+        self.max_weight = max_weight
+
+    def tally(self) -> VoteTally:
+        """Returns an empty tally that uses this engine's canonicalization."""
+        return VoteTally(self.canonicalize)
+
+    def weights(self, raw_responses: Sequence[str]) -> List[float]:
+        """Returns the vote weight of each response."""
+        if self.weight_fn is None:
+            return [1.0] * len(raw_responses)
+        return [self.weight_fn(response) for response in raw_responses]
+
+    def weight_bound(self) -> Optional[float]:
+        """Returns the most one vote can weigh, or None if it is unbounded."""
+        return 1.0 if self.weight_fn is None else self.max_weight
+
+    def vote(
+        self,
+        answers: Iterable[Optional[str]],
+        weights: Optional[Sequence[float]] = None,
+        early_exit: bool = False,
+    ) -> VoteTally:
+        """
+        Tallies already extracted answers.
+
+        Args:
+            answers: The extracted answers (None for unparseable responses).
+            weights: Optional per-answer weights; 1 each by default.
+            early_exit: If True, stop once the leader is unassailable. This
+                requires `answers` to be a sequence, so that the weight of
+                the votes still to come is known.
+
+        Returns:
+            The resulting tally.
+        """
+        answers = list(answers) if early_exit else answers
+        if weights is None:
+            weights = [1.0] * len(answers) if early_exit else None
+        remaining = sum(weights) if early_exit else 0.0
+
+        tally = self.tally()
+        for i, answer in enumerate(answers):
+            weight = weights[i] if weights is not None else 1.0
+            tally.add(answer, weight)
+            if early_exit:
+                remaining -= weight
+                if tally.is_unassailable(remaining):
+                    break
+        return tally
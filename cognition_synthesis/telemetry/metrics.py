@@ -0,0 +1,193 @@
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+MetricKey = Tuple[str, FrozenSet[Tuple[str, str]]]
+
+
+def _sort_key(item: Tuple[MetricKey, Any]) -> Tuple[str, List[Tuple[str, str]]]:
+    (name, labels), _ = item
+    return name, sorted(labels)
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """Returns how many of a response's prompt tokens hit the provider's prompt cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return int(getattr(details, "cached_tokens", None) or 0)
+
+
+class Histogram:
+    """
+    Summarizes a stream of observations.
+
+    Count, sum, min and max are exact. Quantiles are computed from a uniform
+    reservoir sample, so memory stays bounded however many values are seen.
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._samples: List[float] = []
+        self._rng = random.Random(0)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._samples) < self.max_samples:
+            self._samples.append(value)
+        else:
+            # Reservoir sampling keeps every observation equally likely to be kept
+            i = self._rng.randrange(self.count)
+            if i < self.max_samples:
+                self._samples[i] = value
+
+    def quantile(self, q: float) -> float:
+        """Returns the q-quantile (nearest rank) of the sampled observations."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class MetricsRegistry:
+    """
+    Collects counters and latency histograms for the pipeline.
+
+    Metrics are identified by a name plus optional string labels, following
+    Prometheus conventions, and can be exported as JSON or in the Prometheus
+    text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._histograms: Dict[MetricKey, Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> MetricKey:
+        return name, frozenset((k, str(v)) for k, v in labels.items())
+
+    def inc(self, name: str, value: float = 1, **labels: Any):
+        """Adds `value` to a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """Records one observation in a histogram."""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block as one observation of a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def record_usage(self, model: str, usage: Any):
+        """Adds the token counts from an API response's `usage` field."""
+        if usage is None:
+            return
+        self.inc("llm_tokens_total", usage.prompt_tokens or 0, model=model, type="prompt")
+        self.inc(
+            "llm_tokens_total", usage.completion_tokens or 0, model=model, type="completion"
+        )
+        self.inc("llm_tokens_total", cached_prompt_tokens(usage), model=model, type="cached")
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Returns a counter's current value (0 if it was never incremented)."""
+        return self._counters.get(self._key(name, labels), 0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """Returns a histogram, or None if nothing was observed."""
+        return self._histograms.get(self._key(name, labels))
+
+    def reset(self):
+        """Discards all collected metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns every metric as plain, JSON-serializable data."""
+        with self._lock:
+            counters = sorted(self._counters.items(), key=_sort_key)
+            histograms = sorted(self._histograms.items(), key=_sort_key)
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(sorted(labels)), "value": value}
+                    for (name, labels), value in counters
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(sorted(labels)), **h.summary()}
+                    for (name, labels), h in histograms
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+
+        def render_labels(labels, extra=()):
+            pairs = sorted(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items(), key=_sort_key):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{render_labels(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items(), key=_sort_key):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} summary")
+                    typed.add(name)
+                for q in QUANTILES:
+                    quantile = render_labels(labels, [("quantile", str(q))])
+                    lines.append(f"{name}{quantile} {h.quantile(q)}")
+                lines.append(f"{name}_sum{render_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{render_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """Writes the metrics to `path`: Prometheus text for `.prom`, JSON otherwise."""
+        with open(path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+
+
+# The process-wide registry that pipeline components record into.
+metrics = MetricsRegistry()
@@ -0,0 +1,93 @@
+import re
+from fractions import Fraction
+from typing import Callable, List, Optional
+
+Normalizer = Callable[[str], str]
+
+_BOXED = re.compile(r"\\boxed\s*\{((?:[^{}]|\{[^{}]*\})*)\}")
+_FRAC = re.compile(r"\\[dt]?frac\s*\{([^{}]*)\}\s*\{([^{}]*)\}")
+_TEXT = re.compile(r"\\(?:text|textbf|mathrm|mbox)\s*\{([^{}]*)\}")
+_LATEX_NOISE = re.compile(r"\\left|\\right|\\[,;:! ]|\^\s*\{?\\circ\}?|\\circ")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_ASSIGNMENT = re.compile(r"^[a-z]\w*\s*=\s*(?=\S)", re.IGNORECASE)
+# A unit-like word: letters and unit symbols, no digits except an exponent
+# ("m^2"), and not a connective that would join it to another quantity
+_UNIT_WORD = r"(?!(?:and|or|to|plus|minus|times|by|over|than)\b)[a-z%°][a-z%°/.²³-]*(?:\^\d)?"
+# A leading number (optionally a fraction) followed by at most two unit words
+_NUMBER_WITH_UNITS = re.compile(
+    rf"^([-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:\s*/\s*\d+)?)\s*(?:{_UNIT_WORD}(?:\s+{_UNIT_WORD})?)?$",
+    re.IGNORECASE,
+)
+
+
+def strip_markup(answer: str) -> str:
+    """Removes markdown emphasis and surrounding whitespace."""
+    return answer.replace("**", "").strip().strip("*_`").strip()
+
+
+def strip_latex(answer: str) -> str:
+    """Unwraps common LaTeX: \\boxed, \\frac, \\text, math delimiters and spacing."""
+    answer = _BOXED.sub(r"\1", answer)
+    answer = _FRAC.sub(r"(\1)/(\2)", answer)
+    answer = _TEXT.sub(r"\1", answer)
+    answer = _LATEX_NOISE.sub("", answer)
+    answer = answer.replace("\\%", "%").replace("\\$", "$")
+    for delimiter in ("\\(", "\\)", "\\[", "\\]"):
+        answer = answer.replace(delimiter, "")
+    # Unwrap single-term parentheses left over from \frac, e.g. "(3)/(4)"
+    answer = re.sub(r"\(([^()]*)\)", r"\1", answer)
+    return answer.strip()
+
+
+def strip_currency(answer: str) -> str:
+    """Removes currency symbols, including LaTeX math delimiters written as `$`."""
+    return re.sub(r"[$€£¥]", "", answer).strip()
+
+
+def strip_thousands_separators(answer: str) -> str:
+    """Turns "1,000,000" into "1000000", leaving lists like "1, 2" alone."""
+    return _THOUSANDS.sub("", answer)
+
+
+def strip_assignment(answer: str) -> str:
+    """Drops a leading variable assignment, e.g. "x = 5" becomes "5"."""
+    return _ASSIGNMENT.sub("", answer)
+
+
+def strip_units(answer: str) -> str:
+    """
+    Keeps only the number when it is followed by units, e.g. "70 apples" or
+    "60 km/h", but not by another quantity, as in "3 or 4".
+    """
+    match = _NUMBER_WITH_UNITS.match(answer)
+    return match.group(1).replace(" ", "") if match else answer
+
+
+def collapse_whitespace(answer: str) -> str:
+    """Lowercases and collapses runs of whitespace."""
+    return " ".join(answer.lower().split())
+
+
+DEFAULT_NORMALIZERS: List[Normalizer] = [
+    strip_markup,
+    strip_latex,
+    strip_currency,
+    strip_thousands_separators,
+    strip_assignment,
+    strip_units,
+    collapse_whitespace,
+]
+
+
+def parse_number(answer: str) -> Optional[float]:
+    """Parses a normalized answer as a decimal or a fraction, or returns None."""
+    try:
+        return float(answer)
+    except ValueError:
+        pass
+    if "/" in answer:
+        try:
+            return float(Fraction(answer.replace(" ", "")))
+        except (ValueError, ZeroDivisionError):
+            pass
+    return None
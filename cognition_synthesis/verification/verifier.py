@@ -1,49 +1,241 @@
-from typing import List, Dict, Any, Optional
+import json
+import math
+import mmap
+import zlib
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+from cognition_synthesis.verification.normalizers import (
+    DEFAULT_NORMALIZERS,
+    Normalizer,
+    parse_number,
+)
+
+
+DEFAULT_PROBLEMS: List[Dict[str, Any]] = [
+    {
+        "id": "math_001",
+        "problem": "A grocery store sold 15 apples on Monday. On Tuesday, it sold twice as many "
+        "apples as on Monday. On Wednesday, it sold 5 fewer apples than on Tuesday. "
+        "How many apples were sold in total over the three days?",
+        "ground_truth_answer": "70",
+    },
+    {
+        "id": "math_002",
+        "problem": "A car travels at 60 km/h for 2 hours, then at 80 km/h for 3 hours. "
+        "What is the total distance traveled?",
+        "ground_truth_answer": "360",
+    },
+]
+
+
+def shard_of(problem_id: str, num_shards: int) -> int:
+    """Returns the shard a problem belongs to, stable across processes and runs."""
+    return zlib.crc32(problem_id.encode("utf-8")) % num_shards
 
 
 class ProblemBank:
-    """A simple container for problems with known ground truth answers."""
-
-    def __init__(self):
-        self.problems: List[Dict[str, Any]] = [
-            {
-                "id": "math_001",
-                "problem": "A grocery store sold 15 apples on Monday. On Tuesday, it sold twice as many "
-                "apples as on Monday. On Wednesday, it sold 5 fewer apples than on Tuesday. "
-                "How many apples were sold in total over the three days?",
-                "ground_truth_answer": "70",
-            },
-            {
-                "id": "math_002",
-                "problem": "A car travels at 60 km/h for 2 hours, then at 80 km/h for 3 hours. "
-                "What is the total distance traveled?",
-                "ground_truth_answer": "360",
-            },
-        ]
+    """
+    A container for problems with known ground truth answers.
+
+    By default the bank holds a small built-in problem set in memory. Given a
+    JSONL file (one problem per line, with "id", "problem",
+    "ground_truth_answer" and optional "tags" keys), it instead indexes the
+    byte offset of every problem once and reads problems from a memory map
+    on demand, so lookups are O(1) without holding the problems in memory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        problems: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Initializes the ProblemBank.
+
+        Args:
+            path: An optional JSONL file of problems to index.
+            problems: An optional in-memory list of problems, used instead of
+                the built-in set when no `path` is given.
+        """
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._offsets: Dict[str, int] = {}
+        self._problems: Optional[List[Dict[str, Any]]] = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+
+        if path is not None:
+            self._index_file(path)
+        else:
+            self.problems = list(DEFAULT_PROBLEMS if problems is None else problems)
+
+    @property
+    def problems(self) -> Optional[List[Dict[str, Any]]]:
+        """The in-memory problem list, or None for a file-backed bank."""
+        return self._problems
+
+    @problems.setter
+    def problems(self, problems: List[Dict[str, Any]]):
+        self._problems = problems
+        self._by_id = {p["id"]: p for p in problems}
+
+    def _index_file(self, path: str):
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    problem_id = json.loads(line)["id"]
+                    if problem_id in self._offsets:
+                        raise ValueError(
+                            f"Duplicate problem ID '{problem_id}' in '{path}'."
+                        )
+                    self._offsets[problem_id] = offset
+                offset += len(line)
+            if offset:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._offsets) if self.path is not None else len(self._by_id)
+
+    def __contains__(self, problem_id: str) -> bool:
+        return problem_id in (self._offsets if self.path is not None else self._by_id)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Streams every problem, in file (or list) order."""
+        return self.iter_problems()
 
     def get_problem(self, problem_id: str) -> Optional[Dict[str, Any]]:
-        for p in self.problems:
-            if p["id"] == problem_id:
-                return p
-        return None
+        if self.path is None:
+            return self._by_id.get(problem_id)
+
+        offset = self._offsets.get(problem_id)
+        if offset is None:
+            return None
+        end = self._mmap.find(b"\n", offset)
+        return json.loads(self._mmap[offset : end if end != -1 else len(self._mmap)])
+
+    def ids(
+        self,
+        shard: Optional[int] = None,
+        num_shards: int = 1,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Iterator[str]:
+        """
+        Yields problem IDs, optionally restricted to one shard and to a set of tags.
+
+        Args:
+            shard: If set, only yield IDs whose `shard_of` is this shard, so
+                `num_shards` workers can split the bank without overlap.
+            num_shards: The total number of shards.
+            tags: If set, only yield problems that carry all of these tags.
+                Filtering by tags reads each problem; otherwise only the
+                index is consulted.
+        """
+        if tags is not None:
+            for p in self.iter_problems(shard, num_shards, tags):
+                yield p["id"]
+            return
+
+        problem_ids = self._offsets if self.path is not None else self._by_id
+        for problem_id in problem_ids:
+            if shard is None or shard_of(problem_id, num_shards) == shard:
+                yield problem_id
+
+    def iter_problems(
+        self,
+        shard: Optional[int] = None,
+        num_shards: int = 1,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams problems lazily, with the same filters as `ids`.
+        """
+        required_tags = set(tags) if tags is not None else None
+        for problem_id in self.ids(shard, num_shards):
+            problem = self.get_problem(problem_id)
+            if required_tags and not required_tags.issubset(problem.get("tags", ())):
+                continue
+            yield problem
 
 
 class Verifier:
-    """Checks if a model's extracted answer matches the ground truth."""
+    """
+    Checks if a model's extracted answer matches the ground truth.
+
+    Both answers are passed through a chain of normalizers (markup, LaTeX,
+    currency, thousands separators, units, ...) before comparison, so
+    equivalent answers such as "$1,000", "1000 dollars" and "\\boxed{1000}"
+    all match. Answers that parse as numbers (including fractions) are
+    compared within a tolerance; anything else is compared as normalized
+    text. Results are memoized, since the same (answer, truth) pairs recur
+    across the samples for a problem.
+    """
+
+    def __init__(
+        self,
+        normalizers: Optional[List[Normalizer]] = None,
+        rel_tol: float = 1e-6,
+        abs_tol: float = 1e-9,
+        cache_size: int = 65_536,
+    ):
+        """
+        Initializes the Verifier.
+
+        Args:
+            normalizers: The functions applied, in order, to both answers
+                before comparison. Defaults to `DEFAULT_NORMALIZERS`.
+            rel_tol: The relative tolerance for numeric comparison.
+            abs_tol: The absolute tolerance for numeric comparison.
+            cache_size: The maximum number of memoized results (0 disables).
+        """
+        self.normalizers = list(
+            DEFAULT_NORMALIZERS if normalizers is None else normalizers
+        )
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: Dict[Tuple[str, str], bool] = {}
+
+    def normalize(self, answer: str) -> str:
+        """Applies every normalizer to `answer` in turn."""
+        for normalizer in self.normalizers:
+            answer = normalizer(answer)
+        return answer
 
     def verify(self, extracted_answer: str, ground_truth_answer: str) -> bool:
         """
         Compares the extracted answer to the ground truth.
-        Handles basic numeric and string comparison.
+        Handles numeric (with tolerance), fractional and normalized string comparison.
         """
         if not extracted_answer:
             return False
 
-        try:
-            # Try to compare as floats for robustness (e.g., "70" == "70.0")
-            return float(extracted_answer) == float(ground_truth_answer)
-        except (ValueError, TypeError):
-            # Fallback to case-insensitive string comparison
-            return (
-                extracted_answer.lower().strip() == ground_truth_answer.lower().strip()
+        key = (extracted_answer, ground_truth_answer)
+        result = self._cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self._compare(extracted_answer, ground_truth_answer)
+        if self.cache_size:
+            if len(self._cache) >= self.cache_size:
+                # Evict the oldest entry (dicts preserve insertion order)
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = result
+        return result
+
+    def _compare(self, extracted_answer: str, ground_truth_answer: str) -> bool:
+        extracted = self.normalize(extracted_answer)
+        truth = self.normalize(ground_truth_answer)
+        if not extracted:
+            return False
+
+        extracted_number = parse_number(extracted)
+        truth_number = parse_number(truth)
+        if extracted_number is not None and truth_number is not None:
+            return math.isclose(
+                extracted_number, truth_number, rel_tol=self.rel_tol, abs_tol=self.abs_tol
             )
+        return extracted == truth
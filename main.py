@@ -1,19 +1,23 @@
-from cognition_synthesis.llm.client import LLMClient
+import asyncio
+
+from cognition_synthesis.llm.cache import SQLiteResponseCache
+from cognition_synthesis.llm.client import AsyncLLMClient, LLMClient
 from cognition_synthesis.prompts.manager import PromptManager
 from cognition_synthesis.parsing.parser import AnswerParser
 from cognition_synthesis.reasoning.self_consistency import SelfConsistency
 from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.telemetry.metrics import metrics
+
+# Responses to the demo prompts are cached on disk, so re-runs are instant and free
+CACHE_FILE = ".llm_cache.sqlite"
 
 
-def run_last_letter_concatenation_task():
+def run_last_letter_concatenation_task(llm_client: LLMClient):
     """
     Runs the 'last letter concatenation' task as a demonstration.
     """
     print("--- Running Last Letter Concatenation Task ---")
 
-    # Initialize the client
-    # We use gpt-4o-mini as it's capable and cost-effective
-    llm_client = LLMClient(model="gpt-4o-mini")
     parser = AnswerParser()
     problem = "What's the output when concatenating the last letter of each word of 'artificial intelligence'?"
 
@@ -29,13 +33,12 @@ def run_last_letter_concatenation_task():
     print("---------------------------------------------\n")
 
 
-def run_cot_math_task():
+def run_cot_math_task(llm_client: LLMClient):
     """
     Demonstrates the difference between direct and CoT prompting.
     """
     print("--- Running Chain-of-Thought Math Task ---")
 
-    llm_client = LLMClient(model="gpt-4o-mini")
     prompt_manager = PromptManager()
     parser = AnswerParser()
 
@@ -66,7 +69,10 @@ def run_cot_math_task():
             "answer": "11",
         }
     ]
-    few_shot_prompt = prompt_manager.create_few_shot_cot_prompt(problem, examples)
+    # Compile the examples once; every prompt rendered from the template shares
+    # a byte-identical prefix that the provider's prompt cache can reuse
+    few_shot_template = prompt_manager.compile_few_shot_cot_template(examples)
+    few_shot_prompt = few_shot_template.render(problem)
     few_shot_response = llm_client.query(few_shot_prompt)
     print(f"LLM Response:\n{few_shot_response}")
     few_shot_answer = parser.extract_answer(few_shot_response)
@@ -74,14 +80,13 @@ def run_cot_math_task():
     print("----------------------------------------")
 
 
-def run_self_consistency_task():
+def run_self_consistency_task(llm_client: LLMClient):
     """
     Demonstrates the self-consistency technique on a more complex problem.
     """
     print("\n\n--- Running Self-Consistency Task ---")
 
     # Setup
-    llm_client = LLMClient(model="gpt-4o-mini")
     prompt_manager = PromptManager()
     parser = AnswerParser()
     self_consistency = SelfConsistency(llm_client, parser)
@@ -110,17 +115,20 @@ def run_data_generation_pipeline():
     """
     print("\n--- Running Self-Improvement Data Generation Pipeline ---")
 
-    llm_client = LLMClient(model="gpt-4o-mini")
     output_file = "training_data.jsonl"  # JSON Lines format
+    # Records finished problems, so re-running resumes instead of starting over.
+    # Delete both files for a fresh run.
+    checkpoint_file = "training_data.checkpoint.jsonl"
 
-    # Clear the file for a fresh run
-    open(output_file, "w").close()
-
-    generator = DataGenerator(llm_client, output_file)
+    async def generate():
+        async with AsyncLLMClient(model="gpt-4o-mini") as llm_client:
+            generator = DataGenerator(
+                llm_client, output_file, checkpoint_file=checkpoint_file
+            )
+            # Run the pipeline concurrently for every problem in our bank
+            await generator.arun_many(generator.problem_bank.ids())
 
-    # Run the pipeline for each problem in our bank
-    generator.run(problem_id="math_001")
-    generator.run(problem_id="math_002")
+    asyncio.run(generate())
 
 
 if __name__ == "__main__":
@@ -128,11 +136,18 @@ if __name__ == "__main__":
     print("      COGNITION-SYNTHESIS DEMONSTRATION      ")
     print("=================================================")
 
-    run_last_letter_concatenation_task()
-    run_cot_math_task()
-    run_self_consistency_task()
+    # One client (and so one HTTP connection pool) is shared by every demo.
+    # We use gpt-4o-mini as it's capable and cost-effective
+    llm_client = LLMClient(model="gpt-4o-mini", cache=SQLiteResponseCache(CACHE_FILE))
+
+    run_last_letter_concatenation_task(llm_client)
+    run_cot_math_task(llm_client)
+    run_self_consistency_task(llm_client)
     run_data_generation_pipeline()
 
+    # Per-stage latencies and token counts; use a ".prom" path for Prometheus format
+    metrics.export("metrics.json")
+
     print("\n=================================================")
     print("      DEMONSTRATION COMPLETE                 ")
     print("=================================================")
@@ -0,0 +1,47 @@
+"""Test doubles shared by several test modules."""
+
+import asyncio
+
+import httpx
+
+
+def make_status_error(cls, status_code, headers=None):
+    """Builds an OpenAI API error carrying an HTTP response."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return cls(f"HTTP {status_code}", response=response, body=None)
+
+
+class FakeAsyncLLMClient:
+    """An in-memory stand-in for AsyncLLMClient that tracks concurrency."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.in_flight = 0
+        self.peak = 0
+
+    async def aquery_sample_n(self, prompt, n, sample_offset=0):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.responses[:n]
+
+
+def make_problem_bank(generator, count):
+    generator.problem_bank.problems = [
+        {"id": f"p{i}", "problem": f"Problem {i}", "ground_truth_answer": "70"}
+        for i in range(count)
+    ]
+
+
+class FakeLLMClient:
+    """Serves canned responses in order and records each sampling request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def query_sample_n(self, prompt, n, sample_offset=0):
+        self.requests.append((n, sample_offset))
+        return self.responses[sample_offset : sample_offset + n]
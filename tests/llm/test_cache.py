@@ -0,0 +1,119 @@
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cognition_synthesis.llm.cache import ResponseCache, SQLiteResponseCache
+from cognition_synthesis.llm.client import LLMClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Provides an SQLiteResponseCache in a temporary directory."""
+    return SQLiteResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+
+
+def test_cache_key_depends_on_every_parameter():
+    """
+    Tests that changing any request parameter changes the cache key.
+    """
+    base = ResponseCache.make_key("gpt-4o-mini", "p", 0.0, 1, None)
+    assert base == ResponseCache.make_key("gpt-4o-mini", "p", 0.0, 1, None)
+    assert base != ResponseCache.make_key("gpt-4o", "p", 0.0, 1, None)
+    assert base != ResponseCache.make_key("gpt-4o-mini", "q", 0.0, 1, None)
+    assert base != ResponseCache.make_key("gpt-4o-mini", "p", 0.7, 1, None)
+    assert base != ResponseCache.make_key("gpt-4o-mini", "p", 0.0, 2, None)
+    assert base != ResponseCache.make_key("gpt-4o-mini", "p", 0.0, 1, 42)
+
+
+def test_response_cache_subclasses_must_implement_storage():
+    """
+    Tests that an incomplete cache fails when created, not on its first lookup.
+    """
+
+    class GetOnlyCache(ResponseCache):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
+
+
+def test_sqlite_cache_persists_and_evicts_least_recently_used(tmp_path, cache):
+    """
+    Tests hit/miss counting, persistence across instances and size eviction.
+    """
+    cache.set("a", ["1"])
+    cache.set("b", ["2"])
+    assert cache.get("a") == ["1"]  # "a" is now more recent than "b"
+    cache.set("c", ["3"])
+
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    reopened = SQLiteResponseCache(str(tmp_path / "cache.sqlite"))
+    assert reopened.get("a") == ["1"]
+    assert reopened.get("c") == ["3"]
+
+
+def test_sqlite_cache_expires_old_entries(tmp_path):
+    """
+    Tests that entries older than max_age_seconds are treated as misses.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"), max_age_seconds=60)
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1000.0):
+        cache.set("a", ["1"])
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1030.0):
+        assert cache.get("a") == ["1"]
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1061.0):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_buffers_access_times_of_hits(tmp_path):
+    """
+    Tests that hits do not write to the database until enough of them are
+    buffered, or the cache is flushed or closed.
+    """
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteResponseCache(path, flush_every=3)
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1000.0):
+        cache.set("a", ["1"])
+        cache.set("b", ["2"])
+
+    def accessed():
+        conn = sqlite3.connect(path)
+        rows = dict(conn.execute("SELECT key, accessed FROM responses"))
+        conn.close()
+        return rows
+
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1010.0):
+        cache.get("a")
+        cache.get("b")
+        assert accessed() == {"a": 1000.0, "b": 1000.0}
+        cache.get("a")  # The third buffered hit writes them all
+        assert accessed() == {"a": 1010.0, "b": 1010.0}
+    with patch("cognition_synthesis.llm.cache.time.time", return_value=1020.0):
+        cache.get("b")
+        cache.close()
+    assert accessed() == {"a": 1010.0, "b": 1020.0}
+
+
+@patch("cognition_synthesis.llm.client.OpenAI")
+def test_llm_client_serves_repeated_queries_from_cache(MockOpenAI, cache):
+    """
+    Tests that identical queries reach the API only once when a cache is set.
+    """
+    mock_api_instance = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(), MagicMock()]
+    for choice in mock_response.choices:
+        choice.message.content = "The final answer is 6."
+    mock_api_instance.chat.completions.create.return_value = mock_response
+    MockOpenAI.return_value = mock_api_instance
+
+    client = LLMClient(model="gpt-4o-mini", cache=cache)
+
+    assert client.query_sample_n("prompt", 2) == ["The final answer is 6."] * 2
+    assert client.query_sample_n("prompt", 2) == ["The final answer is 6."] * 2
+    assert mock_api_instance.chat.completions.create.call_count == 1
+    assert cache.hits == 1 and cache.misses == 1
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from cognition_synthesis.llm.cassette import Cassette, CassetteMissError
+from cognition_synthesis.llm.client import AsyncLLMClient
+
+
+def make_upstream(calls):
+    """A fake API that answers every chat completion with numbered choices."""
+
+    def handler(request):
+        calls.append(json.loads(request.content))
+        n = calls[-1].get("n", 1)
+        body = {
+            "id": f"chatcmpl-{len(calls)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": calls[-1]["model"],
+            "choices": [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": f"Call {len(calls)}: the answer is 70"},
+                    "finish_reason": "stop",
+                }
+                for i in range(n)
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5 * n, "total_tokens": 10 + 5 * n},
+        }
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handler)
+
+
+def test_cassette_records_and_replays_without_upstream(tmp_path):
+    """
+    Tests that recorded exchanges replay by request content (ignoring JSON
+    key order and headers), cycle when repeated, and that misses raise.
+    """
+    path = str(tmp_path / "traffic.cassette")
+    calls = []
+    cassette = Cassette(path, mode="record", upstream=make_upstream(calls))
+    with httpx.Client(transport=cassette.transport()) as http:
+        first = http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 1})
+        http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 1})
+    cassette.close()
+    assert len(calls) == 2 and first.json()["id"] == "chatcmpl-1"
+
+    replay = Cassette(path)
+    assert len(replay) == 2
+    with httpx.Client(transport=replay.transport()) as http:
+        ids = [
+            http.post(
+                "https://api.test/v1/chat/completions",
+                content=b'{"n": 1, "model": "m"}',
+                headers={"Authorization": "Bearer other"},
+            ).json()["id"]
+            for _ in range(3)
+        ]
+        with pytest.raises(CassetteMissError):
+            http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 2})
+    assert ids == ["chatcmpl-1", "chatcmpl-2", "chatcmpl-1"]
+    assert replay.stats() == {"hits": 3, "misses": 1, "recorded": 0}
+    assert len(calls) == 2
+
+
+def test_cassette_ignores_a_torn_last_record(tmp_path):
+    """
+    Tests that a record cut short by an interrupted recording is skipped,
+    and truncated away before anything new is recorded.
+    """
+    path = tmp_path / "traffic.cassette"
+    cassette = Cassette(str(path), mode="record", upstream=make_upstream([]))
+    with httpx.Client(transport=cassette.transport()) as http:
+        http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 1})
+        http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 2})
+    cassette.close()
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 3)
+
+    assert len(Cassette(str(path))) == 1
+
+    # Recording again drops the torn bytes, so new records stay reachable
+    cassette = Cassette(str(path), mode="record", upstream=make_upstream([]))
+    with httpx.Client(transport=cassette.transport()) as http:
+        http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 3})
+    cassette.close()
+
+    replay = Cassette(str(path))
+    assert len(replay) == 2
+    with httpx.Client(transport=replay.transport()) as http:
+        response = http.post("https://api.test/v1/chat/completions", json={"model": "m", "n": 3})
+    assert len(response.json()["choices"]) == 3
+
+
+def test_async_client_replays_a_recorded_run(tmp_path, monkeypatch):
+    """
+    Tests that an AsyncLLMClient run recorded through a cassette replays
+    identically, without an API key or any upstream calls.
+    """
+    path = str(tmp_path / "run.cassette")
+    calls = []
+
+    async def sample(cassette):
+        async with AsyncLLMClient(cassette=cassette) as client:
+            return await client.aquery_sample_n("What is 35 * 2?", 3)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    recorder = Cassette(path, mode="record", upstream=make_upstream(calls))
+    recorded = asyncio.run(sample(recorder))
+    recorder.close()
+
+    monkeypatch.delenv("OPENAI_API_KEY")
+    replayed = asyncio.run(sample(Cassette(path)))
+
+    assert recorded == replayed == ["Call 1: the answer is 70"] * 3
+    assert len(calls) == 1
@@ -1,5 +1,12 @@
-from unittest.mock import MagicMock, patch
-from cognition_synthesis.llm.client import LLMClient
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import openai
+import pytest
+
+from cognition_synthesis.llm.client import AsyncLLMClient, LLMClient, LLMRequestError
+from cognition_synthesis.llm.scheduler import RateLimitScheduler
+from tests.fakes import make_status_error
 
 
 # This is a decorator to mock the OpenAI class during our test
@@ -34,3 +41,167 @@ def test_llm_client_query(MockOpenAI):
     )
 
     assert result == "LE"
+
+
+@patch("cognition_synthesis.llm.client.AsyncOpenAI")
+def test_async_llm_client_caps_in_flight_requests(MockAsyncOpenAI):
+    """
+    Tests that AsyncLLMClient samples completions concurrently while never
+    exceeding its max_concurrency limit.
+    """
+    in_flight = 0
+    peak = 0
+
+    async def fake_create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        response = MagicMock()
+        response.choices = [MagicMock() for _ in range(kwargs["n"])]
+        for choice in response.choices:
+            choice.message.content = " The final answer is 6. "
+        return response
+
+    mock_api_instance = MagicMock()
+    mock_api_instance.chat.completions.create = AsyncMock(side_effect=fake_create)
+    MockAsyncOpenAI.return_value = mock_api_instance
+
+    client = AsyncLLMClient(model="gpt-4o-mini", max_concurrency=3)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(client.aquery_sample_n(f"prompt {i}", 2) for i in range(10))
+        )
+
+    results = asyncio.run(run_all())
+
+    assert len(results) == 10
+    assert all(r == ["The final answer is 6.", "The final answer is 6."] for r in results)
+    assert peak == 3
+    assert mock_api_instance.chat.completions.create.await_count == 10
+
+
+@patch("cognition_synthesis.llm.client.OpenAI")
+def test_llm_client_query_until_answer_cancels_stream(MockOpenAI):
+    """
+    Tests that streaming stops, and the HTTP stream is closed, as soon as the
+    final answer line has arrived.
+    """
+    deltas = ["Adding up, ", "The final answer is 70", ".\n", "Let me explain", "..."]
+    consumed = []
+
+    class FakeStream:
+        closed = False
+
+        def __iter__(self):
+            for delta in deltas:
+                consumed.append(delta)
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = delta
+                yield chunk
+
+        def close(self):
+            self.closed = True
+
+    stream = FakeStream()
+    mock_api_instance = MagicMock()
+    mock_api_instance.chat.completions.create.return_value = stream
+    MockOpenAI.return_value = mock_api_instance
+
+    client = LLMClient(model="gpt-4o-mini")
+    text, answer = client.query_until_answer("Test prompt")
+
+    assert answer == "70"
+    assert text == "Adding up, The final answer is 70.\n"
+    assert consumed == deltas[:3]
+    assert stream.closed
+    assert mock_api_instance.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+@patch("cognition_synthesis.llm.client.OpenAI")
+def test_llm_client_tracks_cached_prompt_tokens(MockOpenAI):
+    """
+    Tests that prompt tokens served from the provider's cache are counted.
+    """
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "The final answer is 6."
+    mock_response.usage.prompt_tokens = 1500
+    mock_response.usage.completion_tokens = 20
+    mock_response.usage.prompt_tokens_details.cached_tokens = 1280
+    MockOpenAI.return_value.chat.completions.create.return_value = mock_response
+
+    client = LLMClient()
+    client.query("first")
+    mock_response.usage.prompt_tokens_details = None
+    client.query("second")
+
+    assert client.usage == {
+        "requests": 2,
+        "prompt_tokens": 3000,
+        "completion_tokens": 40,
+        "cached_tokens": 1280,
+    }
+
+
+@patch("cognition_synthesis.llm.client.OpenAI")
+def test_llm_client_query_raises_instead_of_answering_with_the_error(MockOpenAI):
+    """
+    Tests that a failed request raises rather than returning error text as
+    if it were the model's answer, or an empty batch of samples.
+    """
+    MockOpenAI.return_value.chat.completions.create.side_effect = make_status_error(
+        openai.RateLimitError, 429
+    )
+
+    with pytest.raises(LLMRequestError):
+        LLMClient().query("prompt")
+    with pytest.raises(LLMRequestError):
+        LLMClient().query_sample_n("prompt", 3)
+
+
+@patch("cognition_synthesis.llm.client.AsyncOpenAI")
+def test_async_llm_client_raises_once_the_scheduler_gives_up(MockAsyncOpenAI):
+    """
+    Tests that aquery raises after the scheduler's retries are used up,
+    chaining the last API error.
+    """
+    create = AsyncMock(side_effect=make_status_error(openai.RateLimitError, 429))
+    MockAsyncOpenAI.return_value.chat.completions.create = create
+    client = AsyncLLMClient(scheduler=RateLimitScheduler(max_retries=1, base_delay=0.001))
+
+    with pytest.raises(LLMRequestError) as excinfo:
+        asyncio.run(client.aquery("prompt"))
+
+    assert isinstance(excinfo.value.__cause__, openai.RateLimitError)
+    assert create.await_count == 2
+    with pytest.raises(LLMRequestError):
+        asyncio.run(client.aquery_sample_n("prompt", 3))
+
+
+@patch("cognition_synthesis.llm.client.AsyncOpenAI")
+def test_async_llm_client_serves_successive_event_loops(MockAsyncOpenAI):
+    """
+    Tests that a client (and its scheduler) keeps working across separate
+    asyncio.run calls, as when run_all is called twice on one generator.
+    """
+
+    async def fake_create(**kwargs):
+        await asyncio.sleep(0.001)
+        response = MagicMock()
+        response.choices = [MagicMock() for _ in range(kwargs["n"])]
+        for choice in response.choices:
+            choice.message.content = "The final answer is 6."
+        return response
+
+    MockAsyncOpenAI.return_value.chat.completions.create = fake_create
+    client = AsyncLLMClient(max_concurrency=1, scheduler=RateLimitScheduler())
+
+    async def burst():
+        # More requests than slots, so they wait on the semaphore and scheduler
+        return await asyncio.gather(*(client.aquery_sample_n(f"p{i}", 1) for i in range(4)))
+
+    for _ in range(2):
+        assert asyncio.run(burst()) == [["The final answer is 6."]] * 4
+    assert MockAsyncOpenAI.call_count == 2
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import openai
+import pytest
+
+from cognition_synthesis.llm.scheduler import RateLimitScheduler, TokenBucket
+from tests.fakes import make_status_error
+
+
+def test_token_bucket_reports_wait_until_refilled():
+    """
+    Tests that a drained bucket reports the time needed to refill.
+    """
+    bucket = TokenBucket(rate_per_minute=600, capacity=10)  # 10 per second
+    bucket.consume(10)
+    assert bucket.wait_time(5) == pytest.approx(0.5, abs=0.05)
+    # Requests bigger than the bucket only wait for a full bucket
+    assert bucket.wait_time(50) == pytest.approx(1.0, abs=0.05)
+
+
+def test_scheduler_retries_rate_limits_honouring_retry_after():
+    """
+    Tests that 429s are retried after the Retry-After delay and then succeed.
+    """
+    scheduler = RateLimitScheduler(base_delay=0.01)
+    attempts = []
+
+    async def request():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise make_status_error(
+                openai.RateLimitError, 429, {"retry-after-ms": "50"}
+            )
+        return "ok"
+
+    assert asyncio.run(scheduler.run(request)) == "ok"
+    assert len(attempts) == 3
+    assert scheduler.retries == 2
+    assert attempts[1] - attempts[0] >= 0.05
+
+
+def test_scheduler_does_not_retry_client_errors():
+    """
+    Tests that non-transient errors such as a 400 are raised immediately.
+    """
+    scheduler = RateLimitScheduler(base_delay=0.01)
+    attempts = 0
+
+    async def request():
+        nonlocal attempts
+        attempts += 1
+        raise make_status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(scheduler.run(request))
+    assert attempts == 1
+
+
+def test_scheduler_gives_up_after_max_retries():
+    """
+    Tests that the last error is raised once the retries are used up.
+    """
+    scheduler = RateLimitScheduler(max_retries=2, base_delay=0.001)
+    attempts = 0
+
+    async def request():
+        nonlocal attempts
+        attempts += 1
+        raise make_status_error(openai.InternalServerError, 503)
+
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(scheduler.run(request))
+    assert attempts == 3
+
+
+def test_scheduler_dispatches_waiting_callers_by_priority():
+    """
+    Tests that, once the request quota is exhausted, waiting callers are
+    dispatched lowest priority value first.
+    """
+    scheduler = RateLimitScheduler(requests_per_minute=1200)  # 20 per second
+    scheduler.request_bucket.capacity = 1
+    scheduler.request_bucket.tokens = 0
+    order = []
+
+    def make_request(name):
+        async def request():
+            order.append(name)
+
+        return request
+
+    async def main():
+        await asyncio.gather(
+            scheduler.run(make_request("low"), priority=5),
+            scheduler.run(make_request("high"), priority=1),
+            scheduler.run(make_request("medium"), priority=3),
+        )
+
+    start = time.monotonic()
+    asyncio.run(main())
+
+    assert order == ["high", "medium", "low"]
+    assert time.monotonic() - start >= 0.1
@@ -1,5 +1,5 @@
 import pytest
-from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.parsing.parser import AnswerParser, StreamingAnswerParser
 
 
 @pytest.fixture
@@ -40,3 +40,58 @@ def test_extract_answer(parser, input_text, expected_answer):
     Tests the extract_answer method with various text formats.
     """
     assert parser.extract_answer(input_text) == expected_answer
+
+
+def test_extract_answer_prefers_final_answer_later_on_the_same_line(parser):
+    """
+    Tests that phrase priority holds even when a lower-priority phrase
+    appears first on the same line.
+    """
+    text = "The answer is 5, or so I thought. The final answer is 6."
+    assert parser.extract_answer(text) == "6"
+
+
+def test_extract_answer_is_fast_on_long_responses_without_an_answer(parser):
+    """
+    Tests that the trailing-number fallback does not backtrack across long
+    responses that end without a number.
+    """
+    text = "12 apples, " * 20000 + "nothing numeric here at the very end!"
+    assert parser.extract_answer(text) is None
+
+
+def test_extract_answers_matches_extract_answer(parser):
+    """
+    Tests that the batch API returns one answer per input, in order.
+    """
+    texts = ["The final answer is 6.", "There is no answer here.", "So 7 left."]
+    assert parser.extract_answers(texts) == ["6", None, "7"]
+
+
+@pytest.mark.parametrize(
+    "chunks, answer_at, expected_answer",
+    [
+        # The phrase and the answer are split across chunk boundaries
+        (["Step 1. The fi", "nal ans", "wer is: 7", "0.\n", "Extra."], 3, "70"),
+        # Markdown bold markers split across chunks are removed
+        (["The final answer is *", "*le*", "*.\n"], 2, "le"),
+        # No terminating newline: the answer is only known at the end
+        (["The final answer is 6."], None, "6"),
+        # No explicit phrase: fall back to the full parser when finished
+        (["So, you have 6 ", "apples left."], None, "6"),
+    ],
+)
+def test_streaming_parser(chunks, answer_at, expected_answer):
+    """
+    Tests that the streaming parser reports the answer as soon as its line is
+    complete, and agrees with AnswerParser on the full text.
+    """
+    streaming = StreamingAnswerParser()
+    seen_at = None
+    for i, chunk in enumerate(chunks):
+        if streaming.feed(chunk) is not None and seen_at is None:
+            seen_at = i
+
+    assert seen_at == answer_at
+    assert streaming.finish() == expected_answer
+    assert AnswerParser().extract_answer("".join(chunks)) == expected_answer
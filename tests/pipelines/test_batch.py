@@ -0,0 +1,141 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cognition_synthesis.llm.client import LLMClient
+from cognition_synthesis.pipelines.batch import BatchDataGenerator
+from cognition_synthesis.verification.verifier import ProblemBank
+
+
+class StubBatchAPI(BaseHTTPRequestHandler):
+    """
+    A minimal stand-in for the OpenAI Files and Batches endpoints. Each
+    batch completes on its second poll; every other sample is correct.
+    """
+
+    files = {}
+    batches = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        if self.path == "/v1/files":
+            # Pull the JSONL request lines out of the multipart upload
+            requests = [
+                json.loads(line) for line in body.splitlines() if line.startswith("{")
+            ]
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = requests
+            self._send_json({"id": file_id, "object": "file", "purpose": "batch"})
+        elif self.path == "/v1/batches":
+            params = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = {"input": params["input_file_id"], "polls": 0}
+            self._send_json(self._batch(batch_id))
+
+    def do_GET(self):
+        match = re.fullmatch(r"/v1/batches/(.+)", self.path)
+        if match:
+            self.batches[match.group(1)]["polls"] += 1
+            self._send_json(self._batch(match.group(1)))
+            return
+        match = re.fullmatch(r"/v1/files/(.+)/content", self.path)
+        lines = "".join(json.dumps(record) + "\n" for record in self.files[match.group(1)])
+        body = lines.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _batch(self, batch_id):
+        state = self.batches[batch_id]
+        completed = state["polls"] >= 2
+        output_file_id = None
+        if completed:
+            output_file_id = f"file-{len(self.files)}"
+            self.files[output_file_id] = [
+                self._result(request) for request in self.files[state["input"]]
+            ]
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": state["input"],
+            "completion_window": "24h",
+            "created_at": 0,
+            "status": "completed" if completed else "in_progress",
+            "output_file_id": output_file_id,
+            "error_file_id": None,
+        }
+
+    @staticmethod
+    def _result(request):
+        n = request["body"]["n"]
+        choices = [
+            {"message": {"content": f"The final answer is {70 if i % 2 == 0 else 71}."}}
+            for i in range(n)
+        ]
+        return {
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "body": {"choices": choices}},
+            "error": None,
+        }
+
+
+@pytest.fixture
+def stub_server():
+    """Runs the stub Batch API on a free local port."""
+    StubBatchAPI.files = {}
+    StubBatchAPI.batches = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBatchAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+
+
+def test_batch_generator_round_trip(stub_server, tmp_path, monkeypatch):
+    """
+    Tests writing, submitting, polling and collecting a batch end to end.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    output_file = tmp_path / "out.jsonl"
+    request_file = tmp_path / "requests.jsonl"
+    bank = ProblemBank(
+        problems=[
+            {"id": f"p{i}", "problem": f"Problem {i}", "ground_truth_answer": "70"}
+            for i in range(3)
+        ]
+    )
+    generator = BatchDataGenerator(
+        LLMClient(base_url=stub_server),
+        str(output_file),
+        checkpoint_file=str(tmp_path / "checkpoint.jsonl"),
+        problem_bank=bank,
+    )
+
+    results = generator.run_batch(
+        bank.ids(), n_samples=4, request_file=str(request_file), poll_interval=0.01
+    )
+
+    assert results == {"p0": 2, "p1": 2, "p2": 2}
+    requests = [json.loads(line) for line in request_file.read_text().splitlines()]
+    assert [r["custom_id"] for r in requests] == ["p0", "p1", "p2"]
+    assert requests[0]["body"]["n"] == 4
+    assert len(output_file.read_text().splitlines()) == 6
+
+    # With the checkpoint, a second run has nothing left to request
+    assert generator.write_requests(str(request_file), bank.ids(), n_samples=4) == 0
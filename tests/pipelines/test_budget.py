@@ -0,0 +1,169 @@
+import json
+
+import pytest
+
+from cognition_synthesis.llm.client import LLMRequestError
+from cognition_synthesis.pipelines.budget import BudgetPlanner
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+
+
+class FakeUsageClient:
+    """Answers each problem correctly at a fixed rate and tracks usage like the real client."""
+
+    model = "fake-model"
+
+    def __init__(self, hit_rates):
+        self.hit_rates = hit_rates
+        self.offsets = []
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def aquery_sample_n(self, prompt, n, sample_offset=0):
+        self.offsets.append((prompt, sample_offset))
+        self.usage["requests"] += 1
+        self.usage["prompt_tokens"] += 100
+        self.usage["completion_tokens"] += 50 * n
+        rate = next(r for key, r in self.hit_rates.items() if key in prompt)
+        responses = []
+        for i in range(sample_offset, sample_offset + n):
+            # Deterministic: the first `rate` share of every 10 samples is correct
+            correct = (i % 10) < rate * 10
+            answer = 70 if correct else 60
+            responses.append(f"Attempt {i}: the answer is {answer}")
+        return responses
+
+
+def make_generator(tmp_path, hit_rates, **kwargs):
+    client = FakeUsageClient(hit_rates)
+    generator = DataGenerator(client, str(tmp_path / "out.jsonl"), verbose=False, **kwargs)
+    generator.problem_bank.problems = [
+        {"id": key, "problem": f"Problem {key}", "ground_truth_answer": "70"}
+        for key in hit_rates
+    ]
+    return generator, client
+
+
+def test_planner_spends_more_on_high_yield_problems(tmp_path):
+    """
+    Tests that after exploring every problem, extra samples go to the easy
+    problem rather than the hard one, within the sample budget.
+    """
+    generator, _ = make_generator(tmp_path, {"easy": 0.8, "hard": 0.0})
+    planner = BudgetPlanner(
+        generator,
+        budget=20,
+        unit="samples",
+        max_paths_per_problem=100,
+        min_yield=0.3,
+        verbose=False,
+    )
+
+    results = planner.run(concurrency=1)
+
+    report = planner.report()
+    assert report["spent"] == 20
+    assert report["problems"]["hard"]["drawn"] == 2
+    assert report["problems"]["hard"]["saturated"] == "low yield"
+    assert report["problems"]["easy"]["drawn"] == 18
+    assert results == {"easy": 16, "hard": 0}
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert len(lines) == 16
+
+
+def test_planner_stops_sampling_saturated_problems(tmp_path):
+    """
+    Tests that a problem with enough paths gets no more samples, and the
+    planner stops when every problem is saturated, leaving budget unspent.
+    """
+    generator, client = make_generator(tmp_path, {"a": 1.0, "b": 1.0})
+    planner = BudgetPlanner(
+        generator, budget=1000, unit="requests", max_paths_per_problem=4, verbose=False
+    )
+
+    assert planner.run() == {"a": 4, "b": 4}
+    assert planner.report()["spent"] == 4 == client.usage["requests"]
+    # Each batch continues where the previous one stopped, so none is a cache replay
+    assert sorted(offset for _, offset in client.offsets) == [0, 0, 2, 2]
+
+
+def test_planner_reports_expected_and_actual_yield_per_dollar(tmp_path):
+    """
+    Tests that a USD budget is enforced from token usage and that the report
+    compares the expected and actual paths per dollar.
+    """
+    generator, _ = make_generator(tmp_path, {"a": 0.5, "b": 0.5})
+    # Each 2-sample request costs 100 prompt + 100 completion tokens = $0.0002
+    planner = BudgetPlanner(
+        generator,
+        budget=0.001,
+        unit="usd",
+        prices={"fake-model": (1.0, 1.0)},
+        max_paths_per_problem=100,
+        verbose=False,
+    )
+
+    planner.run()
+
+    report = planner.report()
+    assert 0.0009 <= report["usd"] <= 0.001
+    assert report["actual_paths"] > 0
+    assert report["actual_paths_per_usd"] == pytest.approx(
+        report["actual_paths"] / report["usd"]
+    )
+    assert report["expected_paths_per_usd"] == pytest.approx(
+        report["expected_paths"] / report["usd"]
+    )
+    json.dumps(report)
+
+
+def test_planner_validates_its_budget(tmp_path):
+    """
+    Tests that unknown units, non-positive budgets and unpriced USD budgets are rejected.
+    """
+    generator, _ = make_generator(tmp_path, {"a": 1.0})
+    with pytest.raises(ValueError):
+        BudgetPlanner(generator, budget=10, unit="minutes")
+    with pytest.raises(ValueError):
+        BudgetPlanner(generator, budget=0)
+    with pytest.raises(ValueError):
+        BudgetPlanner(generator, budget=1.0, unit="usd")
+
+
+def test_planner_records_why_a_problem_failed(tmp_path):
+    """
+    Tests that a failed request stops sampling that problem only, and the
+    report names the error type.
+    """
+    generator, client = make_generator(tmp_path, {"ok": 1.0, "broken": 1.0})
+    sample = client.aquery_sample_n
+
+    async def fail_broken(prompt, n, sample_offset=0):
+        if "broken" in prompt:
+            raise LLMRequestError("Sampling request failed: 400")
+        return await sample(prompt, n, sample_offset)
+
+    client.aquery_sample_n = fail_broken
+    planner = BudgetPlanner(
+        generator, budget=6, unit="samples", max_paths_per_problem=100, verbose=False
+    )
+
+    assert planner.run() == {"ok": 6, "broken": 0}
+    assert planner.report()["problems"]["broken"]["saturated"] == "error: LLMRequestError"
+
+
+def test_planner_reads_problems_only_when_it_samples_them(tmp_path):
+    """
+    Tests that the planner keeps only problem IDs up front, reading a
+    problem from the bank when samples are allocated to it, and skips IDs
+    the bank does not have.
+    """
+    generator, _ = make_generator(tmp_path, {"a": 1.0, "b": 1.0, "c": 1.0})
+    bank = generator.problem_bank
+    read = []
+    get_problem = bank.get_problem
+    bank.get_problem = lambda problem_id: read.append(problem_id) or get_problem(problem_id)
+    planner = BudgetPlanner(
+        generator, budget=2, unit="samples", max_paths_per_problem=100, verbose=False
+    )
+
+    assert planner.run(["a", "missing", "b", "c"], concurrency=1) == {"a": 2, "b": 0, "c": 0}
+    assert read == ["a"]
@@ -0,0 +1,35 @@
+from cognition_synthesis.pipelines.checkpoint import Checkpoint
+
+
+def test_commits_after_a_torn_line_survive_reload(tmp_path):
+    """
+    Tests that a torn last line from a crash is dropped before the next
+    commit, so commits recorded after resuming are not lost on reload.
+    """
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(str(path))
+    checkpoint.record("p1", 8, 100)
+    with open(path, "a") as f:
+        f.write('{"problem_id": "p2", "sam')
+
+    resumed = Checkpoint(str(path))
+    assert resumed.samples_done == {"p1": 8}
+    resumed.record("p2", 8, 200)
+    resumed.record("p3", 4, 250)
+
+    reloaded = Checkpoint(str(path))
+    assert reloaded.samples_done == {"p1": 8, "p2": 8, "p3": 4}
+    assert reloaded.committed_offset == 250
+    assert list(reloaded.commits()) == [("p1", 0, 100), ("p2", 100, 200), ("p3", 200, 250)]
+
+
+def test_reading_a_checkpoint_does_not_modify_it(tmp_path):
+    """
+    Tests that only recording repairs a torn tail, so merging another
+    worker's live checkpoint never truncates it.
+    """
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text('{"problem_id": "p1", "samples": 8, "offset": 100}\n{"problem_id"')
+
+    assert list(Checkpoint(str(path)).commits()) == [("p1", 0, 100)]
+    assert path.read_text().endswith('{"problem_id"')
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from tests.fakes import FakeAsyncLLMClient, make_problem_bank
+
+
+def test_arun_many_streams_correct_paths_with_bounded_concurrency(tmp_path):
+    """
+    Tests that arun_many processes every problem, never runs more than
+    `concurrency` problems at once, and writes only the verified paths.
+    """
+    output_file = tmp_path / "out.jsonl"
+    client = FakeAsyncLLMClient(
+        ["So the total is 70.", "The final answer is 60.", "The answer is 70"]
+    )
+    generator = DataGenerator(client, str(output_file))
+    make_problem_bank(generator, 12)
+
+    results = asyncio.run(
+        generator.arun_many(generator.problem_bank.ids(), n_samples=3, concurrency=4)
+    )
+
+    assert results == {f"p{i}": 2 for i in range(12)}
+    assert client.peak == 4
+
+    lines = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert len(lines) == 24
+    assert {line["reasoning_path"] for line in lines} == {
+        "So the total is 70.",
+        "The answer is 70",
+    }
+
+
+def test_run_all_reports_missing_problem_as_zero(tmp_path):
+    """
+    Tests that run_all covers the whole bank and unknown IDs yield no paths.
+    """
+    output_file = tmp_path / "out.jsonl"
+    generator = DataGenerator(FakeAsyncLLMClient(["70"]), str(output_file))
+    make_problem_bank(generator, 2)
+
+    assert generator.run_all(n_samples=1, concurrency=2) == {"p0": 1, "p1": 1}
+    assert asyncio.run(generator.arun_many(["missing"])) == {"missing": 0}
+
+
+def test_checkpointed_run_resumes_and_discards_torn_writes(tmp_path):
+    """
+    Tests that a checkpointed run skips completed problems on resume, tops up
+    partially sampled ones, and truncates output written after the last commit.
+    """
+    output_file = tmp_path / "out.jsonl"
+    checkpoint_file = tmp_path / "checkpoint.jsonl"
+    client = FakeAsyncLLMClient(["The answer is 70", "The answer is 70"])
+
+    generator = DataGenerator(
+        client, str(output_file), checkpoint_file=str(checkpoint_file)
+    )
+    make_problem_bank(generator, 2)
+    assert generator.run_all(n_samples=2) == {"p0": 2, "p1": 2}
+    committed = output_file.read_bytes()
+
+    # Simulate a crash that left half a batch behind
+    with open(output_file, "ab") as f:
+        f.write(b'{"problem": "torn')
+
+    resumed = DataGenerator(
+        client, str(output_file), checkpoint_file=str(checkpoint_file)
+    )
+    make_problem_bank(resumed, 3)
+    assert output_file.read_bytes() == committed
+
+    results = resumed.run_all(n_samples=2)
+    assert results == {"p0": 0, "p1": 0, "p2": 2}
+    assert resumed.checkpoint.samples_remaining("p0", 3) == 1
+    assert len(output_file.read_text().splitlines()) == 6
+
+
+def test_fresh_run_clears_previous_output(tmp_path):
+    """
+    Tests that resume=False discards both the output and the checkpoint.
+    """
+    output_file = tmp_path / "out.jsonl"
+    checkpoint_file = tmp_path / "checkpoint.jsonl"
+    output_file.write_text("stale\n")
+    checkpoint_file.write_text('{"problem_id": "p0", "samples": 8, "offset": 6}\n')
+
+    generator = DataGenerator(
+        FakeAsyncLLMClient(["70"]),
+        str(output_file),
+        checkpoint_file=str(checkpoint_file),
+        resume=False,
+    )
+    make_problem_bank(generator, 1)
+
+    assert generator.run_all(n_samples=1) == {"p0": 1}
+    assert "stale" not in output_file.read_text()
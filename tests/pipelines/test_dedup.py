@@ -0,0 +1,66 @@
+import json
+
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.pipelines.dedup import PathDeduplicator
+from tests.fakes import FakeAsyncLLMClient, make_problem_bank
+
+BASE = (
+    "Monday sold 15 apples. Tuesday sold twice as many, so 30 apples. "
+    "Wednesday sold 5 fewer than Tuesday, so 25 apples. "
+    "Adding them up gives 15 + 30 + 25 = 70. The final answer is 70."
+)
+REWORDED = BASE.replace("Adding them up", "Summing them up")
+DIFFERENT = (
+    "Let x be Monday's sales, 15. Then Tuesday is 2x = 30 and Wednesday is "
+    "2x - 5 = 25, so the three days total 4x + 10 which is 70. The final answer is 70."
+)
+
+
+def test_deduplicator_drops_exact_and_near_duplicates():
+    """
+    Tests exact (modulo case and whitespace) and near-duplicate detection,
+    and that state carries across calls for the same problem only.
+    """
+    dedup = PathDeduplicator()
+    kept = dedup.filter("p0", [BASE, "  " + BASE.upper(), REWORDED, DIFFERENT])
+
+    assert kept == [BASE, DIFFERENT]
+    assert dedup.filter("p0", [REWORDED]) == []
+    assert dedup.filter("p1", [REWORDED]) == [REWORDED]
+    assert dedup.stats("p0") == {
+        "candidates": 5,
+        "exact_duplicates": 1,
+        "near_duplicates": 2,
+        "kept": 2,
+    }
+
+
+def test_deduplicator_memory_is_bounded():
+    """
+    Tests that only the most recently used problems stay indexed.
+    """
+    dedup = PathDeduplicator(max_problems=2)
+    dedup.filter("p0", [BASE])
+    dedup.filter("p1", [BASE])
+    dedup.filter("p0", [DIFFERENT])
+    dedup.filter("p2", [BASE])
+
+    assert dedup.stats("p1") is None
+    assert dedup.stats("p0")["kept"] == 2
+    assert len(dedup.sketch([f"w{i}" for i in range(500)])) == dedup.sketch_size
+
+
+def test_data_generator_deduplicates_before_writing(tmp_path):
+    """
+    Tests that DataGenerator writes only distinct verified paths.
+    """
+    output_file = tmp_path / "out.jsonl"
+    client = FakeAsyncLLMClient([BASE, BASE, REWORDED, DIFFERENT])
+    generator = DataGenerator(
+        client, str(output_file), verbose=False, deduplicator=PathDeduplicator()
+    )
+    make_problem_bank(generator, 1)
+
+    assert generator.run_all(n_samples=4) == {"p0": 2}
+    lines = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [line["reasoning_path"] for line in lines] == [BASE, DIFFERENT]
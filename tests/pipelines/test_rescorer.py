@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from cognition_synthesis.pipelines.rescorer import Rescorer
+from cognition_synthesis.verification.verifier import ProblemBank
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return str(path)
+
+
+def test_rescorer_scores_records_in_order(tmp_path):
+    """
+    Tests that every record is scored and written back in input order,
+    across several chunks and worker processes.
+    """
+    bank_file = write_jsonl(
+        tmp_path / "problems.jsonl",
+        [
+            {"id": "a", "problem": "A", "ground_truth_answer": "70"},
+            {"id": "b", "problem": "B", "ground_truth_answer": "360"},
+        ],
+    )
+    records = [
+        {"problem_id": "a" if i % 2 else "b", "response": f"The answer is {i}.", "i": i}
+        for i in range(400)
+    ]
+    records[70]["response"] = "So the final answer is **70**"
+    records[360]["response"] = "Thus the total distance is 360 km."
+    input_file = write_jsonl(tmp_path / "paths.jsonl", records)
+    output_file = tmp_path / "scored.jsonl"
+
+    rescorer = Rescorer(problem_bank=ProblemBank(bank_file), processes=2, chunk_size=7)
+    stats = rescorer.run(input_file, str(output_file))
+
+    scored = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [r["i"] for r in scored] == list(range(400))
+    assert [r["i"] for r in scored if r["is_correct"]] == [360]
+    assert scored[70]["extracted_answer"] == "70"
+    assert stats == {"records": 400, "correct": 1, "missing_problems": 0}
+
+
+def test_rescorer_uses_inline_ground_truth_and_flags_unknown_problems(tmp_path):
+    """
+    Tests inline ground truth, the "reasoning_path" key, and unknown problem IDs.
+    """
+    input_file = write_jsonl(
+        tmp_path / "paths.jsonl",
+        [
+            {"reasoning_path": "The answer is 42", "ground_truth_answer": "42.0"},
+            {"problem_id": "math_001", "response": "The answer is 70"},
+            {"problem_id": "nope", "response": "The answer is 70"},
+        ],
+    )
+    output_file = tmp_path / "scored.jsonl"
+
+    stats = Rescorer(processes=1).run(input_file, str(output_file))
+
+    scored = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [r["is_correct"] for r in scored] == [True, True, False]
+    assert stats == {"records": 3, "correct": 2, "missing_problems": 1}
+
+
+def test_rescorer_rejects_bad_chunk_size():
+    """
+    Tests that a non-positive chunk size is rejected.
+    """
+    with pytest.raises(ValueError):
+        Rescorer(chunk_size=0)
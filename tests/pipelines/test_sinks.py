@@ -0,0 +1,121 @@
+import pytest
+
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.pipelines.sinks import (
+    CompactSink,
+    JsonlSink,
+    OutputSink,
+    compact_to_jsonl,
+    read_compact,
+)
+from tests.fakes import FakeAsyncLLMClient, make_problem_bank
+
+PROBLEMS = [
+    {"id": f"p{i}", "problem": f"Problem {i}: " + "a long statement " * 50}
+    for i in range(20)
+]
+
+
+def write_all(sink):
+    for problem in PROBLEMS:
+        sink.write(problem, [f"Path {j} for {problem['id']}" for j in range(8)])
+    sink.close()
+
+
+def test_compact_sink_round_trips_and_converts_to_jsonl(tmp_path):
+    """
+    Tests that the compact format is much smaller than JSONL and converts
+    back to byte-identical JSONL.
+    """
+    jsonl_file, compact_file = tmp_path / "out.jsonl", tmp_path / "out.csd"
+    write_all(JsonlSink(str(jsonl_file)))
+    # A small buffer forces several blocks, each storing its problems once
+    write_all(CompactSink(str(compact_file), buffer_bytes=2000))
+
+    records = list(read_compact(str(compact_file)))
+    assert len(records) == 160
+    assert records[9] == {
+        "problem_id": "p1",
+        "problem": PROBLEMS[1]["problem"],
+        "reasoning_path": "Path 1 for p1",
+    }
+    assert compact_file.stat().st_size * 10 < jsonl_file.stat().st_size
+
+    converted = tmp_path / "converted.jsonl"
+    assert compact_to_jsonl(str(compact_file), str(converted)) == 160
+    assert converted.read_bytes() == jsonl_file.read_bytes()
+
+
+def test_read_compact_rejects_torn_and_foreign_files(tmp_path):
+    """
+    Tests that a partially written block and a non-compact file are reported.
+    """
+    compact_file = tmp_path / "out.csd"
+    write_all(CompactSink(str(compact_file)))
+    with open(compact_file, "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")
+    with pytest.raises(ValueError, match="truncated"):
+        list(read_compact(str(compact_file)))
+
+    jsonl_file = tmp_path / "out.jsonl"
+    jsonl_file.write_text('{"problem": "x"}\n')
+    with pytest.raises(ValueError, match="not a compact"):
+        list(read_compact(str(jsonl_file)))
+
+
+def test_data_generator_compact_output_resumes_at_block_boundary(tmp_path):
+    """
+    Tests that a checkpointed compact run truncates torn blocks on resume.
+    """
+    output_file = tmp_path / "out.csd"
+    checkpoint_file = tmp_path / "checkpoint.jsonl"
+    client = FakeAsyncLLMClient(["The answer is 70", "The answer is 60"])
+
+    generator = DataGenerator(
+        client,
+        str(output_file),
+        checkpoint_file=str(checkpoint_file),
+        verbose=False,
+        output_format="compact",
+    )
+    make_problem_bank(generator, 2)
+    assert generator.run_all(n_samples=2) == {"p0": 1, "p1": 1}
+    with open(output_file, "ab") as f:
+        f.write(b"\x00\x00\x10\x00torn")
+
+    resumed = DataGenerator(
+        client,
+        str(output_file),
+        checkpoint_file=str(checkpoint_file),
+        verbose=False,
+        output_format="compact",
+    )
+    make_problem_bank(resumed, 3)
+    assert resumed.run_all(n_samples=2) == {"p0": 0, "p1": 0, "p2": 1}
+
+    records = list(read_compact(str(output_file)))
+    assert [r["problem_id"] for r in records] == ["p0", "p1", "p2"]
+    assert {r["reasoning_path"] for r in records} == {"The answer is 70"}
+
+
+def test_data_generator_rejects_unknown_output_format(tmp_path):
+    """
+    Tests that an unknown output format is rejected up front.
+    """
+    with pytest.raises(ValueError):
+        DataGenerator(None, str(tmp_path / "out"), output_format="parquet")
+
+
+def test_output_sink_is_abstract(tmp_path):
+    """
+    Tests that a sink missing its encoding hooks fails when it is created.
+    """
+
+    class IncompleteSink(OutputSink):
+        def _add(self, problem_data, reasoning_paths):
+            return 0
+
+    with pytest.raises(TypeError):
+        OutputSink(str(tmp_path / "out"))
+    with pytest.raises(TypeError):
+        IncompleteSink(str(tmp_path / "out"))
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from cognition_synthesis.llm.client import LLMRequestError
+from cognition_synthesis.pipelines.data_generator import DataGenerator
+from cognition_synthesis.pipelines.sinks import read_compact
+from cognition_synthesis.pipelines.work_queue import QueueWorker, WorkQueue
+from cognition_synthesis.reasoning.paths import ReasoningPaths
+from tests.fakes import FakeAsyncLLMClient, make_problem_bank
+
+
+def make_worker(tmp_path, queue, name, output_format="jsonl"):
+    generator = DataGenerator(
+        FakeAsyncLLMClient(["The answer is 70", "The answer is 60"]),
+        str(tmp_path / f"{name}.out"),
+        checkpoint_file=str(tmp_path / f"{name}.checkpoint.jsonl"),
+        verbose=False,
+        output_format=output_format,
+    )
+    make_problem_bank(generator, 10)
+    return QueueWorker(generator, queue, name, output_format)
+
+
+def test_leases_expire_and_are_redelivered(tmp_path):
+    """
+    Tests lease exclusivity, expiry, re-delivery, lost leases and max attempts.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=0.05, max_attempts=2)
+    assert queue.enqueue(["p0", "p1"]) == 2
+    assert queue.enqueue(["p1", "p2"]) == 1
+
+    assert queue.lease("a", 2) == ["p0", "p1"]
+    assert queue.lease("b", 2) == ["p2"]
+    time.sleep(0.1)
+    queue.heartbeat("b", ["p2"])
+
+    # a's leases expired, so b picks them up and a can no longer complete them
+    assert queue.lease("b", 5) == ["p0", "p1"]
+    assert not queue.complete("a", "p0", 1)
+    assert queue.complete("b", "p0", 1)
+
+    queue.release("b", "p1")
+    assert queue.stats() == {"pending": 0, "leased": 1, "done": 1, "failed": 1}
+    assert not queue.is_finished()
+
+
+def test_workers_share_the_queue_and_merge_without_duplicates(tmp_path):
+    """
+    Tests that two workers split the problems and the merged output holds
+    each problem's paths exactly once, excluding a lost lease's output.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.enqueue(f"p{i}" for i in range(10))
+    a, b = make_worker(tmp_path, queue, "a"), make_worker(tmp_path, queue, "b")
+
+    async def run_both():
+        return await asyncio.gather(
+            a.run(n_samples=2, concurrency=2, poll_interval=0.01),
+            b.run(n_samples=2, concurrency=2, poll_interval=0.01),
+        )
+
+    results_a, results_b = asyncio.run(run_both())
+    assert sorted(results_a.keys() | results_b.keys()) == sorted(f"p{i}" for i in range(10))
+    assert not results_a.keys() & results_b.keys()
+    assert queue.is_finished()
+
+    # Output from a worker that lost its lease (e.g. a stalled duplicate run)
+    # is in its checkpoint but must not be merged
+    stale = next(iter(results_a))
+    b.generator._save_correct_paths(
+        b.generator.problem_bank.get_problem(stale),
+        ReasoningPaths.parse(["The answer is 70"], b.generator.parser),
+        1,
+    )
+
+    merged_file = tmp_path / "merged.jsonl"
+    assert queue.merge(str(merged_file)) == 10
+    problems = [json.loads(line)["problem"] for line in merged_file.read_text().splitlines()]
+    assert sorted(problems) == sorted(f"Problem {i}" for i in range(10))
+
+
+def test_merge_compact_outputs(tmp_path):
+    """
+    Tests that compact outputs merge into one valid compact file.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.enqueue(f"p{i}" for i in range(10))
+    a = make_worker(tmp_path, queue, "a", output_format="compact")
+    b = make_worker(tmp_path, queue, "b", output_format="compact")
+
+    async def run_both():
+        await asyncio.gather(
+            a.run(n_samples=2, concurrency=3, poll_interval=0.01),
+            b.run(n_samples=2, concurrency=3, poll_interval=0.01),
+        )
+
+    asyncio.run(run_both())
+
+    merged_file = tmp_path / "merged.csd"
+    assert queue.merge(str(merged_file)) == 10
+    records = list(read_compact(str(merged_file)))
+    assert sorted(r["problem_id"] for r in records) == sorted(f"p{i}" for i in range(10))
+
+
+def test_queue_worker_requires_a_checkpoint(tmp_path):
+    """
+    Tests that a worker without a checkpoint is rejected.
+    """
+    generator = DataGenerator(FakeAsyncLLMClient([]), str(tmp_path / "out.jsonl"))
+    with pytest.raises(ValueError):
+        QueueWorker(generator, WorkQueue(str(tmp_path / "queue.sqlite")), "a")
+
+
+class FailOnceClient(FakeAsyncLLMClient):
+    """Fails the first sampling request, then returns too few samples once."""
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.calls = 0
+
+    async def aquery_sample_n(self, prompt, n, sample_offset=0):
+        self.calls += 1
+        if self.calls == 1:
+            raise LLMRequestError("Sampling request failed: 429")
+        if self.calls == 2:
+            return []
+        return await super().aquery_sample_n(prompt, n, sample_offset)
+
+
+def test_failed_requests_release_the_problem_for_retry(tmp_path):
+    """
+    Tests that a problem whose samples could not be drawn is retried rather
+    than marked done, so its output still reaches the merged file.
+    """
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), max_attempts=3)
+    queue.enqueue(["p0"])
+    generator = DataGenerator(
+        FailOnceClient(["The answer is 70", "The answer is 70"]),
+        str(tmp_path / "a.out"),
+        checkpoint_file=str(tmp_path / "a.checkpoint.jsonl"),
+        verbose=False,
+    )
+    make_problem_bank(generator, 1)
+    worker = QueueWorker(generator, queue, "a")
+
+    assert asyncio.run(worker.run(n_samples=2, concurrency=1, poll_interval=0.01)) == {"p0": 2}
+    assert queue.stats()["done"] == 1
+
+    merged_file = tmp_path / "merged.jsonl"
+    assert queue.merge(str(merged_file)) == 1
+    assert len(merged_file.read_text().splitlines()) == 2
@@ -49,3 +49,26 @@ def test_create_few_shot_cot_prompt(manager):
     )
 
     assert manager.create_few_shot_cot_prompt(problem, examples) == expected_prompt
+
+
+def test_compiled_few_shot_template_shares_a_stable_prefix(manager):
+    """
+    Tests that a compiled template renders the same prompts as
+    create_few_shot_cot_prompt, with a byte-identical prefix per problem.
+    """
+    examples = [
+        {"problem": "First example problem.", "reasoning": "Step 1.", "answer": "A"},
+        {"problem": "Second example problem.", "reasoning": "Step 2.", "answer": 7},
+    ]
+    template = manager.compile_few_shot_cot_template(examples)
+
+    prompts = [template.render(f"Problem {i}.") for i in range(3)]
+    for i, prompt in enumerate(prompts):
+        assert prompt.startswith(template.prefix)
+        assert prompt == manager.create_few_shot_cot_prompt(f"Problem {i}.", examples)
+
+    # Equal examples compile to the same template, even from new dicts
+    assert manager.compile_few_shot_cot_template([dict(ex) for ex in examples]) is template
+    assert PromptManager().compile_few_shot_cot_template(examples).prefix_hash == (
+        template.prefix_hash
+    )
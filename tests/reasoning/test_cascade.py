@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.cascade import ModelCascade
+
+
+class FakeModelClient:
+    """Serves canned responses per prompt and tracks usage like LLMClient."""
+
+    def __init__(self, model, responses):
+        self.model = model
+        self.responses = responses
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def query_sample_n(self, prompt, n, sample_offset=0):
+        self.usage["requests"] += 1
+        self.usage["prompt_tokens"] += 100
+        self.usage["completion_tokens"] += 50 * n
+        return self.responses[prompt][:n]
+
+    async def aquery_sample_n(self, prompt, n, sample_offset=0):
+        return self.query_sample_n(prompt, n, sample_offset)
+
+
+@pytest.fixture
+def clients():
+    """Provides a cheap and a strong fake model."""
+    cheap = FakeModelClient(
+        "cheap",
+        {
+            "easy": ["The answer is 70"] * 4,
+            "hard": ["The answer is 1", "The answer is 2", "The answer is 1", "?"],
+            "garbled": ["no idea"] * 4,
+        },
+    )
+    strong = FakeModelClient(
+        "strong", {p: ["The answer is 42"] * 4 for p in ("easy", "hard", "garbled")}
+    )
+    return cheap, strong
+
+
+def test_cascade_escalates_only_unresolved_problems(clients):
+    """
+    Tests that confident answers stay on the cheap model while low-agreement
+    and unparseable problems are escalated.
+    """
+    cheap, strong = clients
+    cascade = ModelCascade(
+        [cheap, strong],
+        AnswerParser(),
+        agreement_threshold=0.75,
+        prices={"cheap": (1.0, 2.0), "strong": (10.0, 20.0)},
+        verbose=False,
+    )
+
+    assert cascade.reason("easy", n_samples=4) == ("70", ["The answer is 70"] * 4)
+    assert cascade.reason("hard", n_samples=4)[0] == "42"
+    assert cascade.reason("garbled", n_samples=4)[0] == "42"
+
+    assert cascade.routes == {
+        ("cheap", "accepted"): 1,
+        ("cheap", "escalated"): 2,
+        ("strong", "final"): 2,
+    }
+    cost = cascade.cost()
+    assert cost["cheap"]["requests"] == 3 and cost["strong"]["requests"] == 2
+    assert cost["strong"]["usd"] == pytest.approx((200 * 10.0 + 400 * 20.0) / 1e6)
+
+
+def test_cascade_async_matches_sync(clients):
+    """
+    Tests that areason routes the same way as reason.
+    """
+    cascade = ModelCascade(list(clients), AnswerParser(), verbose=False)
+    assert asyncio.run(cascade.areason("hard", n_samples=4))[0] == "42"
+    assert cascade.routes == {("cheap", "escalated"): 1, ("strong", "final"): 1}
+
+
+def test_cascade_rejects_bad_arguments():
+    """
+    Tests argument validation.
+    """
+    with pytest.raises(ValueError):
+        ModelCascade([], AnswerParser())
+    with pytest.raises(ValueError):
+        ModelCascade([object()], AnswerParser(), agreement_threshold=0)
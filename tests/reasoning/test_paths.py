@@ -0,0 +1,50 @@
+import pytest
+
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.paths import ReasoningPath, ReasoningPaths
+
+
+def test_reasoning_path_has_no_instance_dict():
+    """
+    Tests that paths are compact slotted records.
+    """
+    path = ReasoningPath("The answer is 70", "70")
+
+    assert not hasattr(path, "__dict__")
+    with pytest.raises(AttributeError):
+        path.score = 1.0
+
+
+def test_paths_parse_each_response_once():
+    """
+    Tests that parse extracts one answer per response, keeping them in order.
+    """
+    paths = ReasoningPaths.parse(["The answer is 70", "no idea", "So 60."], AnswerParser())
+
+    assert len(paths) == 3
+    assert paths.answers == ["70", None, "60"]
+    assert [p.response for p in paths] == ["The answer is 70", "no idea", "So 60."]
+
+
+def test_paths_spill_to_disk_and_read_back(tmp_path):
+    """
+    Tests that responses past the threshold move to a temporary file, that
+    they read back intact (including non-ASCII text), and that close clears them.
+    """
+    paths = ReasoningPaths(spill_dir=str(tmp_path), spill_bytes=20)
+    paths.add("Step one → 35 × 2", "70")
+    assert not paths.spilled
+    paths.add("The answer is 70, clearly", "70")
+    paths.add("Wrong: 60", "60")
+
+    assert paths.spilled
+    assert list(paths.responses()) == [
+        "Step one → 35 × 2",
+        "The answer is 70, clearly",
+        "Wrong: 60",
+    ]
+    assert [p.answer for p in paths] == ["70", "70", "60"]
+
+    paths.close()
+    assert len(paths) == 0
+    assert list(paths.responses()) == []
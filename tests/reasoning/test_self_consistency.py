@@ -0,0 +1,90 @@
+import pytest
+
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.self_consistency import SelfConsistency
+from tests.fakes import FakeLLMClient
+
+
+def test_reason_returns_majority_answer():
+    """
+    Tests that reason draws all samples at once and takes the majority vote.
+    """
+    client = FakeLLMClient(["The answer is 70", "The answer is 60", "So 70."])
+    sc = SelfConsistency(client, AnswerParser())
+
+    answer, raw_responses = sc.reason("prompt", n_samples=3)
+
+    assert answer == "70"
+    assert len(raw_responses) == 3
+    assert client.requests == [(3, 0)]
+
+
+def test_reason_adaptive_stops_once_consensus_is_decisive():
+    """
+    Tests that unanimous early rounds stop sampling well before the budget.
+    """
+    client = FakeLLMClient(["The answer is 70"] * 16)
+    sc = SelfConsistency(client, AnswerParser())
+
+    answer, raw_responses = sc.reason_adaptive(
+        "prompt", max_samples=16, round_size=2, confidence=0.9
+    )
+
+    assert answer == "70"
+    assert len(raw_responses) == 4
+    assert client.requests == [(2, 0), (2, 2)]
+
+
+def test_reason_adaptive_uses_full_budget_when_split():
+    """
+    Tests that a split vote keeps sampling until max_samples is reached.
+    """
+    client = FakeLLMClient(["The answer is 70", "The answer is 60"] * 4)
+    sc = SelfConsistency(client, AnswerParser())
+
+    answer, raw_responses = sc.reason_adaptive(
+        "prompt", max_samples=7, round_size=3, confidence=0.9
+    )
+
+    assert answer == "70"
+    assert len(raw_responses) == 7
+    assert client.requests == [(3, 0), (3, 3), (1, 6)]
+
+
+def test_reason_adaptive_rejects_invalid_confidence():
+    """
+    Tests that a confidence outside (0, 1) is rejected.
+    """
+    sc = SelfConsistency(FakeLLMClient([]), AnswerParser())
+    with pytest.raises(ValueError):
+        sc.reason_adaptive("prompt", confidence=1.0)
+
+
+class CountingParser(AnswerParser):
+    """An AnswerParser that counts how many responses it parsed."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_answer(self, text):
+        self.calls += 1
+        return super().extract_answer(text)
+
+
+def test_sample_parses_each_response_once_in_batches():
+    """
+    Tests that sample draws in batch_size requests with increasing offsets
+    and parses every response exactly once, including past a decided vote.
+    """
+    responses = [f"Path {i}: the answer is {70 if i % 3 else 60}" for i in range(10)]
+    client = FakeLLMClient(responses)
+    parser = CountingParser()
+    sc = SelfConsistency(client, parser, verbose=False, batch_size=4)
+
+    answer, paths = sc.sample("prompt", n_samples=10)
+
+    assert answer == "70"
+    assert client.requests == [(4, 0), (4, 4), (2, 8)]
+    assert parser.calls == 10
+    assert list(paths.responses()) == responses
+    assert paths.answers == [p.answer for p in paths]
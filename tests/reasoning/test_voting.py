@@ -0,0 +1,123 @@
+import pytest
+
+from cognition_synthesis.parsing.parser import AnswerParser
+from cognition_synthesis.reasoning.self_consistency import SelfConsistency
+from cognition_synthesis.reasoning.voting import VotingEngine, canonical_answer
+from tests.fakes import FakeLLMClient
+
+
+@pytest.mark.parametrize(
+    "answers, canonical",
+    [
+        (["70", "70.0", "$70", "70 apples", "**70**"], "70"),
+        (["3/4", "0.75", r"\frac{3}{4}"], "0.75"),
+        (["1,000", "1000"], "1000"),
+        (["Paris", " paris "], "paris"),
+    ],
+)
+def test_canonical_answer_merges_formatting_variants(answers, canonical):
+    """
+    Tests that formatting variants share one canonical form.
+    """
+    assert {canonical_answer(a) for a in answers} == {canonical}
+
+
+def test_canonical_answer_keeps_compound_answers_apart():
+    """
+    Tests that answers naming more than one quantity do not vote as their
+    first number, which could otherwise change the majority.
+    """
+    assert canonical_answer("3 or 4") != canonical_answer("3")
+    assert canonical_answer("1 hour 30 minutes") != canonical_answer("1")
+
+    tally = VotingEngine().vote(["3 or 4", "3 or 4", "3", "4"])
+    assert tally.leader() == "3 or 4"
+    assert tally.counts() == {"3 or 4": 2, "3": 1, "4": 1}
+
+
+def test_vote_groups_variants_and_reports_most_common_form():
+    """
+    Tests that split formatting no longer splits the vote.
+    """
+    tally = VotingEngine().vote(["70.0", "60", "70", "$70", None, "60"])
+    assert tally.leader() == "70.0"
+    assert tally.counts() == {"70.0": 3, "60": 2}
+    assert tally.total == 6
+
+    exact = VotingEngine(canonicalize=None).vote(["70.0", "60", "70", "60"])
+    assert exact.leader() == "60"
+
+
+def test_weighted_vote():
+    """
+    Tests that weights can overturn a raw majority.
+    """
+    tally = VotingEngine().vote(["70", "60", "60"], weights=[1.0, 0.05, 0.05])
+    assert tally.leader() == "70"
+
+    by_length = VotingEngine(weight_fn=len)
+    assert by_length.weights(["ab", "abcd"]) == [2, 4]
+
+
+def test_vote_early_exit_stops_once_unassailable():
+    """
+    Tests that voting stops as soon as the leader cannot be caught.
+    """
+    tally = VotingEngine().vote(["70", "70", "70", "60", "60"], early_exit=True)
+    assert tally.total == 3
+    assert tally.is_unassailable(2)
+
+
+def test_self_consistency_skips_parsing_once_majority_is_unassailable():
+    """
+    Tests that reason stops parsing early but still returns every path.
+    """
+    parsed = []
+
+    class CountingParser(AnswerParser):
+        def extract_answer(self, text):
+            parsed.append(text)
+            return super().extract_answer(text)
+
+    responses = ["The answer is 70", "The answer is $70.00", "So 70."] + [
+        "The answer is 60"
+    ] * 2
+    sc = SelfConsistency(FakeLLMClient(responses), CountingParser(), verbose=False)
+
+    answer, raw_responses = sc.reason("prompt", n_samples=5)
+    assert answer == "70"
+    assert len(raw_responses) == 5
+    assert len(parsed) == 3
+
+
+def test_reason_adaptive_stops_when_budget_cannot_change_the_winner():
+    """
+    Tests the budget-based stop in adaptive sampling, which needs no
+    statistical confidence.
+    """
+    client = FakeLLMClient(["The answer is 70", "The answer is 70.0", "The answer is 60"])
+    sc = SelfConsistency(client, AnswerParser(), verbose=False)
+
+    answer, raw_responses = sc.reason_adaptive(
+        "prompt", max_samples=3, round_size=2, confidence=0.99
+    )
+    assert answer == "70"
+    assert len(raw_responses) == 2
+
+
+def test_reason_adaptive_weighted_votes_stop_only_once_unassailable():
+    """
+    Tests that weighted votes are not fed to the sign test as counts, and
+    that they stop early only when the weight of a vote is bounded.
+    """
+    responses = ["The answer is 70"] * 6
+
+    unbounded = VotingEngine(weight_fn=lambda response: 5.0)
+    sc = SelfConsistency(FakeLLMClient(responses), AnswerParser(), voting=unbounded, verbose=False)
+    _, raw_responses = sc.reason_adaptive("prompt", max_samples=6, round_size=2)
+    assert len(raw_responses) == 6
+
+    bounded = VotingEngine(weight_fn=lambda response: 5.0, max_weight=5.0)
+    sc = SelfConsistency(FakeLLMClient(responses), AnswerParser(), voting=bounded, verbose=False)
+    _, raw_responses = sc.reason_adaptive("prompt", max_samples=6, round_size=2)
+    assert len(raw_responses) == 4
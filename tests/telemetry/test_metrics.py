@@ -0,0 +1,76 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cognition_synthesis.telemetry.metrics import Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    """Provides an empty MetricsRegistry."""
+    return MetricsRegistry()
+
+
+def test_histogram_quantiles():
+    """
+    Tests exact count/sum and nearest-rank quantiles.
+    """
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.observe(value)
+
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["sum"] == 5050
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (51, 96, 100)
+
+
+def test_histogram_memory_is_bounded():
+    """
+    Tests that the reservoir never grows past max_samples.
+    """
+    histogram = Histogram(max_samples=10)
+    for value in range(1000):
+        histogram.observe(value)
+    assert histogram.count == 1000
+    assert len(histogram._samples) == 10
+
+
+def test_registry_records_timers_and_token_usage(registry):
+    """
+    Tests stage timers, labelled counters and usage accounting.
+    """
+    with registry.timer("parse"):
+        pass
+    registry.record_usage(
+        "gpt-4o-mini", SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+    )
+    registry.record_usage(
+        "gpt-4o-mini", SimpleNamespace(prompt_tokens=80, completion_tokens=20)
+    )
+
+    assert registry.histogram("stage_seconds", stage="parse").count == 1
+    assert registry.counter("llm_tokens_total", model="gpt-4o-mini", type="prompt") == 200
+    assert registry.counter("llm_tokens_total", model="gpt-4o-mini", type="completion") == 50
+
+
+def test_registry_exports_json_and_prometheus(registry, tmp_path):
+    """
+    Tests both export formats.
+    """
+    registry.inc("paths_verified_total", 3)
+    registry.observe("stage_seconds", 0.5, stage="verify")
+
+    text = registry.to_prometheus()
+    assert "# TYPE paths_verified_total counter" in text
+    assert "paths_verified_total 3" in text
+    assert 'stage_seconds{stage="verify",quantile="0.99"} 0.5' in text
+    assert 'stage_seconds_count{stage="verify"} 1' in text
+
+    registry.export(str(tmp_path / "metrics.json"))
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    assert snapshot["histograms"][0]["labels"] == {"stage": "verify"}
+
+    registry.export(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == text
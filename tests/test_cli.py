@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from cognition_synthesis import cli
+
+
+def test_cli_startup_does_not_import_the_openai_sdk():
+    """
+    Tests that importing the CLI and the pipeline modules stays lightweight,
+    deferring the OpenAI SDK until a client is created.
+    """
+    code = (
+        "import sys, cognition_synthesis.cli, cognition_synthesis.pipelines.data_generator, "
+        "cognition_synthesis.pipelines.batch, cognition_synthesis.reasoning.cascade; "
+        "print('openai' in sys.modules, 'httpx' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_cli_forwards_rescore_arguments(tmp_path, capsys):
+    """
+    Tests that the rescore subcommand runs the rescorer with its own arguments.
+    """
+    input_file = tmp_path / "paths.jsonl"
+    input_file.write_text(
+        json.dumps({"problem_id": "math_001", "response": "The answer is 70"}) + "\n"
+    )
+    output_file = tmp_path / "scored.jsonl"
+
+    assert cli.main(["rescore", str(input_file), str(output_file), "--processes", "1"]) == 0
+
+    assert json.loads(output_file.read_text())["is_correct"] is True
+    captured = capsys.readouterr()
+    assert "Scored 1 records: 1 correct" in captured.out
+    assert "rescore ready in" in captured.err
+
+
+def test_cli_rejects_unknown_generate_arguments():
+    """
+    Tests that generate, unlike the forwarding subcommands, validates its options.
+    """
+    with pytest.raises(SystemExit):
+        cli.main(["generate", "--bogus"])
+
+
+def test_cli_queue_init_and_status(tmp_path, capsys):
+    """
+    Tests that the queue subcommand enqueues the problem bank and reports its state.
+    """
+    queue_file = str(tmp_path / "queue.sqlite")
+
+    assert cli.main(["queue", "init", queue_file]) == 0
+    assert cli.main(["queue", "status", queue_file]) == 0
+
+    status = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert status == {"pending": 2, "leased": 0, "done": 0, "failed": 0}
+
+
+def test_cli_generate_from_queue_requires_checkpoint(tmp_path):
+    """
+    Tests that a queue worker is refused without the checkpoint merging relies on.
+    """
+    with pytest.raises(SystemExit):
+        cli.main(["generate", "--queue", str(tmp_path / "queue.sqlite")])
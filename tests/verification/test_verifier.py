@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from cognition_synthesis.verification.verifier import ProblemBank, Verifier, shard_of
+
+
+@pytest.fixture
+def problems_file(tmp_path):
+    """Writes a small JSONL problem file and returns its path."""
+    path = tmp_path / "problems.jsonl"
+    with open(path, "w") as f:
+        for i in range(20):
+            problem = {
+                "id": f"p{i}",
+                "problem": f"Problem {i} — with non-ASCII text",
+                "ground_truth_answer": str(i),
+                "tags": ["even"] if i % 2 == 0 else ["odd"],
+            }
+            f.write(json.dumps(problem, ensure_ascii=False) + "\n")
+    return str(path)
+
+
+def test_default_bank_contains_built_in_problems():
+    """
+    Tests that the default bank still serves the built-in problems.
+    """
+    bank = ProblemBank()
+    assert list(bank.ids()) == ["math_001", "math_002"]
+    assert bank.get_problem("math_002")["ground_truth_answer"] == "360"
+    assert bank.get_problem("missing") is None
+
+
+def test_file_backed_bank_looks_up_problems_by_id(problems_file):
+    """
+    Tests indexed lookups and lazy iteration over a JSONL problem file.
+    """
+    bank = ProblemBank(problems_file)
+
+    assert len(bank) == 20
+    assert "p7" in bank and "p20" not in bank
+    assert bank.get_problem("p7")["problem"] == "Problem 7 — with non-ASCII text"
+    assert bank.get_problem("p19")["ground_truth_answer"] == "19"
+    assert bank.get_problem("p20") is None
+    assert [p["id"] for p in bank] == [f"p{i}" for i in range(20)]
+
+
+def test_file_backed_bank_filters_by_shard_and_tags(problems_file):
+    """
+    Tests that shards partition the bank and tag filters select problems.
+    """
+    bank = ProblemBank(problems_file)
+
+    shards = [set(bank.ids(shard=k, num_shards=3)) for k in range(3)]
+    assert set().union(*shards) == set(bank.ids())
+    assert sum(len(s) for s in shards) == 20
+    assert all(shard_of(pid, 3) == k for k, s in enumerate(shards) for pid in s)
+
+    assert list(bank.ids(tags=["odd"])) == [f"p{i}" for i in range(1, 20, 2)]
+    assert list(bank.ids(tags=["odd", "even"])) == []
+
+
+def test_file_backed_bank_rejects_duplicate_ids(tmp_path):
+    """
+    Tests that a problem file with a repeated ID is rejected.
+    """
+    path = tmp_path / "problems.jsonl"
+    path.write_text('{"id": "a"}\n{"id": "a"}\n')
+    with pytest.raises(ValueError):
+        ProblemBank(str(path))
+
+
+@pytest.mark.parametrize(
+    "extracted, truth",
+    [
+        ("70", "70.0"),
+        ("$70", "70"),
+        ("70 apples", "70"),
+        ("**360 km**", "360"),
+        ("1,000", "1000"),
+        ("3/4", "0.75"),
+        (r"$\frac{3}{4}$", "0.75"),
+        (r"\boxed{1,200}", "1200"),
+        (r"12 \text{ cm}", "12"),
+        ("60 km/h", "60"),
+        ("25 square meters", "25"),
+        ("9 m^2", "9"),
+        ("x = 5", "5"),
+        ("Paris", "paris"),
+    ],
+)
+def test_verifier_accepts_equivalent_answers(extracted, truth):
+    """
+    Tests that normalization makes equivalent answers match.
+    """
+    assert Verifier().verify(extracted, truth)
+
+
+@pytest.mark.parametrize(
+    "extracted, truth",
+    [
+        ("71", "70"),
+        ("", "70"),
+        ("1, 2", "12"),
+        ("1/0", "1"),
+        ("3 or 4", "3"),
+        ("2 to 5", "2"),
+        ("1 hour 30 minutes", "1"),
+        ("70 apples and 5 oranges", "70"),
+        ("3 or more", "3"),
+    ],
+)
+def test_verifier_rejects_different_answers(extracted, truth):
+    """
+    Tests that normalization does not make different answers match.
+    """
+    assert not Verifier().verify(extracted, truth)
+
+
+def test_verifier_tolerance_and_custom_normalizers():
+    """
+    Tests the numeric tolerance and a verifier without normalizers.
+    """
+    assert not Verifier().verify("0.333", "1/3")
+    assert Verifier(rel_tol=1e-2).verify("0.333", "1/3")
+    assert not Verifier(normalizers=[]).verify("$70", "70")
+
+
+def test_verifier_memoizes_results():
+    """
+    Tests that repeated pairs are served from the bounded cache.
+    """
+    verifier = Verifier(cache_size=2)
+    for _ in range(3):
+        assert verifier.verify("$70", "70")
+    assert (verifier.hits, verifier.misses) == (2, 1)
+
+    verifier.verify("1", "1")
+    verifier.verify("2", "2")
+    assert len(verifier._cache) == 2
+    assert ("$70", "70") not in verifier._cache